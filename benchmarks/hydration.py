@@ -0,0 +1,84 @@
+"""
+* Allocation benchmark for result hydration on a 10k row nested result.
+*
+* Compares hydrating the maps copied out of the records with Record.data()
+* (extract_query_result) to reading the records directly (hydrate_records),
+* eagerly and with lazy objects of which only the top-level title is read.
+*
+*   python -m benchmarks.hydration [rows]
+"""
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from neo4j import Record
+
+from strawberry_graphql_neo4j.hydration import LAZY, hydrate, hydrate_records
+from strawberry_graphql_neo4j.utils import extract_query_result
+from tests.helpers.strawberry_schema import schema
+
+
+class Result(list):
+    def data(self):
+        return [record.data() for record in self]
+
+
+def result(rows):
+    return Result(
+        Record(
+            zip(
+                ["movie"],
+                [
+                    {
+                        "title": f"Movie {i}",
+                        "year": 1900 + i % 120,
+                        "actors": [{"name": f"Actor {i}-{j}"} for j in range(5)],
+                        "genres": [{"name": f"Genre {i % 20}"}],
+                    }
+                ],
+            )
+        )
+        for i in range(rows)
+    )
+
+
+def measure(hydration, records):
+    tracemalloc.start()
+    start = time.perf_counter()
+    hydrated = hydration(records)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del hydrated
+    return peak, elapsed
+
+
+def main(rows=10_000):
+    info = SimpleNamespace(
+        schema=schema,
+        return_type=schema.get_type_by_name("Query").get_field("Movie").type,
+    )
+    records = result(rows)
+
+    paths = {
+        "Record.data() + hydrate": lambda r: hydrate(
+            info, extract_query_result(r, info.return_type)
+        ),
+        "hydrate_records": lambda r: hydrate_records(info, r),
+        "hydrate_records (lazy)": lambda r: [
+            movie.title for movie in hydrate_records(info, r, LAZY)
+        ],
+    }
+    # warm up the per-schema type lookups
+    for hydration in paths.values():
+        hydration(Result(records[:1]))
+
+    print(f"{rows} rows")
+    for name, hydration in paths.items():
+        peak, elapsed = measure(hydration, records)
+        print(f"{name:<26} peak {peak / 2**20:8.2f} MiB  {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,210 @@
+"""
+* Load test of the full stack of examples/ariadne_uvicorn: HTTP, Ariadne,
+* graphql-core, neo4j_graphql(), the driver interface and hydration.
+*
+* The example app is served in-process by uvicorn on a FakeDriver with the
+* given latency per statement. Each of `concurrency` clients keeps one HTTP
+* connection open and posts queries from tests/test_cypher.py, picked at
+* random with the weights of QUERY_WEIGHTS, for `duration` seconds. Queries
+* the example schema doesn't validate are left out of the mix.
+*
+*   python -m benchmarks.load --concurrency 32 --duration 10 --latency 0.002
+"""
+import argparse
+import ast
+import asyncio
+import importlib.util
+import json
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from graphql import parse, validate
+
+ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = ROOT / "examples" / "ariadne_uvicorn" / "movies_v2.py"
+QUERIES_PATH = ROOT / "tests" / "test_cypher.py"
+
+# relative frequency of the tests/test_cypher.py queries, by test name
+QUERY_WEIGHTS = {
+    "test_simple_cypher_query": 10,
+    "test_simple_skip_limit": 5,
+    "test_query_single_object": 10,
+    "test_query_single_object_array_of_objects_relations": 5,
+    "test_deeply_nested_object_query": 2,
+    "test_pass_cypher_directive_params_to_sub_query": 2,
+}
+DEFAULT_WEIGHT = 1
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+
+def load_queries(path=QUERIES_PATH):
+    """The `graphql_query` strings of the tests in `path`, by test name."""
+    queries = {}
+    for node in ast.walk(ast.parse(path.read_text())):
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for statement in node.body:
+            if (
+                isinstance(statement, ast.Assign)
+                and getattr(statement.targets[0], "id", None) == "graphql_query"
+                and isinstance(statement.value, ast.Constant)
+            ):
+                queries[node.name] = statement.value.value
+    return queries
+
+
+def query_mix(schema, queries, weights=QUERY_WEIGHTS):
+    """(names, queries, weights) of the queries valid against `schema`."""
+    mix = [
+        (name, query, weights.get(name, DEFAULT_WEIGHT))
+        for name, query in sorted(queries.items())
+        if not validate(schema, parse(query))
+    ]
+    return tuple(zip(*mix)) if mix else ((), (), ())
+
+
+def fake_driver(latency, rows):
+    from strawberry_graphql_neo4j.testing import FakeDriver
+
+    def respond(query, parameters):
+        variable = re.search(r"AS (\w+)(?: SKIP| LIMIT|$)", query)
+        variable = variable.group(1) if variable else "value"
+        return [
+            {variable: {"title": f"Movie {i}", "name": f"Name {i}", "year": 1990 + i}}
+            for i in range(rows)
+        ]
+
+    return FakeDriver(default=respond, latency=latency)
+
+
+def load_app(driver):
+    spec = importlib.util.spec_from_file_location("movies_v2", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.schema, module.create_app(driver)
+
+
+def serve(app):
+    """Serve `app` with uvicorn in a background thread, return its port."""
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+        )
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, port
+
+
+async def post(reader, writer, port, body):
+    writer.write(
+        (
+            f"POST / HTTP/1.1\r\nHost: 127.0.0.1:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        ).encode()
+        + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    payload = await reader.readexactly(length)
+    return status, payload
+
+
+async def client(port, queries, weights, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    bodies = [json.dumps({"query": query}).encode() for query in queries]
+    try:
+        while time.perf_counter() < deadline:
+            [body] = random.choices(bodies, weights)
+            start = time.perf_counter()
+            status, payload = await post(reader, writer, port, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or b'"errors"' in payload:
+                errors[status] += 1
+    finally:
+        writer.close()
+
+
+async def run(port, queries, weights, concurrency, duration):
+    latencies, errors = [], Counter()
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(port, queries, weights, deadline, latencies, errors)
+            for _ in range(concurrency)
+        )
+    )
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(latencies, errors, elapsed):
+    ordered = sorted(latencies)
+    print(f"requests     {len(ordered)} in {elapsed:.1f} s")
+    print(f"throughput   {len(ordered) / elapsed:.1f} req/s")
+    print(f"errors       {sum(errors.values())} {dict(errors) or ''}")
+    if not ordered:
+        return
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1)):
+        print(f"{name:<12} {percentile(ordered, fraction) * 1000:.2f} ms")
+
+    print("latency histogram")
+    counts = Counter(
+        next((bound for bound in BUCKETS_MS if latency * 1000 <= bound), None)
+        for latency in ordered
+    )
+    largest = max(counts.values())
+    for bound in (*BUCKETS_MS, None):
+        count = counts.get(bound, 0)
+        label = f"<= {bound} ms" if bound is not None else f"> {BUCKETS_MS[-1]} ms"
+        print(f"  {label:>12} {count:8d} {'#' * round(40 * count / largest)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1].lstrip("* "))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--latency", type=float, default=0.002, help="seconds per statement")
+    parser.add_argument("--rows", type=int, default=10, help="records per statement")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    schema, app = load_app(fake_driver(args.latency, args.rows))
+    names, queries, weights = query_mix(schema, load_queries())
+    server, port = serve(app)
+    print(f"{len(names)} queries, {args.concurrency} clients, {args.latency * 1000:g} ms per statement")
+    try:
+        report(*asyncio.run(run(port, queries, weights, args.concurrency, args.duration)))
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
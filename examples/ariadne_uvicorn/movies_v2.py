@@ -1,7 +1,6 @@
 import uvicorn
-from neo4j import GraphDatabase
 from ariadne.asgi import GraphQL
-from strawberry_graphql_neo4j import neo4j_graphql
+from strawberry_graphql_neo4j import managed_driver, neo4j_graphql
 from ariadne import QueryType, make_executable_schema, MutationType
 
 typeDefs = """
@@ -96,19 +95,17 @@ def resolve(obj, info, **kwargs):
 
 schema = make_executable_schema(typeDefs, query)
 
-driver = None
 
+def create_app(driver):
+    def context(request):
+        return {"driver": driver, "request": request}
 
-def context(request):
-    global driver
-    if driver is None:
-        driver = GraphDatabase.driver(
-            "bolt://localhost:7687", auth=("neo4j", "neo4j123")
-        )
+    root_value = {}
+    return GraphQL(schema=schema, root_value=root_value, context_value=context, debug=True)
 
-    return {"driver": driver, "request": request}
 
-
-root_value = {}
-app = GraphQL(schema=schema, root_value=root_value, context_value=context, debug=True)
-uvicorn.run(app)
+if __name__ == "__main__":
+    driver = managed_driver(
+        "bolt://localhost:7687", auth=("neo4j", "neo4j123"), concurrency=8
+    )
+    uvicorn.run(create_app(driver))
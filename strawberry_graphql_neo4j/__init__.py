@@ -1,10 +1,50 @@
-from .main import neo4j_graphql, cypher_query, cypher_mutation, augment_schema
+from .main import neo4j_graphql, neo4j_graphql_async, cypher_query, cypher_mutation, augment_schema
+from .admission import AdmissionController, AdmissionRejected
+from .budget import ResultBudgetExceeded
+from .deadlines import Deadline, DeadlineExceeded
+from .driver import ManagedDriver, managed_driver, recommended_pool_size
+from .executor import (
+    ThreadPoolExecutionContext,
+    TransactionExecutionContext,
+    thread_pool_execution_context,
+)
+from .loader import NodeLoader, defer_keys, node_loader
+from .metrics import MetricsRegistry, QuerySample
+from .profiling import Profiler, Neo4jProfileExtension
+from .single_flight import SingleFlight
+from .splitting import QuerySplitter
+from .slow_queries import SlowQueryLog, redact_parameters
+from .subscriptions import neo4j_subscription
 from .utils import make_executable_schema
 
 __all__ = [
     "neo4j_graphql",
+    "neo4j_graphql_async",
     "cypher_query",
     "cypher_mutation",
     "augment_schema",
     "make_executable_schema",
+    "Profiler",
+    "Neo4jProfileExtension",
+    "ThreadPoolExecutionContext",
+    "thread_pool_execution_context",
+    "TransactionExecutionContext",
+    "NodeLoader",
+    "node_loader",
+    "defer_keys",
+    "ManagedDriver",
+    "managed_driver",
+    "recommended_pool_size",
+    "MetricsRegistry",
+    "QuerySample",
+    "SlowQueryLog",
+    "redact_parameters",
+    "neo4j_subscription",
+    "ResultBudgetExceeded",
+    "SingleFlight",
+    "QuerySplitter",
+    "AdmissionController",
+    "AdmissionRejected",
+    "Deadline",
+    "DeadlineExceeded",
 ]
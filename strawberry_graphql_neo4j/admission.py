@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .metrics import field_name
+from .utils import context_value
+
+CONTEXT_KEY = "neo4j_admission"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a database call is shed: the queue is full or the wait timed out."""
+
+
+class _Waiter:
+    def __init__(self, priority, sequence):
+        self.key = (priority, sequence)
+        self.event = threading.Event()
+        self.admitted = False
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AdmissionController:
+    """
+    * Bounds the database calls of a process: at most max_concurrency run at
+    * once, up to max_queue wait for a slot for at most timeout seconds, and
+    * the others are rejected with AdmissionRejected, so that bursts are shed
+    * instead of exhausting the connection pool for every request.
+    *
+    * Waiting calls are admitted by priority, lower values first, then in
+    * arrival order. priorities maps root fields (`Mutation.CreateMovie`) or
+    * their types (`Mutation`) to a priority, default_priority applies to the
+    * others. max_concurrency should not exceed the driver's pool size.
+    """
+
+    def __init__(
+        self,
+        max_concurrency=10,
+        max_queue=100,
+        timeout=5.0,
+        priorities=None,
+        default_priority=10,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.priorities = priorities or {}
+        self.default_priority = default_priority
+        self._lock = threading.Lock()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._active = 0
+        self._waiting = 0
+        self._max_waiting = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+    def priority(self, resolve_info):
+        name = field_name(resolve_info)
+        if name in self.priorities:
+            return self.priorities[name]
+        return self.priorities.get(name.split(".", 1)[0], self.default_priority)
+
+    @contextmanager
+    def slot(self, priority=None, timeout=None, deadline=None):
+        """Hold one of the max_concurrency slots for the duration of the block."""
+        self.acquire(priority, timeout, deadline)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def acquire(self, priority=None, timeout=None, deadline=None):
+        """
+        * Take a slot, waiting for at most timeout seconds, or self.timeout,
+        * and no longer than deadline, if any: once it runs out, or is
+        * cancelled, the call gives up with DeadlineExceeded.
+        """
+        start = time.perf_counter()
+        timeout = self.timeout if timeout is None else timeout
+        if deadline is not None:
+            deadline.check()
+            remaining = deadline.remaining()
+            if remaining is not None:
+                timeout = remaining if timeout is None else min(timeout, remaining)
+        with self._lock:
+            if self._active < self.max_concurrency and not self._waiting:
+                self._active += 1
+                self._admitted += 1
+                return
+            if self._waiting >= self.max_queue:
+                self._rejected += 1
+                raise AdmissionRejected(
+                    f"Too many database calls waiting ({self._waiting})"
+                )
+            waiter = _Waiter(
+                self.default_priority if priority is None else priority,
+                next(self._sequence),
+            )
+            heapq.heappush(self._queue, waiter)
+            self._waiting += 1
+            self._max_waiting = max(self._max_waiting, self._waiting)
+
+        # a cancelled deadline wakes the waiter at once
+        discard = (
+            deadline.on_cancel(waiter.event.set)
+            if deadline is not None
+            else lambda: None
+        )
+        try:
+            waiter.event.wait(timeout)
+        finally:
+            discard()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._wait_time += waited
+            self._max_wait_time = max(self._max_wait_time, waited)
+            if waiter.admitted:
+                return
+            # removed from the heap when it reaches the top
+            waiter.cancelled = True
+            self._waiting -= 1
+            self._timed_out += 1
+        if deadline is not None:
+            deadline.check()
+        raise AdmissionRejected(f"Timed out after {waited:.3f}s waiting for a database slot")
+
+    def release(self):
+        with self._lock:
+            while self._queue:
+                waiter = heapq.heappop(self._queue)
+                if waiter.cancelled:
+                    continue
+                # the slot is handed over without being freed
+                waiter.admitted = True
+                self._waiting -= 1
+                self._admitted += 1
+                waiter.event.set()
+                return
+            self._active -= 1
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "active": self._active,
+                "waiting": self._waiting,
+                "max_waiting": self._max_waiting,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "wait_time": self._wait_time,
+                "max_wait_time": self._max_wait_time,
+            }
+
+
+def admission_slot(context, resolve_info, controller=None, deadline=None):
+    """
+    * The slot of a neo4j_graphql() call in controller, or else in the
+    * AdmissionController in context["neo4j_admission"]; without one calls
+    * are not limited. The wait for it ends with the call's deadline.
+    """
+    if controller is None:
+        controller = context_value(context, CONTEXT_KEY)
+    if controller is None:
+        return nullcontext()
+    return controller.slot(controller.priority(resolve_info), deadline=deadline)
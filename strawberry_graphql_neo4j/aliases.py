@@ -0,0 +1,183 @@
+import threading
+
+from graphql import GraphQLSchema, print_ast
+from graphql.execution.values import get_argument_values
+
+from .utils import (
+    convert_kwargs,
+    cypher_directive,
+    raw_info,
+    schema_type_by_name,
+    vector_directive,
+)
+
+CONTEXT_KEY = "neo4j_alias_batches"
+
+# arguments every alias of a batch must share, the others filter the root node
+FIXED_ARGUMENTS = ("first", "offset", "orderBy", "_id", "vector")
+
+_lock = threading.Lock()
+
+
+class AliasBatch:
+    """
+    * Aliases of a root query field with the same selections and pagination,
+    * e.g. `a: Movie(year: 1999) { title } b: Movie(year: 2000) { title }`,
+    * loaded by one statement when the first of them is resolved. The records
+    * are split by response key and handed to each alias when it resolves.
+    """
+
+    def __init__(self, operation, variable_values, aliases, fixed):
+        self.operation = operation
+        self.variable_values = variable_values
+        # response key -> filter arguments, in document order
+        self.aliases = aliases
+        self.fixed = fixed
+        self._lock = threading.Lock()
+        self._records = None
+        self._error = None
+
+    def parameters(self):
+        return {
+            "aliases": [
+                {"key": response_key, "args": filters}
+                for response_key, filters in self.aliases.items()
+            ]
+        }
+
+    def properties(self):
+        """The filter map of the root node, read from the row of the alias."""
+        names = next(iter(self.aliases.values()))
+        return "{%s}" % ", ".join(f"{name}: alias.args.{name}" for name in names)
+
+    def records(self, response_key, fetch):
+        """
+        * The records of an alias; fetch() loads those of all aliases the first
+        * time. Each alias takes its records once.
+        """
+        with self._lock:
+            if self._records is None and self._error is None:
+                try:
+                    self._records = {key: [] for key in self.aliases}
+                    for record in fetch():
+                        self._records[record["key"]].append(record)
+                except Exception as e:
+                    self._records = None
+                    self._error = e
+            if self._error is not None:
+                raise self._error
+            return self._records.pop(response_key)
+
+    def pending(self, response_key):
+        with self._lock:
+            return self._records is None or response_key in self._records
+
+
+def alias_batch(context, resolve_info, kwargs):
+    """
+    * The AliasBatch resolving the root field being resolved, None when it
+    * runs on its own: it is not a plain query field, no other alias of the
+    * field can share its statement, or kwargs aren't the field's arguments.
+    """
+    field_nodes = raw_info(resolve_info).field_nodes
+    if not isinstance(context, dict) or not _batchable(resolve_info, field_nodes):
+        return None
+    batches = context.setdefault(CONTEXT_KEY, {})
+
+    response_key = resolve_info.path.key
+    with _lock:
+        batch = batches.get(resolve_info.field_name)
+        if (
+            batch is None
+            or batch.operation is not resolve_info.operation
+            or batch.variable_values is not resolve_info.variable_values
+        ):
+            batch = batches[resolve_info.field_name] = _collect(
+                resolve_info, field_nodes
+            )
+
+    if batch is None or response_key not in batch.aliases:
+        return None
+    if _split(convert_kwargs(kwargs)) != (batch.fixed, batch.aliases[response_key]):
+        # the resolver changed the arguments, which the batch can't know about
+        with batch._lock:
+            if batch._records is not None:
+                batch._records.pop(response_key, None)
+        return None
+    if not batch.pending(response_key):
+        return None
+    return batch
+
+
+def _batchable(resolve_info, field_nodes):
+    if resolve_info.path.prev is not None or len(field_nodes) != 1:
+        return False
+    query_type = schema_type_by_name(resolve_info.schema, "Query")
+    return not (
+        cypher_directive(query_type, resolve_info.field_name)
+        or vector_directive(query_type, resolve_info.field_name).get("index")
+    )
+
+
+def _collect(resolve_info, field_nodes):
+    """The batch of the aliases of the field in the operation, if several."""
+    nodes = {}
+    for selection in resolve_info.operation.selection_set.selections:
+        if selection.kind == "field":
+            nodes.setdefault((selection.alias or selection.name).value, []).append(
+                selection
+            )
+
+    [field_node] = field_nodes
+    shape = print_ast(field_node.selection_set) if field_node.selection_set else None
+    field_definition = _graphql_schema(resolve_info.schema).query_type.fields[
+        resolve_info.field_name
+    ]
+
+    fixed = None
+    aliases = {}
+    for response_key, repeated in nodes.items():
+        node = repeated[0]
+        if (
+            len(repeated) != 1
+            or node.name.value != resolve_info.field_name
+            or node.directives
+            or (print_ast(node.selection_set) if node.selection_set else None) != shape
+        ):
+            continue
+        node_fixed, filters = _split(
+            convert_kwargs(
+                get_argument_values(
+                    field_definition, node, resolve_info.variable_values
+                )
+            )
+        )
+        if response_key == resolve_info.path.key:
+            fixed = node_fixed
+        aliases[response_key] = (node_fixed, filters)
+
+    own = aliases.get(resolve_info.path.key)
+    if own is None:
+        return None
+    aliases = {
+        response_key: filters
+        for response_key, (node_fixed, filters) in aliases.items()
+        if node_fixed == fixed and filters.keys() == own[1].keys()
+    }
+    if len(aliases) < 2:
+        return None
+    return AliasBatch(
+        resolve_info.operation, resolve_info.variable_values, aliases, fixed
+    )
+
+
+def _split(arguments):
+    fixed = {name: arguments[name] for name in FIXED_ARGUMENTS if name in arguments}
+    filters = {
+        name: value for name, value in arguments.items() if name not in FIXED_ARGUMENTS
+    }
+    return fixed, filters
+
+
+def _graphql_schema(schema):
+    return schema if isinstance(schema, GraphQLSchema) else schema._schema
@@ -1,5 +1,20 @@
 from .main import neo4j_graphql
-from graphql import print_schema
+from graphql import (
+    FieldDefinitionNode,
+    InputValueDefinitionNode,
+    NameNode,
+    ObjectTypeDefinitionNode,
+    get_nullable_type,
+    is_leaf_type,
+    is_list_type,
+    parse,
+    parse_type,
+    is_introspection_type,
+    is_specified_directive,
+    is_specified_scalar_type,
+    print_ast,
+)
+from graphql.utilities.print_schema import print_directive, print_type
 from pydash import filter_, reduce_
 from .utils import inner_type, make_executable_schema, low_first_letter
 
@@ -7,15 +22,17 @@ from .utils import inner_type, make_executable_schema, low_first_letter
 def add_mutations_to_schema(schema):
     types = types_to_augment(schema)
 
-    # FIXME: don't use printSchema (custom directives are lost), instead use extend schema
-    # FIXME: type extensions are lost
-    mutation_schema_sdl = print_schema(schema)
+    mutation_schema_sdl = schema_sdl(schema)
 
     # TODO: compose augment funcs
     # let mutationSchemaSDLWithTypes = augmentTypes(types, schema, mutationSchemaSDL);
 
     mutation_schema_sdl_with_types_and_mutations = augment_mutations(
-        types, schema, mutation_schema_sdl
+        types,
+        schema,
+        augment_aggregates(
+            types, schema, augment_ordering(types, schema, mutation_schema_sdl)
+        ),
     )
 
     def resolve_neo4j(obj, info, **kwargs):
@@ -40,7 +57,7 @@ def add_mutations_to_schema(schema):
         return acc
 
     resolvers = reduce_(
-        list(schema.get_type_by_name("Query").fields.keys()), f2, resolvers
+        list(schema.get_type("Query").fields.keys()), f2, resolvers
     )
 
     mutation_schema = make_executable_schema(
@@ -51,6 +68,34 @@ def add_mutations_to_schema(schema):
     return final_schema
 
 
+def schema_sdl(schema):
+    """
+    * SDL of a schema printed from the AST nodes it was built from, type
+    * extensions included, so that the directives applied to its fields, e.g.
+    * @relation, are kept; print_schema() drops them. Types and directives
+    * built without an AST node are printed as print_schema() does.
+    * @param {GraphQLSchema} schema
+    * @returns {string} SDL
+    """
+    definitions = [
+        print_ast(d.ast_node) if d.ast_node is not None else print_directive(d)
+        for d in schema.directives
+        if not is_specified_directive(d)
+    ]
+    if schema.ast_node is not None:
+        definitions.append(print_ast(schema.ast_node))
+    definitions += [print_ast(node) for node in schema.extension_ast_nodes]
+    for named_type in schema.type_map.values():
+        if is_introspection_type(named_type) or is_specified_scalar_type(named_type):
+            continue
+        if named_type.ast_node is None:
+            definitions.append(print_type(named_type))
+            continue
+        definitions.append(print_ast(named_type.ast_node))
+        definitions += [print_ast(node) for node in named_type.extension_ast_nodes]
+    return "\n\n".join(definitions)
+
+
 def types_to_augment(schema):
     """
     * Given a GraphQLSchema return an array of the type names,
@@ -91,6 +136,157 @@ def augment_types(types, schema, sdl):
     )
 
 
+def augment_ordering(types, schema, sdl):
+    """
+    * Generate an _<Type>Ordering enum (<field>_asc, <field>_desc) over the
+    * property fields of each type and add an `orderBy` argument to the Query
+    * fields and @relation fields returning lists of that type.
+    * @param {string[]} types
+    * @param schema
+    * @param {string} sdl
+    * @returns {string} SDL with orderBy arguments and ordering enums
+    """
+    orderings = {
+        t: ordering_values(schema.type_map[t])
+        for t in types
+        if ordering_values(schema.type_map[t])
+    }
+
+    def with_order_by(type_name, field):
+        schema_field = schema.type_map[type_name].fields.get(field.name.value)
+        ordering = orderable_type(schema_field, type_name == "Query")
+        if ordering not in orderings or "orderBy" in [
+            a.name.value for a in field.arguments
+        ]:
+            return field
+        order_by = InputValueDefinitionNode(
+            name=NameNode(value="orderBy"),
+            type=parse_type(f"[_{ordering}Ordering]"),
+            directives=(),
+        )
+        return FieldDefinitionNode(
+            name=field.name,
+            description=field.description,
+            arguments=(*field.arguments, order_by),
+            type=field.type,
+            directives=field.directives,
+        )
+
+    document = parse(sdl)
+    for definition in document.definitions:
+        if isinstance(definition, ObjectTypeDefinitionNode) and (
+            definition.name.value in types or definition.name.value == "Query"
+        ):
+            definition.fields = tuple(
+                with_order_by(definition.name.value, f) for f in definition.fields
+            )
+
+    return print_ast(document) + reduce_(
+        list(orderings.keys()),
+        lambda acc, t: acc
+        + f"\n\nenum _{t}Ordering {{ {' '.join(orderings[t])} }}",
+        "",
+    )
+
+
+def ordering_values(field_type):
+    return reduce_(
+        property_fields(field_type), lambda acc, f: [*acc, f"{f}_asc", f"{f}_desc"], []
+    )
+
+
+def property_fields(field_type):
+    """
+    * Names of the fields of a type stored as node properties: scalar and
+    * enum fields other than _id and @cypher fields.
+    """
+    return filter_(
+        list(field_type.fields.keys()),
+        lambda f: f != "_id"
+        and is_leaf_type(get_nullable_type(field_type.fields[f].type))
+        and not field_directive(field_type.fields[f], "cypher"),
+    )
+
+
+def orderable_type(field, is_query):
+    """
+    * Name of the type a list field can be ordered by: root query fields and
+    * @relation fields returning a list of objects.
+    """
+    if field is None or not is_list_type(get_nullable_type(field.type)):
+        return None
+    if not is_query and not field_directive(field, "relation"):
+        return None
+    return inner_type(field.type).name
+
+
+def field_directive(field, name):
+    return field.ast_node is not None and any(
+        d.name.value == name for d in field.ast_node.directives
+    )
+
+
+def augment_aggregates(types, schema, sdl):
+    """
+    * Generate type extensions adding <relation>Count and <relation>Aggregate
+    * fields for each @relation list field, and the _<Type>Aggregate types
+    * (count, min, max, avg over the related nodes' properties) they return.
+    * @param {string[]} types
+    * @param schema
+    * @param {string} sdl
+    * @returns {string} SDL with aggregate types and type extensions
+    """
+    aggregated = []
+    extensions = ""
+    for t in types:
+        fields = ""
+        for name, field in schema.type_map[t].fields.items():
+            related = orderable_type(field, False)
+            if related not in types:
+                continue
+            fields += f"{name}Count: Int {name}Aggregate: _{related}Aggregate "
+            if related not in aggregated:
+                aggregated.append(related)
+        if fields:
+            extensions += f"\n\nextend type {t} {{ {fields}}}"
+
+    return (
+        sdl
+        + reduce_(
+            aggregated,
+            lambda acc, t: acc + aggregate_types(schema.type_map[t]),
+            "",
+        )
+        + extensions
+    )
+
+
+def aggregate_types(field_type):
+    properties = property_fields(field_type)
+    numeric = filter_(
+        properties,
+        lambda f: inner_type(field_type.fields[f].type).name in ["Int", "Float"],
+    )
+
+    name = field_type.name
+    aggregate = "count: Int "
+    sdl = ""
+    if properties:
+        aggregate += f"min: _{name}AggregateValues max: _{name}AggregateValues "
+        values = reduce_(
+            properties,
+            lambda acc, f: acc + f"{f}: {inner_type(field_type.fields[f].type).name} ",
+            "",
+        )
+        sdl += f"\n\ntype _{name}AggregateValues {{ {values}}}"
+    if numeric:
+        aggregate += f"avg: _{name}Averages "
+        averages = reduce_(numeric, lambda acc, f: acc + f"{f}: Float ", "")
+        sdl += f"\n\ntype _{name}Averages {{ {averages}}}"
+
+    return f"\n\ntype _{name}Aggregate {{ {aggregate}}}" + sdl
+
+
 def augment_mutations(types, schema, sdl):
     # FIXME: requires placeholder Query type
     return (
@@ -0,0 +1,60 @@
+from collections.abc import Mapping
+
+from .utils import budget_directive, is_mutation, schema_type_by_name
+
+
+class ResultBudgetExceeded(Exception):
+    """Raised when the result of a field has more rows or bytes than allowed."""
+
+
+def result_budget(resolve_info, fetch_size=None, max_rows=None, max_bytes=None):
+    """
+    * (fetch_size, max_rows, max_bytes) of a neo4j_graphql() call: the values
+    * passed to the call, or else those of the field's @budget directive.
+    """
+    budget = field_budget(resolve_info)
+    return (
+        fetch_size if fetch_size is not None else budget.get("fetchSize"),
+        max_rows if max_rows is not None else budget.get("maxRows"),
+        max_bytes if max_bytes is not None else budget.get("maxBytes"),
+    )
+
+
+def field_budget(resolve_info):
+    """The arguments of the @budget directive of the root field being resolved."""
+    parent = schema_type_by_name(
+        resolve_info.schema, "Mutation" if is_mutation(resolve_info) else "Query"
+    )
+    return budget_directive(parent, resolve_info.field_name) if parent else {}
+
+
+def limit_records(result, max_rows=None, max_bytes=None):
+    """
+    * Iterate the records of a result while they are within the budget. Once
+    * it is exceeded the rest of the result is discarded, so the server stops
+    * streaming it, and ResultBudgetExceeded is raised.
+    """
+    rows = 0
+    size = 0
+    for record in result:
+        rows += 1
+        if max_rows is not None and rows > max_rows:
+            result.consume()
+            raise ResultBudgetExceeded(f"Result has more than {max_rows} rows")
+        if max_bytes is not None:
+            size += estimated_size(record)
+            if size > max_bytes:
+                result.consume()
+                raise ResultBudgetExceeded(f"Result is larger than {max_bytes} bytes")
+        yield record
+
+
+def estimated_size(value):
+    """Approximate size of a result value once serialized, in bytes."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, Mapping):
+        return sum(len(k) + estimated_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sum(estimated_size(item) for item in value)
+    return 8
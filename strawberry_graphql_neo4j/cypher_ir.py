@@ -0,0 +1,695 @@
+from dataclasses import dataclass, field
+from typing import Any, List, Optional
+
+
+def render_slice(first, offset):
+    if first is None and offset is None:
+        return ""
+    if offset is None:
+        return f"[..{first}]"
+    if first is None:
+        return f"[{offset}..]"
+    return f"[{offset}..{int(offset) + int(first)}]"
+
+
+def render_order_by(variable, order_by):
+    return ", ".join(f"{variable}.{name} {direction}" for name, direction in order_by)
+
+
+def _skip_limit(offset, first):
+    rendered = ""
+    if offset is not None:
+        rendered += f" SKIP {offset}"
+        if first is not None and int(first) > -1:
+            rendered += f" LIMIT {first}"
+    return rendered
+
+
+def _labels(variable, label):
+    """
+    * Predicate matching the labels of a node. Interfaces and unions have
+    * several labels joined by `|`, matched by a disjunction, which Neo4j 4
+    * supports unlike label expressions.
+    """
+    return " OR ".join(f"{variable}:{name}" for name in label.split("|"))
+
+
+def _node(variable, label, properties=""):
+    """Node pattern, without its labels when they need a WHERE predicate."""
+    node = variable if "|" in label else f"{variable}:{label}"
+    return f"({node} {properties})" if properties else f"({node})"
+
+
+def _where_labels(variable, label):
+    return f" WHERE {_labels(variable, label)}" if "|" in label else ""
+
+
+def _arrow(variable, rel_type, direction, nested_pattern):
+    return (
+        f"({variable}){'<' if direction in ['in', 'IN'] else ''}"
+        f"-[:{rel_type}]-{'>' if direction in ['out', 'OUT'] else ''}"
+        f"{nested_pattern}"
+    )
+
+
+def _nested(projection):
+    selection = projection.render() if projection is not None else ""
+    return f"{{{selection}}}" if selection else ""
+
+
+def _value(variable, projection):
+    """The projected value of a node: `movie {.title}`, or a LabelCase."""
+    if isinstance(projection, LabelCase):
+        return projection.render_value()
+    return f"{variable} {_nested(projection)}"
+
+
+# Projection items
+
+
+@dataclass
+class MetaField:
+    """Schema meta fields (__typename, ...) are not projected."""
+
+    name: str
+
+
+@dataclass
+class TypenameField:
+    """Object type of a LabelCase branch, read to resolve interfaces and unions."""
+
+    type_name: str
+    name: str = "__typename"
+
+    def render(self, comma):
+        return f' {self.name}: "{self.type_name}" {comma}'
+
+
+@dataclass
+class IdField:
+    name: str
+    variable: str
+
+    def render(self, comma):
+        return f"{self.name}: ID({self.variable}){comma}"
+
+
+@dataclass
+class PropertyField:
+    name: str
+
+    def render(self, comma):
+        return f" .{self.name} {comma}"
+
+
+@dataclass
+class CypherField:
+    """Single valued @cypher field, resolved with runFirstColumnSingle."""
+
+    name: str
+    statement: str
+    args: str
+
+    def render(self, comma):
+        return (
+            f'{self.name}: apoc.cypher.runFirstColumnSingle("{self.statement}", '
+            f"{self.args}){comma}"
+        )
+
+
+@dataclass
+class CypherListField:
+    """List valued @cypher field, resolved with runFirstColumnMany."""
+
+    name: str
+    statement: str
+    args: str
+    nested_variable: str
+    projection: Optional["Projection"] = None
+    single: bool = False
+    first: Any = None
+    offset: Any = None
+    # as in RelationField
+    owner: Optional[str] = None
+    fanout: Optional[int] = None
+
+    def render(self, comma):
+        return (
+            f'{self.name}: {"head(" if self.single else ""}'
+            f'[ {self.nested_variable} IN apoc.cypher.runFirstColumnMany("{self.statement}", '
+            f"{self.args}) | {_value(self.nested_variable, self.projection)}"
+            f"]{')' if self.single else ''}{render_slice(self.first, self.offset)} {comma}"
+        )
+
+
+@dataclass
+class RelationField:
+    """@relation field, translated to a pattern comprehension."""
+
+    name: str
+    variable: str
+    rel_type: str
+    direction: str
+    nested_variable: str
+    label: str
+    properties: str
+    projection: Optional["Projection"] = None
+    single: bool = False
+    first: Any = None
+    offset: Any = None
+    order_by: Any = None
+    # schema field, e.g. `Movie.actors`, and its @budget(fanout:) estimate
+    owner: Optional[str] = None
+    fanout: Optional[int] = None
+
+    def pattern(self):
+        return _arrow(
+            self.variable,
+            self.rel_type,
+            self.direction,
+            _node(self.nested_variable, self.label, self.properties),
+        ) + _where_labels(self.nested_variable, self.label)
+
+    def sorted_nodes(self):
+        """
+        * The related nodes in order, sorted by apoc.coll.sortMulti(), which
+        * sorts maps: each node is paired with its sort keys, and `^` marks
+        * the ascending ones. Pattern comprehensions can't be ordered.
+        """
+        sorted_variable = f"{self.nested_variable}_sorted"
+        keys = ", ".join(
+            f"{name}: {self.nested_variable}.{name}"
+            for name in dict.fromkeys(name for name, _ in self.order_by)
+        )
+        fields = ", ".join(
+            f'"{"^" if direction == "ASC" else ""}{name}"'
+            for name, direction in self.order_by
+        )
+        return (
+            f"[{sorted_variable} IN apoc.coll.sortMulti([{self.pattern()} | "
+            f"{{_node: {self.nested_variable}, {keys}}}], [{fields}]) | "
+            f"{sorted_variable}._node]"
+        )
+
+    def render(self, comma):
+        if self.order_by and not self.single:
+            # sorted and paginated before the nodes are projected
+            return (
+                f"{self.name}: [{self.nested_variable} IN {self.sorted_nodes()}"
+                f"{render_slice(self.first, self.offset)} | "
+                f"{_value(self.nested_variable, self.projection)}] {comma}"
+            )
+        return (
+            f"{self.name}: {'head(' if self.single else ''}"
+            f"[{self.pattern()} | {_value(self.nested_variable, self.projection)}"
+            f"]{')' if self.single else ''}{render_slice(self.first, self.offset)} {comma}"
+        )
+
+
+@dataclass
+class RelationSubqueryField(RelationField):
+    """
+    * @relation list field translated to a COLLECT subquery (Neo4j 5.6+), so
+    * that SKIP/LIMIT are applied while traversing instead of slicing the
+    * fully materialized pattern comprehension. Ordered fields sort the related
+    * nodes in the subquery before they are paginated and projected.
+    """
+
+    def render(self, comma):
+        parts = [f"MATCH {self.pattern()}"]
+        if self.order_by:
+            parts.append(
+                f"WITH {self.nested_variable} ORDER BY "
+                f"{render_order_by(self.nested_variable, self.order_by)}"
+            )
+        parts.append(f"RETURN {_value(self.nested_variable, self.projection)}".rstrip())
+        if self.offset is not None:
+            parts.append(f"SKIP {self.offset}")
+        if self.first is not None:
+            parts.append(f"LIMIT {self.first}")
+        return f"{self.name}: COLLECT {{ {' '.join(parts)} }} {comma}"
+
+
+@dataclass
+class RelationCountField:
+    """<relation>Count field, the size of a pattern comprehension."""
+
+    name: str
+    variable: str
+    rel_type: str
+    direction: str
+    label: str
+
+    def render(self, comma):
+        nested_variable = f"{self.variable}_{self.name}" if "|" in self.label else ""
+        pattern = _arrow(
+            self.variable,
+            self.rel_type,
+            self.direction,
+            _node(nested_variable, self.label),
+        ) + _where_labels(nested_variable, self.label)
+        return f"{self.name}: size([{pattern} | 1]) {comma}"
+
+
+@dataclass
+class RelationAggregateField:
+    """
+    * <relation>Aggregate field, aggregated over the list of related nodes
+    * built once by a pattern comprehension, without returning them.
+    * aggregates are (function, properties) pairs, properties is None for
+    * count. Like the aggregating functions, min, max and avg skip nulls, and
+    * are null without values.
+    """
+
+    name: str
+    variable: str
+    rel_type: str
+    direction: str
+    nested_variable: str
+    label: str
+    aggregates: List[Any] = field(default_factory=list)
+
+    def render(self, comma):
+        pattern = _arrow(
+            self.variable,
+            self.rel_type,
+            self.direction,
+            _node(self.nested_variable, self.label),
+        ) + _where_labels(self.nested_variable, self.label)
+        nodes = f"{self.nested_variable}_nodes"
+        values = []
+        for function, properties in self.aggregates:
+            if properties is None:
+                values.append(f"{function}: size({nodes})")
+                continue
+            aggregated = ", ".join(
+                f"{p}: {_aggregate(function, nodes, p)}" for p in properties
+            )
+            values.append(f"{function}: {{{aggregated}}}")
+        return (
+            f"{self.name}: head([{nodes} IN [[{pattern} | {self.nested_variable}]] | "
+            f"{{{', '.join(values)}}}]) {comma}"
+        )
+
+
+def _aggregate(function, nodes, property):
+    """min, max or avg of a property of a list of nodes."""
+    values = f"[n IN {nodes} WHERE n.{property} IS NOT NULL | n.{property}]"
+    if function == "avg":
+        return (
+            f"head([l IN [{values}] | CASE size(l) WHEN 0 THEN null "
+            f"ELSE reduce(s = 0.0, v IN l | s + v) / size(l) END])"
+        )
+    compare = "<" if function == "min" else ">"
+    return (
+        f"reduce(m = null, v IN {values} | "
+        f"CASE WHEN m IS NULL OR v {compare} m THEN v ELSE m END)"
+    )
+
+
+@dataclass
+class VectorField:
+    """
+    * @vector field: the nearest neighbours of the node in a vector index,
+    * searched with the node's own embedding. The node itself is the closest
+    * match of its embedding, so one more neighbour is read and it is skipped.
+    """
+
+    name: str
+    variable: str
+    index: str
+    property: str
+    k: int
+    nested_variable: str
+    projection: Optional["Projection"] = None
+    single: bool = False
+    first: Any = None
+    offset: Any = None
+    # as in RelationField
+    owner: Optional[str] = None
+    fanout: Optional[int] = None
+
+    def render(self, comma):
+        parts = [
+            f'CALL db.index.vector.queryNodes("{self.index}", {int(self.k) + 1}, '
+            f"{self.variable}.{self.property}) YIELD node AS {self.nested_variable}",
+            f"WHERE {self.nested_variable} <> {self.variable}",
+            f"RETURN {_value(self.nested_variable, self.projection)}".rstrip(),
+        ]
+        if self.offset is not None:
+            parts.append(f"SKIP {self.offset}")
+        if self.first is not None and int(self.first) > -1:
+            parts.append(f"LIMIT {self.first}")
+        neighbours = f"COLLECT {{ {' '.join(parts)} }}"
+        if self.single:
+            neighbours = f"head({neighbours})"
+        return f"{self.name}: {neighbours} {comma}"
+
+
+@dataclass
+class NestedField:
+    """List of objects stored on the node itself, without @relation."""
+
+    name: str
+    variable: str
+    projection: Optional["Projection"] = None
+    single: bool = False
+    first: Any = None
+    offset: Any = None
+    # as in RelationField
+    owner: Optional[str] = None
+    fanout: Optional[int] = None
+
+    def render(self, comma):
+        return (
+            f" {self.name}: {'head(' if self.single else ''}"
+            f"[{self.name} in {self.variable}.{self.name} | {self.name} {_nested(self.projection)}"
+            f"]{')' if self.single else ''}{render_slice(self.first, self.offset)} {comma}"
+        )
+
+
+@dataclass
+class Projection:
+    items: List[Any] = field(default_factory=list)
+
+    def render(self, initial=""):
+        rendered = initial
+        last = len(self.items) - 1
+        for index, item in enumerate(self.items):
+            if isinstance(item, MetaField):
+                if index == last:
+                    rendered = rendered[1 : rendered.rfind(",")]
+                continue
+            rendered += item.render("," if index < last else "")
+        return rendered
+
+
+@dataclass
+class LabelCase:
+    """
+    * Projection of an interface or union typed node: one branch projection
+    * per object type, chosen by the labels of the node.
+    """
+
+    variable: str
+    branches: List[Any] = field(default_factory=list)
+
+    @property
+    def items(self):
+        return [item for _, branch in self.branches for item in branch.items]
+
+    def render(self, initial=""):
+        """
+        * Map projection of values without labels, e.g. the maps of a field
+        * stored on the node: the fields of every branch, and the __typename
+        * stored with the value to resolve its type.
+        """
+        items = [PropertyField("__typename")]
+        for _, branch in self.branches:
+            for item in branch.items:
+                if not isinstance(item, TypenameField) and item not in items:
+                    items.append(item)
+        return Projection(items).render(initial)
+
+    def render_value(self):
+        cases = " ".join(
+            f"WHEN {self.variable}:{label} THEN {self.variable} {_nested(branch)}"
+            for label, branch in self.branches
+        )
+        return f"CASE {cases} END"
+
+
+# Statement clauses
+
+
+@dataclass
+class Match:
+    variable: str
+    label: str
+    properties: str
+
+    def render(self):
+        if "|" in self.label:
+            # the WITH lets the clauses after it start their own WHERE
+            return (
+                f"MATCH {_node(self.variable, self.label, self.properties)}"
+                f"{_where_labels(self.variable, self.label)} WITH {self.variable} "
+            )
+        return f"MATCH ({self.variable}:{self.label} {self.properties}) "
+
+
+@dataclass
+class WhereId:
+    variable: str
+    id: Any
+
+    def render(self):
+        return f"WHERE ID({self.variable})={self.id} "
+
+
+@dataclass
+class UnwindCypher:
+    """Root field with a @cypher directive."""
+
+    statement: str
+    args: str
+    variable: str
+
+    def render(self):
+        return (
+            f'WITH apoc.cypher.runFirstColumnMany("{self.statement}", {self.args}) AS x '
+            f"UNWIND x AS {self.variable} "
+        )
+
+
+@dataclass
+class Since:
+    """
+    * Nodes after the cursor ($watermark, $watermarkId) in (watermark, node id)
+    * order, all while $watermark is null. The node id breaks the ties of
+    * nodes sharing a watermark value across pages.
+    """
+
+    variable: str
+    watermark: str
+
+    def render(self):
+        property = f"{self.variable}.{self.watermark}"
+        return (
+            f"WHERE $watermark IS NULL OR {property} > $watermark "
+            f"OR ({property} = $watermark AND ID({self.variable}) > $watermarkId) "
+        )
+
+
+@dataclass
+class VectorSearch:
+    """Root field with a @vector directive, searched with the $vector argument."""
+
+    index: str
+    k: int
+    variable: str
+
+    def render(self):
+        return (
+            f'CALL db.index.vector.queryNodes("{self.index}", {self.k}, $vector) '
+            f"YIELD node AS {self.variable} "
+        )
+
+
+@dataclass
+class UnwindKeys:
+    """Batched lookup of the nodes for a list of keys passed as $keys."""
+
+    variable: str
+
+    def render(self):
+        return f"UNWIND $keys AS {self.variable} "
+
+
+@dataclass
+class UnwindIds:
+    """The nodes of a list of node ids passed as $ids, for split queries."""
+
+    variable: str
+
+    def render(self):
+        return f"UNWIND $ids AS id MATCH ({self.variable}) WHERE ID({self.variable}) = id "
+
+
+@dataclass
+class CallCypherDoIt:
+    """Mutation field with a @cypher directive."""
+
+    statement: str
+    args: str
+    variable: str
+
+    def render(self):
+        return (
+            f'CALL apoc.cypher.doIt("{self.statement}", {self.args}) YIELD value '
+            f"WITH apoc.map.values(value, [keys(value)[0]])[0] AS {self.variable} "
+        )
+
+
+@dataclass
+class Create:
+    variable: str
+    label: str
+
+    def render(self):
+        return f"CREATE ({self.variable}:{self.label}) "
+
+
+@dataclass
+class SetParams:
+    variable: str
+
+    def render(self):
+        return f"SET {self.variable} = $params "
+
+
+@dataclass
+class CreateRelationship:
+    from_variable: str
+    rel_type: str
+    to_variable: str
+
+    def render(self):
+        return f"CREATE ({self.from_variable})-[:{self.rel_type}]->({self.to_variable}) "
+
+
+@dataclass
+class OrderBy:
+    """
+    * Sort and paginate the matched nodes before they are projected, so the
+    * ordering can be backed by an index and SKIP/LIMIT become a top-k.
+    """
+
+    variable: str
+    order_by: List[Any]
+    offset: Any = None
+    first: Any = -1
+    # ties are ordered by node id, for a stable cursor
+    by_id: bool = False
+
+    def render(self):
+        return (
+            f"WITH {self.variable} ORDER BY "
+            f"{render_order_by(self.variable, self.order_by)}"
+            f"{f', ID({self.variable}) ASC' if self.by_id else ''}"
+            f"{_skip_limit(self.offset, self.first)} "
+        )
+
+
+@dataclass
+class Return:
+    variable: str
+    projection: Optional[Projection] = None
+    offset: Any = None
+    first: Any = -1
+    key: Optional[str] = None
+
+    def render(self):
+        rendered = "RETURN "
+        if self.key is not None:
+            rendered += f"{self.key}, "
+        if isinstance(self.projection, LabelCase):
+            rendered += f"{self.projection.render_value()} "
+        else:
+            rendered += f"{self.variable} "
+            if self.projection is not None:
+                rendered += f"{{{self.projection.render()}}} "
+        rendered += f"AS {self.variable}"
+        return rendered + _skip_limit(self.offset, self.first)
+
+
+@dataclass
+class Statement:
+    clauses: List[Any] = field(default_factory=list)
+
+    def render(self):
+        return "".join(clause.render() for clause in self.clauses)
+
+
+@dataclass
+class UnwindAliases(Statement):
+    """
+    * Aliases of a root field that differ only in their filter arguments, run
+    * in one statement: the field's clauses run once per row of $aliases and
+    * the rows are returned with the response key of their alias.
+    """
+
+    variable: str = ""
+
+    def render(self):
+        return (
+            f"UNWIND $aliases AS alias CALL {{ WITH alias {super().render()} }} "
+            f"RETURN alias.key AS key, {self.variable}"
+        )
+
+
+# Optimization passes
+
+
+def projections(node):
+    """Yield every Projection of a statement or projection tree."""
+    if isinstance(node, Statement):
+        for clause in node.clauses:
+            yield from projections(clause)
+        return
+    projection = node if isinstance(node, Projection) else getattr(node, "projection", None)
+    if projection is None:
+        return
+    if isinstance(projection, LabelCase):
+        for _, branch in projection.branches:
+            yield from projections(branch)
+        return
+    yield projection
+    for item in projection.items:
+        if getattr(item, "projection", None) is not None:
+            yield from projections(item.projection)
+
+
+def dedupe_projections(statement):
+    """Drop repeated identical items (e.g. `{ title title }`) from projections."""
+    for projection in projections(statement):
+        items = []
+        for item in projection.items:
+            if isinstance(item, MetaField) or item not in items:
+                items.append(item)
+        projection.items = items
+    return statement
+
+
+def push_down_limits(statement):
+    """
+    * Paginated @relation list fields are traversed in a COLLECT subquery with
+    * SKIP/LIMIT, so nested pagination costs O(first) instead of O(degree).
+    """
+    for projection in projections(statement):
+        projection.items = [
+            RelationSubqueryField(**vars(item))
+            if type(item) is RelationField and not item.single and item.first is not None
+            else item
+            for item in projection.items
+        ]
+    return statement
+
+
+DEFAULT_PASSES = ()
+
+
+def optimize(statement, passes=DEFAULT_PASSES):
+    for optimization_pass in passes:
+        statement = optimization_pass(statement)
+    return statement
+
+
+def render(statement, passes=DEFAULT_PASSES):
+    """
+    * Render a statement to Cypher text after running the optimization passes.
+    * With no passes the text is the same as the one the translation produced
+    * by string concatenation before the IR existed.
+    """
+    return optimize(statement, passes).render()
+
@@ -0,0 +1,145 @@
+import functools
+import logging
+import threading
+import time
+
+from neo4j import Query
+
+from .budget import field_budget
+from .utils import context_value
+
+CONTEXT_KEY = "neo4j_deadline"
+
+# transaction metadata key identifying the transactions of a call
+CALL_KEY = "neo4j_graphql_call"
+
+# the smallest timeout sent to the server, which reads 0 as no timeout
+MIN_TIMEOUT = 0.001
+
+TIMED_OUT_CODES = (
+    "Neo.ClientError.Transaction.TransactionTimedOut",
+    "Neo.ClientError.Transaction.TransactionTimedOutClientConfiguration",
+)
+
+logger = logging.getLogger("neo4j_graphql_py")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a database call can't complete before its deadline."""
+
+
+class Deadline:
+    """
+    * The time by which a request must be answered, set when it starts:
+    *
+    *   context = {"driver": driver, "neo4j_deadline": Deadline(2.0)}
+    *
+    * Every database call of the request runs with the time left as its
+    * transaction timeout, so the server aborts the work nobody waits for.
+    * A cancelled deadline has no time left.
+    """
+
+    def __init__(self, timeout=None, expires_at=None):
+        if timeout is not None:
+            expires_at = time.monotonic() + timeout
+        self.expires_at = expires_at
+        self.cancelled = False
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    def remaining(self):
+        """Seconds left, None without a time limit."""
+        if self.cancelled:
+            return 0.0
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def check(self):
+        """Raise DeadlineExceeded once no time is left."""
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(
+                "Request cancelled" if self.cancelled else "Request deadline exceeded"
+            )
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """
+        * Call callback when the deadline is cancelled, at once if it already
+        * is. Returns a function unregistering it.
+        """
+        with self._lock:
+            if not self.cancelled:
+                self._callbacks.append(callback)
+                return functools.partial(self._discard, callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def child(self):
+        """A deadline expiring with this one, which can be cancelled alone."""
+        return Deadline(expires_at=self.expires_at)
+
+
+def request_deadline(context, deadline=None):
+    """deadline, or else the Deadline in context["neo4j_deadline"]."""
+    return deadline if deadline is not None else context_value(context, CONTEXT_KEY)
+
+
+def transaction_timeout(resolve_info, deadline=None, timeout=None):
+    """
+    * Transaction timeout of a neo4j_graphql() call in seconds: the smaller of
+    * the call's timeout, or else the field's @budget(timeout:), and the time
+    * left before deadline; None without either. Raises DeadlineExceeded
+    * once the deadline has passed.
+    """
+    if timeout is None:
+        timeout = field_budget(resolve_info).get("timeout")
+    remaining = deadline.remaining() if deadline is not None else None
+    if remaining is not None:
+        deadline.check()
+        timeout = remaining if timeout is None else min(timeout, remaining)
+    return None if timeout is None else max(float(timeout), MIN_TIMEOUT)
+
+
+def neo4j_query(query, timeout=None, metadata=None):
+    """query as passed to Session.run(), with its transaction configuration."""
+    if timeout is None and not metadata:
+        return query
+    return Query(query, metadata=metadata, timeout=timeout)
+
+
+def timed_out(error):
+    return getattr(error, "code", None) in TIMED_OUT_CODES
+
+
+def terminate_transactions(driver, call):
+    """
+    * Terminate the running transactions of a call, found by their metadata.
+    * Requires Neo4j 5; the error, if any, is logged.
+    """
+    try:
+        with driver.session() as session:
+            ids = [
+                record["transactionId"]
+                for record in session.run(
+                    "SHOW TRANSACTIONS YIELD transactionId, metaData "
+                    f"WHERE metaData.{CALL_KEY} = $call RETURN transactionId",
+                    call=call,
+                )
+            ]
+            if ids:
+                session.run("TERMINATE TRANSACTIONS $ids", ids=ids).consume()
+    except Exception:
+        logger.exception("Could not terminate the transactions of call %s", call)
@@ -0,0 +1,144 @@
+import math
+import threading
+import time
+
+from neo4j import GraphDatabase
+
+
+def recommended_pool_size(concurrency, root_field_workers=1, headroom=0.25):
+    """
+    * Connections a process needs so that requests never wait on the pool.
+    *
+    * concurrency is the number of requests a worker process serves at once
+    * (its threads, or the concurrent requests of an async worker), and
+    * root_field_workers the max_workers of thread_pool_execution_context(), as
+    * each root field of a request holds its own connection while it runs.
+    * The pool is per process: the database sees this times the process count.
+    """
+    return max(1, math.ceil(concurrency * max(1, root_field_workers) * (1 + headroom)))
+
+
+class ManagedDriver:
+    """
+    * neo4j.Driver wrapper created once per worker process at startup.
+    *
+    * warm_up() opens connections ahead of the first requests, so they don't
+    * pay connection setup and TLS handshakes. pool_metrics() reports the
+    * connections in use and idle and the time spent acquiring connections,
+    * which includes waiting for a free connection once the pool is saturated.
+    * Everything else is delegated to the wrapped driver.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self._lock = threading.Lock()
+        self._acquisitions = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._instrument_pool()
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def session(self, **config):
+        return self.driver.session(**config)
+
+    def close(self):
+        self.driver.close()
+
+    def warm_up(self, connections):
+        """Open `connections` connections by holding as many transactions at once."""
+        sessions = []
+        try:
+            for _ in range(connections):
+                session = self.driver.session()
+                sessions.append(session)
+                session.begin_transaction()
+        finally:
+            for session in sessions:
+                session.close()
+
+    def pool_metrics(self):
+        pool = getattr(self.driver, "_pool", None)
+        connections = [
+            connection
+            for address_connections in list(getattr(pool, "connections", {}).values())
+            for connection in list(address_connections)
+        ]
+        in_use = sum(1 for connection in connections if connection.in_use)
+        with self._lock:
+            return {
+                "max_size": getattr(
+                    getattr(pool, "pool_config", None), "max_connection_pool_size", None
+                ),
+                "in_use": in_use,
+                "idle": len(connections) - in_use,
+                "acquisitions": self._acquisitions,
+                "wait_time": self._wait_time,
+                "max_wait_time": self._max_wait_time,
+            }
+
+    def _instrument_pool(self):
+        pool = getattr(self.driver, "_pool", None)
+        acquire = getattr(pool, "_acquire", None)
+        if acquire is None:
+            return
+
+        def timed_acquire(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return acquire(*args, **kwargs)
+            finally:
+                self._record_wait(time.perf_counter() - start)
+
+        pool._acquire = timed_acquire
+
+    def _record_wait(self, seconds):
+        with self._lock:
+            self._acquisitions += 1
+            self._wait_time += seconds
+            self._max_wait_time = max(self._max_wait_time, seconds)
+
+
+def managed_driver(
+    uri,
+    auth=None,
+    concurrency=None,
+    root_field_workers=1,
+    warm_connections=None,
+    verify=True,
+    **config,
+):
+    """
+    * Create a driver for a worker process at startup.
+    *
+    * Unless max_connection_pool_size is given, the pool is sized with
+    * recommended_pool_size(concurrency, root_field_workers). Connectivity is
+    * verified, and warm_connections connections (by default the concurrency)
+    * are opened before the driver is returned.
+    """
+    if concurrency is not None:
+        config.setdefault(
+            "max_connection_pool_size",
+            recommended_pool_size(concurrency, root_field_workers),
+        )
+    driver = ManagedDriver(GraphDatabase.driver(uri, auth=auth, **config))
+    try:
+        if verify:
+            driver.verify_connectivity()
+        if warm_connections is None:
+            warm_connections = concurrency or 0
+        max_size = config.get("max_connection_pool_size")
+        if max_size is not None and max_size > 0:
+            warm_connections = min(warm_connections, max_size)
+        driver.warm_up(warm_connections)
+    except Exception:
+        driver.close()
+        raise
+    return driver
@@ -0,0 +1,188 @@
+from asyncio import gather
+from concurrent.futures import ThreadPoolExecutor
+
+from graphql import ExecutionContext, GraphQLError, OperationType, is_non_null_type
+from graphql.execution.collect_fields import collect_fields
+from graphql.pyutils import Path, Undefined
+
+from .deadlines import CONTEXT_KEY as DEADLINE_KEY, MIN_TIMEOUT
+
+TRANSACTION_KEY = "neo4j_transaction"
+
+
+class ThreadPoolExecutionContext(ExecutionContext):
+    """
+    * graphql-core execution context that resolves the root fields of a query
+    * operation concurrently on a bounded thread pool.
+    *
+    * Root query fields are independent of each other, so their neo4j_graphql
+    * calls can share the driver's connection pool and run in parallel; the
+    * wall-clock latency of the operation becomes that of the slowest field.
+    * Nested fields and mutations are executed as usual.
+    """
+
+    executor = None
+
+    def execute_fields(self, parent_type, source_value, path, fields):
+        if path is not None or self.executor is None or len(fields) < 2:
+            return super().execute_fields(parent_type, source_value, path, fields)
+
+        futures = {
+            response_name: self.executor.submit(
+                self.execute_field,
+                parent_type,
+                source_value,
+                field_nodes,
+                Path(path, response_name, parent_type.name),
+            )
+            for response_name, field_nodes in fields.items()
+        }
+
+        results = {}
+        awaitable_fields = []
+        for response_name, future in futures.items():
+            result = future.result()
+            if result is not Undefined:
+                results[response_name] = result
+                if self.is_awaitable(result):
+                    awaitable_fields.append(response_name)
+
+        if not awaitable_fields:
+            return results
+
+        async def get_results():
+            results.update(
+                zip(
+                    awaitable_fields,
+                    await gather(*(results[field] for field in awaitable_fields)),
+                )
+            )
+            return results
+
+        return get_results()
+
+
+def thread_pool_execution_context(max_workers=4, executor=None):
+    """
+    * Build a ThreadPoolExecutionContext subclass bound to its own pool.
+    *
+    * The pool is shared by all operations executed with the returned class, so
+    * max_workers bounds the number of concurrent root field resolutions per
+    * process. The driver's max_connection_pool_size should be at least
+    * max_workers, otherwise the threads wait on connection acquisition.
+    """
+    if executor is None:
+        executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="neo4j_graphql"
+        )
+
+    return type(
+        "BoundThreadPoolExecutionContext",
+        (ThreadPoolExecutionContext,),
+        {"executor": executor},
+    )
+
+
+class TransactionExecutionContext(ExecutionContext):
+    """
+    * graphql-core execution context that runs the neo4j_graphql fields of a
+    * mutation operation in one explicit write transaction.
+    *
+    * The fields run in document order, as mutations always do, through the
+    * transaction stored in the context under "neo4j_transaction". The
+    * transaction is committed once after the last field, or rolled back if
+    * any field failed, so the operation is all-or-nothing: the fields that
+    * ran before the failure are nulled with a rolled back error. With a Deadline
+    * in context["neo4j_deadline"] the time left becomes its timeout.
+    """
+
+    def execute_operation(self, operation, root_value):
+        context = self.context_value
+        if (
+            operation.operation != OperationType.MUTATION
+            or not isinstance(context, dict)
+            or context.get("driver") is None
+        ):
+            return super().execute_operation(operation, root_value)
+
+        # the transaction times out with the deadline of the request, if any
+        deadline = context.get(DEADLINE_KEY)
+        remaining = deadline.remaining() if deadline is not None else None
+        session = context["driver"].session()
+        transaction = session.begin_transaction(
+            timeout=None if remaining is None else max(remaining, MIN_TIMEOUT)
+        )
+        context[TRANSACTION_KEY] = transaction
+
+        try:
+            result = super().execute_operation(operation, root_value)
+        except Exception:
+            self._end_transaction(session, transaction, commit=False)
+            raise
+
+        if not self.is_awaitable(result):
+            return self._complete_operation(operation, session, transaction, result)
+
+        async def await_result():
+            try:
+                data = await result
+            except Exception:
+                self._end_transaction(session, transaction, commit=False)
+                raise
+            return self._complete_operation(operation, session, transaction, data)
+
+        return await_result()
+
+    def _complete_operation(self, operation, session, transaction, data):
+        if not self._errors():
+            self._end_transaction(session, transaction, commit=True)
+            return data
+        self._end_transaction(session, transaction, commit=False)
+        return self._rolled_back(operation, data)
+
+    def _rolled_back(self, operation, data):
+        """
+        * The data of a rolled back operation: the fields that succeeded are
+        * nulled, with an error each, as their changes were not committed.
+        """
+        if data is None:
+            return None
+        root_type = self.schema.get_root_type(operation.operation)
+        root_fields = collect_fields(
+            self.schema,
+            self.fragments,
+            self.variable_values,
+            root_type,
+            operation.selection_set,
+        )
+        errors = self._errors()
+        failed = {error.path[0] for error in errors if error.path}
+        non_null = False
+        for response_name, field_nodes in root_fields.items():
+            field = root_type.fields.get(field_nodes[0].name.value)
+            non_null = non_null or (field is not None and is_non_null_type(field.type))
+            if response_name in data and response_name not in failed:
+                errors.append(
+                    GraphQLError(
+                        "Mutation rolled back because another field failed",
+                        field_nodes,
+                        path=[response_name],
+                    )
+                )
+        return None if non_null else {response_name: None for response_name in data}
+
+    def _errors(self):
+        collected_errors = getattr(self, "collected_errors", None)
+        return collected_errors.errors if collected_errors else self.errors
+
+    def _end_transaction(self, session, transaction, commit):
+        del self.context_value[TRANSACTION_KEY]
+        try:
+            if commit:
+                transaction.commit()
+            else:
+                transaction.rollback()
+        except Exception as e:
+            raise GraphQLError(f"Mutation transaction failed: {e}", original_error=e)
+        finally:
+            session.close()
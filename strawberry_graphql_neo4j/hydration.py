@@ -0,0 +1,215 @@
+import weakref
+from collections.abc import Mapping
+from dataclasses import MISSING, fields
+
+from graphql import GraphQLSchema
+
+from .utils import is_array_type, type_identifiers, type_name
+
+EAGER = "eager"
+LAZY = "lazy"
+RAW = "raw"
+
+_hydrators = weakref.WeakKeyDictionary()
+
+
+class Hydrator:
+    """
+    * Builds Strawberry objects from query results in a single pass.
+    *
+    * Values are read straight from the driver's records: map projections,
+    * lists and nodes are walked once into the target types without copying
+    * them with Record.data() first. The dataclass fields of every type and
+    * the schema types of its nested fields are looked up once per schema.
+    * Interface and union values are built into the class of the object type
+    * named by their __typename.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._fields = {}
+        self._nested = {}
+        self._classes = {}
+
+    def hydrate(self, type_def, value):
+        if isinstance(value, Mapping):
+            klass = self.value_class(type_def, value)
+            field_names = self.field_names(klass)
+            initialized = {}
+            for k, v in value.items():
+                if k not in field_names:
+                    continue
+                if isinstance(v, (Mapping, list)):
+                    initialized[k] = self.hydrate(self.nested_type(klass, k), v)
+                else:
+                    initialized[k] = v
+
+            return klass(**initialized)
+        elif isinstance(value, list):
+            return [self.hydrate(type_def, item) for item in value]
+        return value
+
+    def value_class(self, type_def, value):
+        typename = value.get("__typename")
+        if typename is None:
+            return self.target_class(type_def)
+        if typename not in self._classes:
+            self._classes[typename] = self.schema.get_type_by_name(typename).origin
+        return self._classes[typename]
+
+    @staticmethod
+    def target_class(type_def):
+        klass = type_def
+
+        if getattr(type_def, "origin", None):
+            klass = type_def.origin
+
+        if getattr(type_def, "of_type", None):
+            klass = type_def.of_type
+
+        return klass
+
+    def field_names(self, klass):
+        if klass not in self._fields:
+            self._fields[klass] = frozenset(field.name for field in fields(klass))
+        return self._fields[klass]
+
+    def nested_type(self, klass, field_name):
+        key = (klass, field_name)
+        if key not in self._nested:
+            field_type = (
+                self.schema.get_type_by_name(klass.__name__).get_field(field_name).type
+            )
+            if is_array_type(field_type):
+                field_type = field_type.of_type
+            self._nested[key] = field_type
+        return self._nested[key]
+
+
+class LazyHydrator(Hydrator):
+    """
+    * Builds instances of a lazy subclass of each Strawberry type holding the
+    * result map. A field is hydrated from the map the first time it is read,
+    * so nested objects the executor never reaches are never constructed.
+    * Instances are still instances of the Strawberry type, for is_type_of
+    * and resolve_type checks.
+    """
+
+    def __init__(self, schema):
+        super().__init__(schema)
+        self._lazy_classes = {}
+
+    def hydrate(self, type_def, value):
+        if isinstance(value, Mapping):
+            klass = self.value_class(type_def, value)
+            instance = object.__new__(self.lazy_class(klass))
+            instance.__dict__["_neo4j_result"] = value
+            return instance
+        elif isinstance(value, list):
+            return [self.hydrate(type_def, item) for item in value]
+        return value
+
+    def lazy_class(self, klass):
+        if klass not in self._lazy_classes:
+            self._lazy_classes[klass] = type(
+                klass.__name__,
+                (klass,),
+                {
+                    "__getattribute__": self._lazy_getattribute(klass),
+                    "__module__": klass.__module__,
+                    "__qualname__": klass.__qualname__,
+                },
+            )
+        return self._lazy_classes[klass]
+
+    def _lazy_getattribute(self, klass):
+        hydrator = self
+        defaults = {field.name: field for field in fields(klass)}
+
+        def __getattribute__(instance, name):
+            if name in defaults:
+                values = object.__getattribute__(instance, "__dict__")
+                if name not in values:
+                    result = values["_neo4j_result"]
+                    if name in result:
+                        value = result[name]
+                        if isinstance(value, (Mapping, list)):
+                            value = hydrator.hydrate(
+                                hydrator.nested_type(klass, name), value
+                            )
+                    else:
+                        value = _default(defaults[name])
+                    values[name] = value
+                return values[name]
+            return object.__getattribute__(instance, name)
+
+        return __getattribute__
+
+
+def _default(field):
+    if field.default is not MISSING:
+        return field.default
+    if field.default_factory is not MISSING:
+        return field.default_factory()
+    return None
+
+
+HYDRATORS = {EAGER: Hydrator, LAZY: LazyHydrator}
+RESULT_MODES = (EAGER, LAZY, RAW)
+
+
+def default_result_mode(schema):
+    """Plain graphql-core schemas have no classes to hydrate into."""
+    return RAW if isinstance(schema, GraphQLSchema) else EAGER
+
+
+def hydrator(schema, mode=EAGER):
+    if mode not in HYDRATORS:
+        raise ValueError(f"Unknown result mode: {mode}")
+    try:
+        hydrators = _hydrators.setdefault(schema, {})
+    except TypeError:
+        # schemas that can't be weakly referenced don't share a cache
+        return HYDRATORS[mode](schema)
+    if mode not in hydrators:
+        hydrators[mode] = HYDRATORS[mode](schema)
+    return hydrators[mode]
+
+
+def result_type(resolve_info):
+    type_def = (
+        resolve_info.return_type.of_type
+        if getattr(resolve_info.return_type, "of_type", None)
+        else resolve_info.return_type
+    )
+    return resolve_info.schema.get_type_by_name(type_name(type_def))
+
+
+def hydrate(resolve_info, data):
+    """Build instances of the Strawberry return type from query result maps."""
+    return hydrator(resolve_info.schema).hydrate(result_type(resolve_info), data)
+
+
+def hydrate_records(resolve_info, records, mode=EAGER):
+    """
+    * Single pass equivalent of hydrate(resolve_info, extract_query_result(...)):
+    * the returned variable is read from each record and hydrated directly.
+    * In raw mode the projected maps are returned as they are, for schemas
+    * resolving fields from dicts (make_executable_schema, Ariadne).
+    """
+    if mode not in RESULT_MODES:
+        raise ValueError(f"Unknown result mode: {mode}")
+
+    variable_name = type_identifiers(resolve_info.return_type).get("variable_name")
+    if mode == RAW:
+        values = (record.get(variable_name) for record in records)
+    else:
+        type_def = result_type(resolve_info)
+        result_hydrator = hydrator(resolve_info.schema, mode)
+        values = (
+            result_hydrator.hydrate(type_def, record.get(variable_name))
+            for record in records
+        )
+    if is_array_type(resolve_info.return_type):
+        return list(values)
+    return next(values, None)
@@ -0,0 +1,222 @@
+import asyncio
+from functools import partial
+
+from .cypher_ir import Match, Return, Statement, UnwindKeys, render
+from .hydration import default_result_mode, hydrate_records
+from .main import cypher_passes
+from .selections import root_projection
+from .single_flight import flight_key, single_flight
+from .utils import (
+    context_value,
+    is_array_type,
+    node_label,
+    schema_type_by_name,
+    type_identifiers,
+)
+
+CONTEXT_KEY = "neo4j_loaders"
+
+# keys announced by parent resolvers, by loader
+DEFERRED_KEY = "neo4j_deferred_keys"
+
+
+class NodeLoader:
+    """
+    * Loads the nodes for a field resolved by key in custom resolvers with one
+    * query per batch of keys:
+    *
+    *   UNWIND $keys AS key MATCH (person:Person {id: key})
+    *   RETURN key, person { .name } AS person
+    *
+    * The projection is built from the selection of the field being resolved,
+    * like neo4j_graphql() does for root fields. Loaded nodes are cached for
+    * the lifetime of the loader, missing keys resolve to None.
+    *
+    * load_async() collects the keys requested within one tick of the event
+    * loop into a single batch. Sync executions resolve fields depth first, so
+    * there is no tick to batch in: the keys of the objects are deferred
+    * ahead, e.g. by the parent resolver with defer_keys(), and the first
+    * load() fetches them all, with its own, in one query.
+    *
+    * With a SingleFlight, identical batches loaded at the same time by other
+    * requests share one query.
+    """
+
+    def __init__(
+        self,
+        driver,
+        resolve_info,
+        key="id",
+        label=None,
+        passes=(),
+        flight=None,
+        result_mode=None,
+    ):
+        type_ident = type_identifiers(resolve_info.return_type)
+        self.driver = driver
+        self.resolve_info = resolve_info
+        self.key = key
+        self.type_name = type_ident.get("type_name")
+        self.schema_type = schema_type_by_name(resolve_info.schema, self.type_name)
+        self.label = label or node_label(resolve_info.schema, self.schema_type)
+        self.variable_name = type_ident.get("variable_name")
+        self.passes = passes
+        self.flight = flight
+        self.result_mode = result_mode or default_result_mode(resolve_info.schema)
+        self._query = None
+        self._cache = {}
+        self._batch = None
+        self._deferred = {}
+
+    def query(self):
+        if self._query is None:
+            projection = root_projection(
+                self.resolve_info, self.variable_name, self.schema_type, []
+            )
+            statement = Statement(
+                [
+                    UnwindKeys("key"),
+                    Match(self.variable_name, self.label, f"{{{self.key}: key}}"),
+                    Return(self.variable_name, projection, key="key"),
+                ]
+            )
+            self._query = render(statement, self.passes)
+        return self._query
+
+    def load(self, key):
+        return self.load_many([key])[0]
+
+    def load_many(self, keys):
+        missing = [key for key in dict.fromkeys(keys) if key not in self._cache]
+        if missing:
+            missing = self._with_deferred(missing)
+            self._cache.update(self._fetch(missing))
+        return [self._cache.get(key) for key in keys]
+
+    def defer(self, keys):
+        """Load keys with the next batch, without waiting for them."""
+        self._deferred.update(dict.fromkeys(keys))
+
+    async def load_async(self, key):
+        if key in self._cache:
+            return self._cache[key]
+
+        if self._batch is None:
+            # dispatched once the resolvers already scheduled have run
+            self._batch = {}
+            asyncio.get_running_loop().create_task(self._dispatch())
+        if key not in self._batch:
+            self._batch[key] = asyncio.get_running_loop().create_future()
+        return await self._batch[key]
+
+    async def load_many_async(self, keys):
+        return await asyncio.gather(*(self.load_async(key) for key in keys))
+
+    def prime(self, key, value):
+        self._cache.setdefault(key, value)
+
+    def clear(self, key=None):
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    async def _dispatch(self):
+        batch, self._batch = self._batch, None
+        keys = self._with_deferred(list(batch))
+        try:
+            if self.flight is None:
+                nodes = await asyncio.get_running_loop().run_in_executor(
+                    None, self._fetch_nodes, keys
+                )
+            else:
+                nodes = await self.flight.do_async(
+                    self._flight_key(keys), partial(self._fetch_nodes, keys)
+                )
+            nodes = self._hydrate(keys, nodes)
+        except Exception as e:
+            for future in batch.values():
+                future.set_exception(e)
+            return
+
+        self._cache.update(nodes)
+        for key, future in batch.items():
+            future.set_result(nodes[key])
+
+    def _with_deferred(self, keys):
+        deferred, self._deferred = self._deferred, {}
+        return list(
+            dict.fromkeys([*keys, *(key for key in deferred if key not in self._cache)])
+        )
+
+    def _fetch(self, keys):
+        if self.flight is None:
+            nodes = self._fetch_nodes(keys)
+        else:
+            nodes = self.flight.do(
+                self._flight_key(keys), partial(self._fetch_nodes, keys)
+            )
+        return self._hydrate(keys, nodes)
+
+    def _fetch_nodes(self, keys):
+        with self.driver.session() as session:
+            result = session.run(self.query(), keys=keys)
+            return {record["key"]: record[self.variable_name] for record in result}
+
+    def _flight_key(self, keys):
+        return flight_key(self.driver, self.query(), {"keys": keys})
+
+    def _hydrate(self, keys, nodes):
+        # each node is hydrated as the only record of a result
+        single = not is_array_type(self.resolve_info.return_type)
+        hydrated = {}
+        for key in keys:
+            value = hydrate_records(
+                self.resolve_info,
+                [{self.variable_name: nodes.get(key)}],
+                self.result_mode,
+            )
+            hydrated[key] = value if single else value[0]
+        return hydrated
+
+
+def node_loader(resolve_info, key="id", label=None):
+    """
+    * The NodeLoader of the field being resolved, shared through the context by
+    * every object the field is resolved for within the request.
+    """
+    context = resolve_info.context
+    path = tuple(k for k in resolve_info.path.as_list() if not isinstance(k, int))
+    loaders = context.setdefault(CONTEXT_KEY, {})
+    if (path, key, label) not in loaders:
+        loaders[(path, key, label)] = NodeLoader(
+            context.get("driver"),
+            resolve_info,
+            key,
+            label,
+            cypher_passes(context),
+            single_flight(context),
+            context_value(context, "result_mode"),
+        )
+    loader = loaders[(path, key, label)]
+    deferred = context.get(DEFERRED_KEY, {}).pop((path, key, label), None)
+    if deferred:
+        loader.defer(deferred)
+    return loader
+
+
+def defer_keys(resolve_info, field_name, keys, key="id", label=None):
+    """
+    * Defer the keys node_loader() of field_name will load for the objects
+    * the field being resolved returns, so that in sync executions the first
+    * of them loads all the keys with one query:
+    *
+    *   movies = neo4j_graphql(obj, info.context, info)
+    *   defer_keys(info, "director", [movie.directorId for movie in movies])
+    """
+    path = (
+        *(k for k in resolve_info.path.as_list() if not isinstance(k, int)),
+        field_name,
+    )
+    deferred = resolve_info.context.setdefault(DEFERRED_KEY, {})
+    deferred.setdefault((path, key, label), []).extend(keys)
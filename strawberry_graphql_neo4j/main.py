@@ -1,221 +1,463 @@
-import json
+import asyncio
+import functools
 import logging
-import re
+import uuid
+from contextlib import nullcontext
 from collections.abc import Iterable
-from dataclasses import fields
-from datetime import datetime
 
-from pydash import filter_
 from strawberry.utils.typing import is_list
 
-from .selections import build_cypher_selection
+from .admission import admission_slot
+from .aliases import alias_batch
+from .budget import limit_records, result_budget
+from .cypher_ir import (
+    DEFAULT_PASSES,
+    CallCypherDoIt,
+    Create,
+    CreateRelationship,
+    Match,
+    OrderBy,
+    Return,
+    SetParams,
+    Statement,
+    UnwindAliases,
+    UnwindCypher,
+    VectorSearch,
+    WhereId,
+    render,
+)
+from .deadlines import (
+    CALL_KEY,
+    Deadline,
+    DeadlineExceeded,
+    neo4j_query,
+    request_deadline,
+    terminate_transactions,
+    timed_out,
+    transaction_timeout,
+)
+from .executor import TRANSACTION_KEY
+from .hydration import default_result_mode, hydrate_records
+from .metrics import query_timer
+from .profiling import as_profiler
+from .selections import root_projection
+from .single_flight import flight_key, single_flight
+from .splitting import query_splitter
 from .utils import (
+    context_value,
+    convert_kwargs,
+    cypher_arg_string,
     cypher_directive,
-    extract_query_result,
-    extract_selections,
     fix_params_for_add_relationship_mutation,
     is_add_relationship_mutation,
-    is_array_type,
     is_mutation,
     low_first_letter,
     mutation_meta_directive,
+    node_label,
+    parse_order_by,
+    schema_type_by_name,
     type_identifiers,
+    vector_directive,
+    vector_neighbours,
 )
 
 logger = logging.getLogger("neo4j_graphql_py")
-logger.setLevel(logging.DEBUG)
-ch = logging.StreamHandler()
-formatter = logging.Formatter("%(levelname)s:     %(message)s")
-ch.setFormatter(formatter)
-logger.addHandler(ch)
-
-
-def neo4j_graphql(obj, context, resolve_info, debug=False, **kwargs):
-    if is_mutation(resolve_info):
-        query = cypher_mutation(context, resolve_info, **kwargs)
-        if is_add_relationship_mutation(resolve_info):
-            # kwargs = fix_params_for_add_relationship_mutation(resolve_info, **kwargs)
-            pass
+
+
+def neo4j_graphql(
+    obj,
+    context,
+    resolve_info,
+    debug=False,
+    profile=None,
+    result_mode=None,
+    metrics=None,
+    fetch_size=None,
+    max_rows=None,
+    max_bytes=None,
+    flight=None,
+    splitter=None,
+    admission=None,
+    timeout=None,
+    deadline=None,
+    metadata=None,
+    split_executor=None,
+    **kwargs,
+):
+    timer = query_timer(context, resolve_info, metrics)
+    deadline = request_deadline(context, deadline)
+    try:
+        profiler = as_profiler(profile)
+        if profiler is not None and not profiler.sampled():
+            profiler = None
+
+        fetch_size, max_rows, max_bytes = result_budget(
+            resolve_info, fetch_size, max_rows, max_bytes
+        )
+
+        batch = splits = None
+        if is_mutation(resolve_info):
+            query = cypher_mutation(context, resolve_info, **kwargs)
+            if is_add_relationship_mutation(resolve_info):
+                # kwargs = fix_params_for_add_relationship_mutation(resolve_info, **kwargs)
+                pass
+            else:
+                kwargs = {"params": kwargs}
         else:
-            kwargs = {"params": kwargs}
-    else:
-        query = cypher_query(context, resolve_info, **kwargs)
-
-    if debug:
-        print(f"query: {query}")
-        print(f"kwargs: {kwargs}")
-
-    with context.get("driver").session() as session:
-
-        def convert_kwargs(value):
-            if hasattr(value, "__dict__"):
-                if hasattr(value, "__class__") and hasattr(
-                    value.__class__, "__members__"
-                ):
-                    # This is an enum, return its value
-                    return value.value
-                # Process all attributes of the object
-                result = {}
-                for attr_name, attr_value in value.__dict__.items():
-                    if attr_value is not None:
-                        result[attr_name] = convert_kwargs(attr_value)
-                return result
-            elif isinstance(value, dict):
-                return {k: convert_kwargs(v) for k, v in value.items() if v is not None}
-            elif isinstance(value, (list, tuple)):
-                return [convert_kwargs(item) for item in value if item is not None]
-            return value
+            plain = profiler is None and max_rows is None and max_bytes is None
+            batch = alias_batch(context, resolve_info, kwargs) if plain else None
+            splitter = (
+                query_splitter(context, splitter) if plain and batch is None else None
+            )
+            if batch is not None:
+                query = alias_batch_query(context, resolve_info, batch)
+            elif splitter is not None:
+                query, splits = split_query(context, resolve_info, splitter, **kwargs)
+            else:
+                query = cypher_query(context, resolve_info, **kwargs)
+
+        if profiler is not None:
+            query = profiler.prefix(query)
+
+        if debug:
+            debug_log("query: %s", query)
+            for split in splits or ():
+                debug_log("split query: %s", split)
+            debug_log("kwargs: %s", kwargs)
 
         converted_kwargs = convert_kwargs(kwargs)
+        result_mode = result_mode or context_value(
+            context, "result_mode", default_result_mode(resolve_info.schema)
+        )
 
-        data = session.run(query, **converted_kwargs)
-        data = extract_query_result(data, resolve_info.return_type)
-
-        def initialize_type(type_def, value):
-            if isinstance(value, dict):
-                # Recursively initialize nested dictionaries
-                initialized_dict = {}
-
-                klass = type_def
-
-                if getattr(type_def, "origin", None):
-                    klass = type_def.origin
-
-                if getattr(type_def, "of_type", None):
-                    klass = type_def.of_type
-
-                for k, v in value.items():
-                    if any([k == field.name for field in fields(klass)]):
-                        if isinstance(v, (dict, list)):
-                            field_type = (
-                                resolve_info.schema.get_type_by_name(klass.__name__)
-                                .get_field(k)
-                                .type
-                            )
-                            if is_array_type(field_type):
-                                field_type = field_type.of_type
-                            initialized_dict[k] = initialize_type(field_type, v)
-                        else:
-                            initialized_dict[k] = v
-
-                return klass(**initialized_dict)
-            elif isinstance(value, list):
-                # Handle lists by recursively initializing each item
-                return [initialize_type(type_def, item) for item in value]
-            return value
-
-        type_def = (
-            resolve_info.return_type.of_type
-            if getattr(resolve_info.return_type, "of_type", None)
-            else resolve_info.return_type
+        flight = None if is_mutation(resolve_info) else single_flight(context, flight)
+
+        def slot():
+            # each database call waits for a slot of the admission controller,
+            # if any, and holds it while it uses its session
+            return admission_slot(context, resolve_info, admission, deadline)
+
+        def call_timeout():
+            # what is left of the deadline once admitted becomes the timeout
+            # of the transaction
+            return transaction_timeout(resolve_info, deadline, timeout)
+
+        def read(query, parameters):
+            driver = context.get("driver")
+
+            def fetch():
+                with slot():
+                    return fetch_records(
+                        driver,
+                        neo4j_query(query, call_timeout(), metadata),
+                        parameters,
+                        fetch_size,
+                        max_rows,
+                        max_bytes,
+                    )
+
+            if flight is None:
+                return fetch()
+            # identical reads in flight, with the same metadata, share one
+            # call and its records, only the call running it holds a slot and
+            # its timeout applies; the others wait up to their own deadline
+            # and run the read again if the leader's passes first
+            return flight.do(
+                flight_key(
+                    driver,
+                    query,
+                    parameters,
+                    max_rows,
+                    max_bytes,
+                    {
+                        key: value
+                        for key, value in (metadata or {}).items()
+                        if key != CALL_KEY
+                    },
+                ),
+                fetch,
+                deadline,
+            )
+
+        parameters = batch.parameters() if batch is not None else converted_kwargs
+        timer.translated(query, parameters)
+
+        if batch is not None:
+            records = batch.records(resolve_info.path.key, lambda: read(query, parameters))
+            timer.lap("db")
+            data = hydrate_records(resolve_info, records, result_mode)
+            timer.lap("hydration")
+        elif splits:
+            # the split reads take a slot each, as they run in their own sessions
+            records = splitter.load(
+                read(query, parameters),
+                type_identifiers(resolve_info.return_type).get("variable_name"),
+                splits,
+                read,
+                split_executor,
+            )
+            timer.lap("db")
+            data = hydrate_records(resolve_info, records, result_mode)
+            timer.lap("hydration")
+        elif flight is not None and profiler is None:
+            records = read(query, parameters)
+            timer.lap("db")
+            data = hydrate_records(resolve_info, records, result_mode)
+            timer.lap("hydration")
+        else:
+            # mutations of an operation executed with
+            # TransactionExecutionContext share its transaction
+            transaction = (
+                context_value(context, TRANSACTION_KEY)
+                if is_mutation(resolve_info)
+                else None
+            )
+            with slot():
+                query_timeout = call_timeout()
+                with (
+                    nullcontext(transaction)
+                    if transaction is not None
+                    else context.get("driver").session(**session_config(fetch_size))
+                ) as session:
+                    # the timeout of an explicit transaction is set when it begins
+                    result = session.run(
+                        query
+                        if transaction is not None
+                        else neo4j_query(query, query_timeout, metadata),
+                        **parameters,
+                    )
+                    timer.lap("db")
+                    data = hydrate_records(
+                        resolve_info,
+                        (
+                            result
+                            if max_rows is None and max_bytes is None
+                            else limit_records(result, max_rows, max_bytes)
+                        ),
+                        result_mode,
+                    )
+                    timer.lap("hydration")
+                    if profiler is not None:
+                        profiler.record(context, resolve_info, result.consume())
+    except Exception as e:
+        if timed_out(e):
+            error = DeadlineExceeded(f"Query timed out: {e.message}")
+            timer.finish(error=error)
+            raise error from e
+        timer.finish(error=e)
+        raise
+
+    timer.finish(data)
+    return data
+
+
+async def neo4j_graphql_async(
+    obj, context, resolve_info, executor=None, deadline=None, metadata=None, **kwargs
+):
+    """
+    * neo4j_graphql() for async resolvers: the call runs on executor, the
+    * loop's default one unless given, without blocking the event loop. The
+    * reads of a split query run concurrently on the same executor.
+    *
+    * When the task awaiting it is cancelled, e.g. because the client went
+    * away, its running transactions are terminated on the server, found by
+    * their metadata, and the statements it didn't start yet fail with
+    * DeadlineExceeded.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = request_deadline(context, deadline)
+    deadline = deadline.child() if deadline is not None else Deadline()
+    call = uuid.uuid4().hex
+    metadata = dict(metadata or {}, **{CALL_KEY: call})
+    try:
+        return await loop.run_in_executor(
+            executor,
+            functools.partial(
+                neo4j_graphql,
+                obj,
+                context,
+                resolve_info,
+                deadline=deadline,
+                metadata=metadata,
+                split_executor=LoopExecutor(loop, executor),
+                **kwargs,
+            ),
         )
-        return initialize_type(
-            resolve_info.schema.get_type_by_name(type_def.__name__), data
+    except asyncio.CancelledError:
+        deadline.cancel()
+        loop.run_in_executor(
+            executor, terminate_transactions, context.get("driver"), call
         )
+        raise
 
 
-def cypher_query(context, resolve_info, first=-1, offset=0, _id=None, **kwargs):
-    types_ident = type_identifiers(resolve_info.return_type)
-    type_name = types_ident.get("type_name")
-    variable_name = types_ident.get("variable_name")
-    schema_type = resolve_info.schema.get_type_by_name(type_name)
+class LoopExecutor:
+    """
+    * Submits calls from other threads to executor, the default one of loop
+    * unless given. The calls' results are not returned: the callers read
+    * them from the calls themselves, as QuerySplitter does.
+    """
 
-    filtered_field_nodes = filter_(
-        resolve_info.field_nodes, lambda n: n.name.value == resolve_info.field_name
+    def __init__(self, loop, executor=None):
+        self.loop = loop
+        self.executor = executor
+
+    def submit(self, fn, *args):
+        try:
+            self.loop.call_soon_threadsafe(self._run, fn, args)
+        except RuntimeError:
+            # the loop is closed, the caller runs fn itself
+            pass
+
+    def _run(self, fn, args):
+        self.loop.run_in_executor(self.executor, fn, *args)
+
+
+def debug_log(message, *args):
+    """
+    * Output of debug=True, logged at DEBUG level when the application logs
+    * it, else printed as it always was, since the library doesn't configure
+    * the neo4j_graphql_py logger.
+    """
+    if logger.isEnabledFor(logging.DEBUG) and logger.hasHandlers():
+        logger.debug(message, *args)
+    else:
+        print(message % args)
+
+
+def fetch_records(
+    driver, query, parameters, fetch_size=None, max_rows=None, max_bytes=None
+):
+    """Run a read in its own session and return its records as a list."""
+    with driver.session(**session_config(fetch_size)) as session:
+        result = session.run(query, **parameters)
+        if max_rows is None and max_bytes is None:
+            return list(result)
+        return list(limit_records(result, max_rows, max_bytes))
+
+
+def session_config(fetch_size=None):
+    return {} if fetch_size is None else {"fetch_size": fetch_size}
+
+
+def cypher_query(
+    context, resolve_info, first=-1, offset=0, _id=None, orderBy=None, **kwargs
+):
+    return render(
+        Statement(query_clauses(resolve_info, first, offset, _id, orderBy, kwargs)),
+        cypher_passes(context),
     )
 
-    # FIXME: how to handle multiple field_node matches
-    selections = extract_selections(
-        getattr(filtered_field_nodes[0].selection_set, "selections", []), []
-    )  # resolve_info.fragments)
 
-    # if len(selections) == 0:
-    #     # FIXME: why aren't the selections found in the filteredFieldNode?
-    #     selections = extract_selections(resolve_info.operation.selection_set.selections, resolve_info.fragments)
+def split_query(
+    context, resolve_info, splitter, first=-1, offset=0, _id=None, orderBy=None, **kwargs
+):
+    """The statement of a query field and the statements split off it."""
+    statement, splits = splitter.split(
+        Statement(query_clauses(resolve_info, first, offset, _id, orderBy, kwargs)),
+        type_identifiers(resolve_info.return_type).get("variable_name"),
+    )
+    passes = cypher_passes(context)
+    return render(statement, passes), [render(split, passes) for split in splits]
 
-    def custom_json(obj):
-        if isinstance(obj, datetime):
-            return f"datetime({obj.isoformat()})"
 
-        return getattr(obj, "__dict__", obj)
+def alias_batch_query(context, resolve_info, batch):
+    """The statement of an AliasBatch, filtering by the row of each alias."""
+    clauses = query_clauses(
+        resolve_info,
+        **{name: value for name, value in batch.fixed.items() if name != "vector"},
+        properties=batch.properties(),
+    )
+    variable_name = type_identifiers(resolve_info.return_type).get("variable_name")
+    return render(UnwindAliases(clauses, variable_name), cypher_passes(context))
+
+
+def query_clauses(
+    resolve_info, first=-1, offset=0, _id=None, orderBy=None, kwargs=None, properties=None
+):
+    """
+    * The clauses of a query field. properties replaces the map of the
+    * filter arguments matched by the root node, e.g. `{year: alias.args.year}`.
+    """
+    kwargs = dict(kwargs or {})
+    types_ident = type_identifiers(resolve_info.return_type)
+    type_name = types_ident.get("type_name")
+    variable_name = types_ident.get("variable_name")
+    schema_type = schema_type_by_name(resolve_info.schema, type_name)
 
-    # FIXME: support IN for multiple values -> WHERE
-    arg_string = json.dumps(kwargs, default=custom_json)
-    arg_string = re.sub(r"(?<!\\)\"([^(\")]+)\":", "\\1:", arg_string)
-    arg_string = re.sub(r"\"datetime\(([^)]+)\)\"", 'datetime("\\1")', arg_string)
+    # resolve_info.fragments are not available on strawberry's Info
+    projection = root_projection(resolve_info, variable_name, schema_type, [])
 
-    id_where_predicate = f"WHERE ID({variable_name})={_id} " if _id is not None else ""
-    outer_skip_limit = f'SKIP {offset}{" LIMIT " + str(first) if first > -1 else ""}'
+    vector = vector_directive(
+        schema_type_by_name(resolve_info.schema, "Query"), resolve_info.field_name
+    )
+    if vector.get("index"):
+        # the query vector is passed as the $vector parameter
+        kwargs.pop("vector", None)
+
+    # FIXME: support IN for multiple values -> WHERE
+    arg_string = properties if properties is not None else cypher_arg_string(kwargs)
 
     cyp_dir = cypher_directive(
-        resolve_info.schema.get_type_by_name("Query"), resolve_info.field_name
+        schema_type_by_name(resolve_info.schema, "Query"), resolve_info.field_name
     )
     if cyp_dir:
         custom_cypher = cyp_dir.get("statement")
-        query = f'WITH apoc.cypher.runFirstColumnMany("{custom_cypher}", {arg_string}) AS x '
-        query += f"UNWIND x AS {variable_name} RETURN {variable_name} "
-
-        if selections:
-            query += f'{{{build_cypher_selection("", selections, variable_name, schema_type, resolve_info)}}} '
-
-        query += f"AS {variable_name} {outer_skip_limit}"
+        clauses = [UnwindCypher(custom_cypher, arg_string, variable_name)]
+    elif vector.get("index"):
+        # nearest neighbours, filtered by label and the other arguments
+        clauses = [
+            VectorSearch(
+                vector.get("index"),
+                vector_neighbours(vector.get("k"), first, offset),
+                variable_name,
+            ),
+            Match(variable_name, node_label(resolve_info.schema, schema_type), arg_string),
+        ]
     else:
         # No @cypher directive on QueryType
-        query = f"MATCH ({variable_name}:{type_name} {arg_string}) {id_where_predicate}"
-        query += f"RETURN {variable_name} "
-
-        if selections:
-            query += f'{{{build_cypher_selection("", selections, variable_name, schema_type, resolve_info)}}}'
-
-        query += f" AS {variable_name} {outer_skip_limit}"
+        clauses = [
+            Match(variable_name, node_label(resolve_info.schema, schema_type), arg_string)
+        ]
+        if _id is not None:
+            clauses.append(WhereId(variable_name, _id))
+
+    order_by = parse_order_by(orderBy)
+    if order_by:
+        # order and paginate before projecting
+        clauses.append(OrderBy(variable_name, order_by, offset, first))
+        clauses.append(Return(variable_name, projection))
+    else:
+        clauses.append(Return(variable_name, projection, offset, first))
 
-    return query
+    return clauses
 
 
 def cypher_mutation(context, resolve_info, first=-1, offset=0, _id=None, **kwargs):
-    # FIXME: lots of duplication here with cypherQuery, extract into util module
     types_ident = type_identifiers(resolve_info.return_type)
     type_name = types_ident.get("type_name")
     variable_name = types_ident.get("variable_name")
-    schema_type = resolve_info.schema.get_type_by_name(type_name)
+    schema_type = schema_type_by_name(resolve_info.schema, type_name)
 
-    filtered_field_nodes = filter_(
-        resolve_info.field_nodes, lambda n: n.name.value == resolve_info.field_name
-    )
-
-    # FIXME: how to handle multiple field_node matches
-    selections = extract_selections(
-        getattr(filtered_field_nodes[0].selection_set, "selections", []),
+    projection = root_projection(
+        resolve_info,
+        variable_name,
+        schema_type,
         getattr(resolve_info, "fragments", []),
     )
 
-    def custom_json(obj):
-        if isinstance(obj, datetime):
-            return f"datetime({obj.isoformat()})"
-
-        return getattr(obj, "__dict__", obj)
-
     # FIXME: support IN for multiple values -> WHERE
-    arg_string = json.dumps(kwargs, default=custom_json)
-    arg_string = re.sub(r"(?<!\\)\"([^(\")]+)\":", "\\1:", arg_string)
-    arg_string = re.sub(r"\"datetime\(([^)]+)\)\"", 'datetime("\\1")', arg_string)
-
-    id_where_predicate = f"WHERE ID({variable_name})={_id} " if _id is not None else ""
-    outer_skip_limit = f'SKIP {offset}{" LIMIT " + str(first) if first > -1 else ""}'
+    arg_string = cypher_arg_string(kwargs)
 
     cyp_dir = cypher_directive(
-        resolve_info.schema.get_type_by_name("Mutation"), resolve_info.field_name
+        schema_type_by_name(resolve_info.schema, "Mutation"), resolve_info.field_name
     )
     if cyp_dir:
         custom_cypher = cyp_dir.get("statement")
-        query = f'CALL apoc.cypher.doIt("{custom_cypher}", {arg_string}) YIELD value '
-        query += f"WITH apoc.map.values(value, [keys(value)[0]])[0] AS {variable_name} "
-        query += f"RETURN {variable_name} "
-
-        if selections:
-            query += f'{{{build_cypher_selection("", selections, variable_name, schema_type, resolve_info)}}} '
-
-        query += f"AS {variable_name} {outer_skip_limit}"
+        clauses = [
+            CallCypherDoIt(custom_cypher, arg_string, variable_name),
+            Return(variable_name, projection, offset, first),
+        ]
     # No @cypher directive on MutationType
     elif resolve_info.field_name.startswith(
         "create"
@@ -224,44 +466,45 @@ def cypher_mutation(context, resolve_info, first=-1, offset=0, _id=None, **kwarg
         # TODO: handle for create relationship
         # TODO: update / delete
         # TODO: augment schema
-        query = f"CREATE ({variable_name}:{type_name}) SET {variable_name} = $params RETURN {variable_name} "
-        if selections:
-            query += f'{{{build_cypher_selection("", selections, variable_name, schema_type, resolve_info)}}} '
-        query += f"AS {variable_name}"
+        clauses = [
+            Create(variable_name, type_name),
+            SetParams(variable_name),
+            Return(variable_name, projection),
+        ]
     elif resolve_info.field_name.startswith(
         "add"
     ) or resolve_info.field_name.startswith("Add"):
         mutation_meta = mutation_meta_directive(
-            resolve_info.schema.get_type_by_name("Mutation"), resolve_info.field_name
+            schema_type_by_name(resolve_info.schema, "Mutation"), resolve_info.field_name
         )
         relation_name = mutation_meta.get("relationship")
         from_type = mutation_meta.get("from")
         from_var = low_first_letter(from_type)
         to_type = mutation_meta.get("to")
         to_var = low_first_letter(to_type)
-        from_param = (
-            resolve_info.schema.get_type_by_name("Mutation")
-            .fields[resolve_info.field_name]
-            .ast_node.arguments[0]
-            .name.value[len(from_var) :]
-        )
-        to_param = (
-            resolve_info.schema.get_type_by_name("Mutation")
+        arguments = (
+            schema_type_by_name(resolve_info.schema, "Mutation")
             .fields[resolve_info.field_name]
-            .ast_node.arguments[1]
-            .name.value[len(to_var) :]
+            .ast_node.arguments
         )
-        query = f"MATCH ({from_var}:{from_type} {{{from_param}: "
-        query += f"MATCH ({to_var}:{to_type} {{{to_param}: "
-        query += f"${resolve_info.schema.get_type_by_name('Mutation').fields[resolve_info.field_name].ast_node.arguments[1].name.value}}}) "
-        query += f"CREATE ({from_var})-[:{relation_name}]->({to_var}) "
-        query += f"RETURN {from_var} "
-        if selections:
-            query += f'{{{build_cypher_selection("", selections, variable_name, schema_type, resolve_info)}}} '
-        query += f"AS {from_var}"
+        from_arg = arguments[0].name.value
+        to_arg = arguments[1].name.value
+        from_param = from_arg[len(from_var) :]
+        to_param = to_arg[len(to_var) :]
+        clauses = [
+            Match(from_var, from_type, f"{{{from_param}: ${from_arg}}}"),
+            Match(to_var, to_type, f"{{{to_param}: ${to_arg}}}"),
+            CreateRelationship(from_var, relation_name, to_var),
+            Return(from_var, projection),
+        ]
     else:
         raise Exception("Mutation does not follow naming conventions")
-    return query
+
+    return render(Statement(clauses), cypher_passes(context))
+
+
+def cypher_passes(context):
+    return context_value(context, "cypher_passes", DEFAULT_PASSES)
 
 
 def augment_schema(schema):
@@ -0,0 +1,307 @@
+import hashlib
+import itertools
+import threading
+import weakref
+from bisect import bisect_left
+from dataclasses import dataclass
+from functools import lru_cache
+from time import perf_counter
+from typing import Any, Optional
+
+from .utils import context_value, cypher_fingerprint
+
+CONTEXT_KEY = "neo4j_metrics"
+
+PHASES = ("translation", "db", "hydration")
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+@dataclass
+class QuerySample:
+    """
+    * Measurements of one neo4j_graphql() call, passed to every sink.
+    *
+    * Phase durations are in seconds and None for phases that didn't run:
+    * translation builds the Cypher statement, db runs it until the first
+    * records are available, hydration streams the records and builds the
+    * result. error is the exception raised by the call, if any, path the
+    * GraphQL response path of the field and parameters the parameters the
+    * statement was run with.
+    """
+
+    field: str
+    query: Optional[str] = None
+    translation: Optional[float] = None
+    db: Optional[float] = None
+    hydration: Optional[float] = None
+    rows: int = 0
+    error: Optional[BaseException] = None
+    path: Any = None
+    parameters: Optional[dict] = None
+
+    @property
+    def fingerprint(self):
+        return statement_fingerprint(self.query)[1] if self.query else ""
+
+    @property
+    def field_path(self):
+        """The response path of the field, e.g. `Movie.0.similar`."""
+        if self.path is None:
+            return self.field.rsplit(".", 1)[-1]
+        return ".".join(str(key) for key in self.path.as_list())
+
+    @property
+    def duration(self):
+        return sum(getattr(self, phase) or 0 for phase in PHASES)
+
+
+@lru_cache(maxsize=4096)
+def statement_fingerprint(query):
+    """(short id, fingerprint) of a statement, see cypher_fingerprint."""
+    fingerprint = cypher_fingerprint(query)
+    digest = hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()[:12]
+    return digest, fingerprint
+
+
+class QueryTimer:
+    """Times the phases of a neo4j_graphql() call and reports it to the sinks."""
+
+    def __init__(self, sinks, field, path=None):
+        self.sinks = sinks
+        self.sample = QuerySample(field, path=path)
+        self._last = perf_counter()
+
+    def lap(self, phase):
+        now = perf_counter()
+        setattr(self.sample, phase, now - self._last)
+        self._last = now
+
+    def translated(self, query, parameters=None):
+        self.sample.query = query
+        self.sample.parameters = parameters
+        self.lap("translation")
+
+    def finish(self, data=None, error=None):
+        sample = self.sample
+        sample.error = error
+        if isinstance(data, list):
+            sample.rows = len(data)
+        elif data is not None:
+            sample.rows = 1
+        for sink in self.sinks:
+            sink.record(sample)
+
+
+class _NullTimer:
+    def lap(self, phase):
+        pass
+
+    def translated(self, query, parameters=None):
+        pass
+
+    def finish(self, data=None, error=None):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def query_timer(context, resolve_info, metrics=None):
+    """
+    * The timer of a neo4j_graphql() call. metrics is a sink, a list of sinks
+    * or None to use context["neo4j_metrics"]; without sinks the returned timer
+    * does nothing.
+    """
+    if metrics is None:
+        metrics = context_value(context, CONTEXT_KEY)
+    if not metrics:
+        return NULL_TIMER
+    sinks = tuple(metrics) if isinstance(metrics, (list, tuple)) else (metrics,)
+    return QueryTimer(
+        sinks, field_name(resolve_info), getattr(resolve_info, "path", None)
+    )
+
+
+def field_name(resolve_info):
+    parent = getattr(getattr(resolve_info, "path", None), "typename", None)
+    return f"{parent}.{resolve_info.field_name}" if parent else resolve_info.field_name
+
+
+class Histogram:
+    def __init__(self, buckets):
+        # counts[i] observations <= buckets[i], the last one above all buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, buckets, value):
+        self.counts[bisect_left(buckets, value)] += 1
+        self.sum += value
+
+    def merge(self, other):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.sum += other.sum
+
+
+class Series:
+    def __init__(self, buckets):
+        self.requests = 0
+        self.errors = 0
+        self.rows = 0
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.rows += other.rows
+        for phase, histogram in other.phases.items():
+            self.phases[phase].merge(histogram)
+
+
+class _Shard:
+    """Thread-local holder of a shard, finalized when its thread exits."""
+
+    def __init__(self, series):
+        self.series = series
+
+
+class MetricsRegistry:
+    """
+    * Sink aggregating request, error and row counts and phase duration
+    * histograms per field and statement fingerprint.
+    *
+    * Every thread records into its own shard, so recording takes no lock
+    * and threads serving requests never wait on each other; the shards are
+    * only merged when the metrics are collected. The shard of a thread that
+    * exited is folded into a retired aggregate, so threads started per
+    * request don't grow the registry.
+    *
+    * A sink is any object with a record(sample) method taking a QuerySample,
+    * e.g. to forward measurements to StatsD or OpenTelemetry.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="neo4j_graphql"):
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self.statements = {}
+        self._local = threading.local()
+        self._shards = {}
+        self._retired = {}
+        self._tokens = itertools.count()
+        self._lock = threading.Lock()
+
+    def record(self, sample):
+        holder = getattr(self._local, "shard", None)
+        if holder is None:
+            token = next(self._tokens)
+            holder = self._local.shard = _Shard({})
+            with self._lock:
+                self._shards[token] = holder.series
+            weakref.finalize(holder, self._retire, token)
+        shard = holder.series
+
+        statement = ""
+        if sample.query:
+            statement, fingerprint = statement_fingerprint(sample.query)
+            self.statements[statement] = fingerprint
+
+        key = (sample.field, statement)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = Series(self.buckets)
+        series.requests += 1
+        series.rows += sample.rows
+        if sample.error is not None:
+            series.errors += 1
+        for phase in PHASES:
+            value = getattr(sample, phase)
+            if value is not None:
+                series.phases[phase].observe(self.buckets, value)
+
+    def _retire(self, token):
+        with self._lock:
+            shard = self._shards.pop(token)
+            _merge_into(self._retired, shard, self.buckets)
+
+    def collect(self):
+        """Merged series keyed by (field, statement id)."""
+        merged = {}
+        with self._lock:
+            shards = list(self._shards.values())
+            _merge_into(merged, self._retired, self.buckets)
+        for shard in shards:
+            _merge_into(merged, shard, self.buckets)
+        return merged
+
+    def prometheus_text(self):
+        """The collected metrics in the Prometheus text exposition format."""
+        series = sorted(self.collect().items())
+        name = self.namespace
+        lines = []
+
+        for metric, attribute, help_text in (
+            ("requests_total", "requests", "neo4j_graphql() calls."),
+            ("errors_total", "errors", "neo4j_graphql() calls that raised."),
+            ("rows_total", "rows", "Records returned."),
+        ):
+            lines.append(f"# HELP {name}_{metric} {help_text}")
+            lines.append(f"# TYPE {name}_{metric} counter")
+            for (field, statement), values in series:
+                labels = _labels(field=field, statement=statement)
+                lines.append(f"{name}_{metric}{{{labels}}} {getattr(values, attribute)}")
+
+        lines.append(f"# HELP {name}_phase_seconds Duration of the phases of a call.")
+        lines.append(f"# TYPE {name}_phase_seconds histogram")
+        for (field, statement), values in series:
+            for phase in PHASES:
+                histogram = values.phases[phase]
+                labels = _labels(field=field, statement=statement, phase=phase)
+                cumulative = 0
+                for bound, count in zip(
+                    (*map(repr, self.buckets), "+Inf"), histogram.counts
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{name}_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f"{name}_phase_seconds_sum{{{labels}}} {histogram.sum}")
+                lines.append(f"{name}_phase_seconds_count{{{labels}}} {cumulative}")
+
+        lines.append(f"# HELP {name}_statement_info Fingerprint of a statement id.")
+        lines.append(f"# TYPE {name}_statement_info gauge")
+        for statement, fingerprint in sorted(self.statements.items()):
+            labels = _labels(statement=statement, fingerprint=fingerprint)
+            lines.append(f"{name}_statement_info{{{labels}}} 1")
+
+        return "\n".join(lines) + "\n"
+
+
+def _merge_into(merged, shard, buckets):
+    for key, series in list(shard.items()):
+        if key not in merged:
+            merged[key] = Series(buckets)
+        merged[key].merge(series)
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
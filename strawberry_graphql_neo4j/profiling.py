@@ -0,0 +1,177 @@
+import logging
+import random
+import re
+
+from strawberry.extensions import SchemaExtension
+
+from .cypher_ir import (
+    CypherField,
+    CypherListField,
+    RelationAggregateField,
+    RelationField,
+)
+from .selections import root_projection
+from .utils import schema_type_by_name, type_identifiers
+
+logger = logging.getLogger("neo4j_graphql_py")
+
+PROFILE = "PROFILE"
+EXPLAIN = "EXPLAIN"
+
+CONTEXT_KEY = "neo4j_profile"
+
+
+class Profiler:
+    """
+    * Runs generated statements with PROFILE (or EXPLAIN for a dry run) and
+    * attributes the resulting plan operators to the GraphQL fields that
+    * produced them.
+    *
+    * sample_rate is the fraction of calls that are profiled, so a profiler
+    * can be left enabled for a small share of production traffic.
+    """
+
+    def __init__(self, mode=PROFILE, sample_rate=1.0):
+        if mode not in (PROFILE, EXPLAIN):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.sample_rate = sample_rate
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def prefix(self, query):
+        return f"{self.mode} {query}"
+
+    def record(self, context, resolve_info, summary):
+        plan = summary.profile if self.mode == PROFILE else summary.plan
+        report = attribute_plan(
+            plan or {}, field_markers(resolve_info), resolve_info.field_name
+        )
+        report["mode"] = self.mode
+        report["field"] = resolve_info.field_name
+
+        logger.debug(
+            "%s %s: dbHits=%s rows=%s",
+            self.mode,
+            resolve_info.field_name,
+            report["dbHits"],
+            report["rows"],
+        )
+        if isinstance(context, dict):
+            context.setdefault(CONTEXT_KEY, []).append(report)
+        return report
+
+
+def as_profiler(profile):
+    if profile is None or profile is False:
+        return None
+    if isinstance(profile, Profiler):
+        return profile
+    if profile is True:
+        return Profiler()
+    return Profiler(mode=str(profile).upper())
+
+
+def field_markers(resolve_info):
+    """
+    * Map every Cypher variable and @cypher statement generated for the
+    * selection of resolve_info to the GraphQL field path that produced it.
+    """
+    type_ident = type_identifiers(resolve_info.return_type)
+    projection = root_projection(
+        resolve_info,
+        type_ident.get("variable_name"),
+        schema_type_by_name(resolve_info.schema, type_ident.get("type_name")),
+        [],
+    )
+    markers = {}
+    _collect_markers(markers, projection, resolve_info.field_name)
+    return markers
+
+
+def _collect_markers(markers, projection, path):
+    if projection is None:
+        return
+    for item in projection.items:
+        field_path = f"{path}.{item.name}"
+        if isinstance(item, (CypherField, CypherListField)):
+            markers[item.statement] = field_path
+        if isinstance(item, (CypherListField, RelationField, RelationAggregateField)):
+            markers[item.nested_variable] = field_path
+        _collect_markers(markers, getattr(item, "projection", None), field_path)
+
+
+def attribute_plan(plan, markers, root_path):
+    """
+    * Walk a plan (or profile) tree as returned in the result summary and sum
+    * db hits and rows per GraphQL field path. Operators referencing several
+    * fields are attributed to their closest common ancestor field.
+    """
+    report = {
+        "dbHits": 0,
+        "rows": plan.get("rows", _estimated_rows(plan)),
+        "fields": {},
+    }
+
+    def visit(operator):
+        path = _operator_path(operator, markers, root_path)
+        db_hits = operator.get("dbHits", 0)
+        rows = operator.get("rows", _estimated_rows(operator))
+
+        field = report["fields"].setdefault(
+            path, {"dbHits": 0, "rows": 0, "operators": []}
+        )
+        field["dbHits"] += db_hits
+        field["rows"] += rows
+        field["operators"].append(operator.get("operatorType"))
+        report["dbHits"] += db_hits
+
+        for child in operator.get("children", []):
+            visit(child)
+
+    if plan:
+        visit(plan)
+    return report
+
+
+def _estimated_rows(operator):
+    return int(operator.get("args", {}).get("EstimatedRows", 0))
+
+
+def _operator_path(operator, markers, root_path):
+    identifiers = set(operator.get("identifiers", []))
+    details = " ".join(str(v) for v in operator.get("args", {}).values())
+
+    def referenced(marker):
+        if re.fullmatch(r"\w+", marker):
+            return marker in identifiers or re.search(rf"\b{marker}\b", details)
+        # @cypher statements are matched verbatim inside the operator arguments
+        return marker in details
+
+    paths = [path for marker, path in markers.items() if referenced(marker)]
+    if not paths:
+        return root_path
+    return _common_path(paths)
+
+
+def _common_path(paths):
+    parts = [path.split(".") for path in paths]
+    common = []
+    for segment in zip(*parts):
+        if len(set(segment)) > 1:
+            break
+        common.append(segment[0])
+    return ".".join(common)
+
+
+def profile_extensions(context):
+    reports = context.get(CONTEXT_KEY) if isinstance(context, dict) else None
+    return {"neo4jProfile": reports} if reports else {}
+
+
+class Neo4jProfileExtension(SchemaExtension):
+    """Attach the profile reports collected during execution to `extensions`."""
+
+    def get_results(self):
+        return profile_extensions(self.execution_context.context)
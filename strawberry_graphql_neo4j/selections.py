@@ -1,4 +1,24 @@
+from .cypher_ir import (
+    CypherField,
+    CypherListField,
+    IdField,
+    LabelCase,
+    MetaField,
+    NestedField,
+    Projection,
+    PropertyField,
+    RelationAggregateField,
+    RelationCountField,
+    RelationField,
+    TypenameField,
+    VectorField,
+)
+from pydash import filter_
+
 from .utils import (
+    argument_value,
+    budget_directive,
+    extract_selections,
     cypher_directive_args,
     is_graphql_scalar_type,
     is_array_type,
@@ -6,95 +26,189 @@ from .utils import (
     cypher_directive,
     relation_directive,
     inner_filter_params,
-    compute_skip_limit,
+    merge_fields,
+    node_label,
+    order_by_argument,
+    parse_order_by,
+    possible_type_names,
+    raw_info,
+    relation_aggregate,
+    schema_field,
+    schema_type_by_name,
+    schema_type_name,
+    type_label,
+    type_name,
+    type_selections,
+    vector_directive,
+    vector_neighbours,
 )
 
 
 def build_cypher_selection(
     initial, selections, variable_name, schema_type, resolve_info
 ):
-    if len(selections) == 0:
-        return initial
+    return build_projection(
+        selections, variable_name, schema_type, resolve_info
+    ).render(initial)
 
-    head_selection, *tail_selections = selections
 
-    tail_params = {
-        "selections": tail_selections,
-        "variable_name": variable_name,
-        "schema_type": schema_type,
-        "resolve_info": resolve_info,
-    }
+def root_projection(resolve_info, variable_name, schema_type, fragments):
+    filtered_field_nodes = filter_(
+        raw_info(resolve_info).field_nodes,
+        lambda n: n.name.value == resolve_info.field_name,
+    )
+
+    # the field may be selected several times under its response key, e.g.
+    # `Movie { title } Movie { year }`: all of their selections apply
+    selections = extract_selections(
+        [
+            selection
+            for field_node in filtered_field_nodes
+            for selection in getattr(field_node.selection_set, "selections", [])
+        ],
+        fragments,
+    )
+
+    # if len(selections) == 0:
+    #     # FIXME: why aren't the selections found in the filteredFieldNode?
+    #     selections = extract_selections(resolve_info.operation.selection_set.selections, resolve_info.fragments)
+
+    if not selections:
+        return None
+    return build_projection(selections, variable_name, schema_type, resolve_info)
+
+
+def build_projection(selections, variable_name, schema_type, resolve_info):
+    name = schema_type_name(schema_type)
+    type_names = possible_type_names(resolve_info.schema, name)
+    if type_names is not None:
+        # interfaces and unions are projected per object type
+        return LabelCase(
+            variable_name,
+            [
+                type_branch(selections, variable_name, type_name, resolve_info)
+                for type_name in type_names
+            ],
+        )
+
+    return Projection(
+        [
+            build_projection_item(selection, variable_name, schema_type, resolve_info)
+            for selection in merge_fields(
+                type_selections(selections, name, resolve_info.schema)
+            )
+        ]
+    )
+
+
+def type_branch(selections, variable_name, type_name, resolve_info):
+    schema_type = schema_type_by_name(resolve_info.schema, type_name)
+    projection = build_projection(selections, variable_name, schema_type, resolve_info)
+    return (
+        type_label(schema_type),
+        Projection([TypenameField(type_name), *projection.items]),
+    )
 
+
+def build_projection_item(head_selection, variable_name, schema_type, resolve_info):
     field_name = head_selection.name.value
-    comma_if_tail = "," if len(tail_selections) > 0 else ""
     # Schema meta fields(__schema, __typename, etc)
-    if not schema_type.get_field(field_name):
-        return build_cypher_selection(
-            initial[1 : initial.rfind(",")] if len(tail_selections) == 0 else initial,
-            **tail_params,
-        )
+    if not schema_field(schema_type, field_name):
+        return MetaField(field_name)
 
-    field_type = schema_type.get_field(field_name).type
-    inner_schema_type = resolve_info.schema.get_type_by_name(
-        getattr(inner_type(field_type), "__name__", None)
+    field_type = schema_field(schema_type, field_name).type
+    inner_schema_type = schema_type_by_name(
+        resolve_info.schema, type_name(inner_type(field_type))
     )
     custom_cypher = cypher_directive(schema_type, field_name).get("statement")
 
     # Database meta fields(_id)
     if field_name == "_id":
-        return build_cypher_selection(
-            f"{initial}{field_name}: ID({variable_name}){comma_if_tail}", **tail_params
+        return IdField(field_name, variable_name)
+
+    # Relationship counts and aggregates(actorsCount, actorsAggregate)
+    aggregate, relation_name = relation_aggregate(schema_type, field_name)
+    if aggregate:
+        return build_aggregate_item(
+            head_selection,
+            aggregate,
+            relation_name,
+            variable_name,
+            schema_type,
+            resolve_info,
         )
 
     # We have a graphql object type
     nested_variable = variable_name + "_" + field_name
-    skip_limit = compute_skip_limit(head_selection, resolve_info.variable_values)
-    nested_params = {
-        "initial": "",
-        "selections": getattr(head_selection.selection_set, "selections", []),
-        "variable_name": nested_variable,
-        "schema_type": inner_schema_type,
-        "resolve_info": resolve_info,
-    }
+    first = argument_value(head_selection, "first", resolve_info.variable_values)
+    offset = argument_value(head_selection, "offset", resolve_info.variable_values)
 
-    # Main control flow
-    if not is_array_type(field_type):
-        if custom_cypher:
-            return build_cypher_selection(
-                (
-                    f'{initial}{field_name}: apoc.cypher.runFirstColumnSingle("{custom_cypher}", '
-                    f"{cypher_directive_args(variable_name, head_selection, schema_type, resolve_info, custom_cypher)})"
-                    f"{comma_if_tail}"
-                ),
-                **tail_params,
-            )
+    def nested_projection(nested_variable):
+        nested_selections = getattr(head_selection.selection_set, "selections", [])
+        if len(nested_selections) == 0:
+            return None
+        return build_projection(
+            nested_selections, nested_variable, inner_schema_type, resolve_info
+        )
 
-        rel = relation_directive(schema_type, field_name)
-        rel_type = rel.get("name")
-        rel_direction = rel.get("direction")
-        subquery_args = inner_filter_params(head_selection)
+    def cypher_args():
+        return cypher_directive_args(
+            variable_name, head_selection, schema_type, resolve_info, custom_cypher
+        )
 
-        if not (rel_type is None):
-            var = f"{initial}{field_name}: {'head(' if not is_array_type(field_type) else ''}"
-            var += f"[({variable_name}){'<' if rel_direction in ['in', 'IN'] else ''}"
-            var += f"-[:{rel_type}]-{'>' if rel_direction in ['out', 'OUT'] else ''}"
-            var += f"({nested_variable}:{inner_schema_type.origin.__name__} {subquery_args}) | {nested_variable} "
+    rel = relation_directive(schema_type, field_name)
+    # read by QuerySplitter to estimate the size of list fields
+    estimate = {
+        "owner": f"{schema_type_name(schema_type)}.{field_name}",
+        "fanout": budget_directive(schema_type, field_name).get("fanout"),
+    }
 
-            cypher_selection = build_cypher_selection(**nested_params)
-            if cypher_selection:
-                var += f"{{{cypher_selection}}}"
+    vector = vector_directive(schema_type, field_name)
+    if vector.get("index"):
+        return VectorField(
+            name=field_name,
+            variable=variable_name,
+            index=vector.get("index"),
+            property=vector.get("property") or "embedding",
+            k=vector_neighbours(vector.get("k"), first, offset),
+            nested_variable=nested_variable,
+            projection=nested_projection(nested_variable),
+            single=not is_array_type(field_type),
+            first=first if first is not None else vector.get("k"),
+            offset=offset,
+            **estimate,
+        )
 
-            var += f"]{')' if not is_array_type(field_type) else ''}{skip_limit} {comma_if_tail}"
+    def relation_field(single):
+        order_by = parse_order_by(
+            order_by_argument(head_selection, resolve_info.variable_values)
+        )
+        return RelationField(
+            name=field_name,
+            variable=variable_name,
+            rel_type=rel.get("name"),
+            direction=rel.get("direction"),
+            nested_variable=nested_variable,
+            label=node_label(resolve_info.schema, inner_schema_type),
+            properties=inner_filter_params(head_selection),
+            projection=nested_projection(nested_variable),
+            single=single,
+            first=first,
+            offset=offset,
+            order_by=order_by,
+            **estimate,
+        )
 
-            return build_cypher_selection(
-                var,
-                **tail_params,
-            )
+    # Main control flow
+    if not is_array_type(field_type):
+        if custom_cypher:
+            return CypherField(field_name, custom_cypher, cypher_args())
+
+        if not (rel.get("name") is None):
+            return relation_field(single=True)
 
         # graphql scalar type, no custom cypher statement
-        return build_cypher_selection(
-            f"{initial} .{field_name} {comma_if_tail}", **tail_params
-        )
+        return PropertyField(field_name)
 
     if custom_cypher:
         # similar: [ x IN apoc.cypher.runFirstColumnMany("WITH {this} AS this MATCH (this)--(:Genre)--(o:Movie)
@@ -102,64 +216,98 @@ def build_cypher_selection(
 
         field_is_list = not not getattr(field_type, "of_type", None)
 
-        var = f'{initial}{field_name}: {"" if field_is_list else "head("}'
-        var += (
-            f'[ {nested_variable} IN apoc.cypher.runFirstColumnMany("{custom_cypher}", '
-        )
-        var += f"{cypher_directive_args(variable_name, head_selection, schema_type, resolve_info, custom_cypher)}) | {nested_variable} "
-
-        cypher_selection = build_cypher_selection(**nested_params)
-        if cypher_selection:
-            var += f"{{{cypher_selection}}}"
-
-        var += f"]{')' if not field_is_list else ''}{skip_limit} {comma_if_tail}"
-
-        return build_cypher_selection(
-            var,
-            **tail_params,
+        return CypherListField(
+            name=field_name,
+            statement=custom_cypher,
+            args=cypher_args(),
+            nested_variable=nested_variable,
+            projection=nested_projection(nested_variable),
+            single=not field_is_list,
+            first=first,
+            offset=offset,
+            **estimate,
         )
 
     # graphql object type, no custom cypher
-
-    rel = relation_directive(schema_type, field_name)
-    rel_type = rel.get("name")
-    rel_direction = rel.get("direction")
-    subquery_args = inner_filter_params(head_selection)
-
-    if rel_type is None:
-        cypher_selection = build_cypher_selection(
-            initial="",
-            selections=getattr(head_selection.selection_set, "selections", []),
-            variable_name=field_name,
-            schema_type=inner_schema_type,
-            resolve_info=resolve_info,
+    if rel.get("name") is None:
+        return NestedField(
+            name=field_name,
+            variable=variable_name,
+            projection=nested_projection(field_name),
+            single=not is_array_type(field_type),
+            first=first,
+            offset=offset,
+            **estimate,
         )
 
-        var = f"{initial} {field_name}: {'head(' if not is_array_type(field_type) else ''}[{field_name} in {variable_name}.{field_name} | {field_name} "
+    return relation_field(single=not is_array_type(field_type))
 
-        if cypher_selection:
-            var += f"{{{ cypher_selection }}}"
 
-        var += f"]{')' if not is_array_type(field_type) else ''}{skip_limit} {comma_if_tail}"
+def build_aggregate_item(
+    head_selection, aggregate, relation_name, variable_name, schema_type, resolve_info
+):
+    rel = relation_directive(schema_type, relation_name)
+    label = node_label(
+        resolve_info.schema,
+        schema_type_by_name(
+            resolve_info.schema,
+            type_name(inner_type(schema_field(schema_type, relation_name).type)),
+        ),
+    )
 
-        return build_cypher_selection(
-            var,
-            **tail_params,
+    if aggregate == "Count":
+        return RelationCountField(
+            name=head_selection.name.value,
+            variable=variable_name,
+            rel_type=rel.get("name"),
+            direction=rel.get("direction"),
+            label=label,
         )
 
-    cypher_selection = build_cypher_selection(**nested_params)
+    aggregate_type = schema_type_by_name(
+        resolve_info.schema,
+        type_name(inner_type(schema_field(schema_type, head_selection.name.value).type)),
+    )
+    aggregates = {}
+    for selection in selected_fields(head_selection, aggregate_type, resolve_info):
+        function = selection.name.value
+        if function.startswith("__"):
+            continue
+        properties = None
+        if function != "count":
+            values_type = schema_type_by_name(
+                resolve_info.schema,
+                type_name(inner_type(schema_field(aggregate_type, function).type)),
+            )
+            properties = list(
+                dict.fromkeys(
+                    s.name.value
+                    for s in selected_fields(selection, values_type, resolve_info)
+                    if not s.name.value.startswith("__")
+                )
+            )
+        aggregates[function] = properties
 
-    var = f"{initial}{field_name}: {'head(' if not is_array_type(field_type) else ''}"
-    var += f"[({variable_name}){'<' if rel_direction in ['in', 'IN'] else ''}"
-    var += f"-[:{rel_type}]-{'>' if rel_direction in ['out', 'OUT'] else ''}"
-    var += f"({nested_variable}:{inner_schema_type.origin.__name__} {subquery_args}) | {nested_variable} "
-    if cypher_selection:
-        var += f"{{{cypher_selection}}}"
-    var += (
-        f"]{')' if not is_array_type(field_type) else ''}{skip_limit} {comma_if_tail}"
+    return RelationAggregateField(
+        name=head_selection.name.value,
+        variable=variable_name,
+        rel_type=rel.get("name"),
+        direction=rel.get("direction"),
+        nested_variable=variable_name + "_" + head_selection.name.value,
+        label=label,
+        aggregates=list(aggregates.items()),
     )
 
-    return build_cypher_selection(
-        var,
-        **tail_params,
+
+def selected_fields(head_selection, schema_type, resolve_info):
+    """
+    * The fields selected on an object of schema_type by head_selection, with
+    * the selections of its fragments flattened in and repeated fields merged.
+    """
+    selections = extract_selections(
+        getattr(head_selection.selection_set, "selections", []),
+        getattr(raw_info(resolve_info), "fragments", {}),
+    )
+    return merge_fields(
+        type_selections(selections, schema_type_name(schema_type), resolve_info.schema)
     )
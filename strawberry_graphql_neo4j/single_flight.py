@@ -0,0 +1,171 @@
+import asyncio
+import functools
+import threading
+from collections.abc import Mapping
+
+from .deadlines import timed_out
+from .utils import context_value
+
+CONTEXT_KEY = "neo4j_single_flight"
+
+
+class _Call:
+    def __init__(self, deadline=None):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # deadline of the caller running the call
+        self.deadline = deadline
+        # callbacks waking the callers waiting for the call
+        self.waiters = []
+
+    def value(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def expired(self):
+        """Whether the call failed because its leader ran out of time."""
+        if self.error is None:
+            return False
+        if timed_out(self.error):
+            return True
+        remaining = self.deadline.remaining() if self.deadline is not None else None
+        return remaining is not None and remaining <= 0
+
+
+class SingleFlight:
+    """
+    * Shares one in-flight database call among concurrent identical reads.
+    *
+    * The first caller of a key runs the call; callers of the same key that
+    * arrive while it runs wait for it and receive its result, or exception,
+    * instead of running their own. Nothing is kept once the call returns, so
+    * a read starting after that runs again and sees current data.
+    *
+    * Each caller waits no longer than its own deadline, if given, and
+    * raises DeadlineExceeded once it has passed or is cancelled. When the
+    * call fails because the deadline of its leader passed or was cancelled,
+    * the callers waiting for it run the read again within their own.
+    *
+    * do() blocks the calling thread and do_async() awaits the call, running
+    * it on the loop's default executor when it leads; either joins calls in
+    * flight from the other. One instance is shared by the requests of a
+    * process, e.g. through context["neo4j_single_flight"].
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn, deadline=None):
+        while True:
+            woken = threading.Event()
+            call, leader = self._join(key, deadline, woken.set)
+            if leader:
+                self._run(key, call, fn)
+                return call.value()
+            unregister = deadline.on_cancel(woken.set) if deadline is not None else None
+            try:
+                while not call.done.is_set():
+                    if deadline is not None:
+                        deadline.check()
+                    woken.wait(deadline.remaining() if deadline is not None else None)
+            finally:
+                if unregister is not None:
+                    unregister()
+            if not call.expired():
+                return call.value()
+
+    async def do_async(self, key, fn, deadline=None):
+        loop = asyncio.get_running_loop()
+        while True:
+            future = loop.create_future()
+            wake = functools.partial(_wake_threadsafe, loop, future)
+            call, leader = self._join(key, deadline, wake)
+            if leader:
+                await loop.run_in_executor(None, self._run, key, call, fn)
+                return call.value()
+            unregister = deadline.on_cancel(wake) if deadline is not None else None
+            try:
+                while not call.done.is_set():
+                    if deadline is not None:
+                        deadline.check()
+                    try:
+                        await asyncio.wait_for(
+                            asyncio.shield(future),
+                            deadline.remaining() if deadline is not None else None,
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                if unregister is not None:
+                    unregister()
+            if not call.expired():
+                return call.value()
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+    def _join(self, key, deadline=None, waiter=None):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call(deadline)
+                return call, True
+            if waiter is not None:
+                call.waiters.append(waiter)
+            self.shared += 1
+            return call, False
+
+    def _run(self, key, call, fn):
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters, call.waiters = call.waiters, []
+            call.done.set()
+            for wake in waiters:
+                wake()
+
+
+def _wake_threadsafe(loop, future):
+    try:
+        loop.call_soon_threadsafe(_wake, future)
+    except RuntimeError:
+        # the waiter's loop is closed
+        pass
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def flight_key(driver, query, parameters, *options):
+    """
+    * Key of a call: the driver, the Cypher text, the parameters and the
+    * options changing its result, e.g. its budget or transaction metadata.
+    """
+    return (id(driver), query, _freeze(parameters), *map(_freeze, options))
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(item) for item in value)
+    # keeps 1, 1.0 and True apart
+    return type(value), value
+
+
+def single_flight(context, flight=None):
+    """flight, or else the SingleFlight in context["neo4j_single_flight"]."""
+    return flight if flight is not None else context_value(context, CONTEXT_KEY)
@@ -0,0 +1,82 @@
+import logging
+from collections.abc import Mapping
+
+from .metrics import PHASES
+
+REDACTED = "***"
+
+
+class SlowQueryLog:
+    """
+    * Sink logging the neo4j_graphql() calls that took at least `threshold`
+    * seconds, with the statement fingerprint, the field path, the duration
+    * of every phase, the row count and the parameters.
+    *
+    * redact is called with the parameters of a logged call and returns the
+    * parameters to log, see redact_parameters(). The log record carries the
+    * same values as a dict in its `neo4j_query` attribute, for structured
+    * log handlers.
+    *
+    * Like the other sinks it is enabled through context["neo4j_metrics"], so
+    * calls are not timed at all while no sink is configured.
+    """
+
+    def __init__(self, threshold=1.0, logger=None, level=logging.WARNING, redact=None):
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger("neo4j_graphql_py.slow_queries")
+        self.level = level
+        self.redact = redact
+
+    def record(self, sample):
+        duration = sample.duration
+        if duration < self.threshold or not self.logger.isEnabledFor(self.level):
+            return
+
+        parameters = sample.parameters or {}
+        if self.redact is not None:
+            parameters = self.redact(parameters)
+        entry = {
+            "field": sample.field,
+            "path": sample.field_path,
+            "fingerprint": sample.fingerprint,
+            "parameters": parameters,
+            "duration": duration,
+            **{phase: getattr(sample, phase) for phase in PHASES},
+            "rows": sample.rows,
+            "error": repr(sample.error) if sample.error is not None else None,
+        }
+        phases = " ".join(
+            f"{phase}={entry[phase]:.4f}s" for phase in PHASES if entry[phase] is not None
+        )
+        self.logger.log(
+            self.level,
+            "slow query %.4fs %s (%s) %s rows=%d%s: %s parameters=%s",
+            duration,
+            entry["path"],
+            entry["field"],
+            phases,
+            entry["rows"],
+            f" error={entry['error']}" if entry["error"] else "",
+            entry["fingerprint"],
+            parameters,
+            extra={"neo4j_query": entry},
+        )
+
+
+def redact_parameters(*keys):
+    """
+    * Redaction hook replacing the values of the given parameter names, at
+    * any depth (e.g. the `params` map of create mutations), with "***".
+    """
+    keys = frozenset(keys)
+
+    def redact(value):
+        if isinstance(value, Mapping):
+            return {
+                k: REDACTED if k in keys else redact(v) for k, v in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [redact(item) for item in value]
+        return value
+
+    return redact
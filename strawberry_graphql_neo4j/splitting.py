@@ -0,0 +1,179 @@
+import threading
+
+from .cypher_ir import IdField, Projection, Return, Statement, UnwindIds
+from .utils import context_value
+
+CONTEXT_KEY = "neo4j_query_splitter"
+
+# id of the parent node, read to stitch the results of the split queries
+SPLIT_KEY = "__id"
+
+
+class QuerySplitter:
+    """
+    * Splits the nested fields of a root field into several queries when one
+    * query would build too many nested values per parent row.
+    *
+    * The size of a row is estimated as the number of values it nests: a list
+    * field holds `first` values when it is paginated, else the estimate in
+    * fanouts for its schema field (`Movie.actors`), else the one of its
+    * @budget(fanout:) directive, else default_fanout, times the size of each
+    * value.
+    * Above threshold the nested fields are packed into groups below it: the
+    * query of the root field keeps the other fields and the first group and
+    * returns the parent node ids, and each other group is loaded by
+    *
+    *   UNWIND $ids AS id MATCH (movie) WHERE ID(movie) = id
+    *   RETURN id, movie { actors: [...] } AS movie
+    *
+    * Results are stitched back into the parent rows before hydration. With
+    * an executor (e.g. a ThreadPoolExecutor), or the one neo4j_graphql_async()
+    * runs on, the split queries run concurrently, each in its own session.
+    * The calling thread runs the queries no worker has started yet, so a
+    * call waiting for them never needs a free worker of a busy executor.
+    * Each query runs in its own transaction, so a stitched row is not a
+    * consistent snapshot when the graph changes between them.
+    """
+
+    def __init__(self, threshold=1000, default_fanout=10, fanouts=None, executor=None):
+        self.threshold = threshold
+        self.default_fanout = default_fanout
+        self.fanouts = fanouts or {}
+        self.executor = executor
+
+    def fanout(self, item):
+        if item.single:
+            return 1
+        if item.first is not None and int(item.first) > -1:
+            return int(item.first)
+        if item.owner in self.fanouts:
+            return self.fanouts[item.owner]
+        if item.fanout is not None:
+            return int(item.fanout)
+        return self.default_fanout
+
+    def cost(self, projection):
+        """Estimated number of values in a row projected by `projection`."""
+        if projection is None:
+            return 1
+        return 1 + sum(
+            self.fanout(item) * self.cost(item.projection)
+            for item in projection.items
+            if _nested(item)
+        )
+
+    def split(self, statement, variable):
+        """(statement, split statements) of a root field's statement."""
+        ret = statement.clauses[-1]
+        projection = getattr(ret, "projection", None)
+        if not isinstance(ret, Return) or not isinstance(projection, Projection):
+            return statement, []
+
+        nested = [item for item in projection.items if _nested(item)]
+        if len(nested) < 2 or self.cost(projection) <= self.threshold:
+            return statement, []
+        groups = self.groups(nested)
+        if len(groups) < 2:
+            return statement, []
+
+        split_off = [item for group in groups[1:] for item in group]
+        ret.projection = Projection(
+            [item for item in projection.items if not _contains(split_off, item)]
+            + [IdField(SPLIT_KEY, variable)]
+        )
+        return statement, [
+            Statement(
+                [UnwindIds(variable), Return(variable, Projection(group), key="id")]
+            )
+            for group in groups[1:]
+        ]
+
+    def groups(self, items):
+        """items packed first fit, most expensive first, in groups below threshold."""
+        groups = []
+        for item in sorted(
+            items, key=lambda item: -self.fanout(item) * self.cost(item.projection)
+        ):
+            item_cost = self.fanout(item) * self.cost(item.projection)
+            for group in groups:
+                if group[0] + item_cost <= self.threshold:
+                    group[0] += item_cost
+                    group[1].append(item)
+                    break
+            else:
+                groups.append([item_cost, [item]])
+        return [group for _, group in groups]
+
+    def load(self, records, variable, queries, fetch, executor=None):
+        """
+        * The records of the root query with the values of the split queries
+        * merged into their maps; fetch(query, parameters) runs a query, on
+        * self.executor, else executor, if any.
+        """
+        rows = [record.get(variable) for record in records]
+        ids = dict.fromkeys(row[SPLIT_KEY] for row in rows if row is not None)
+        parameters = {"ids": list(ids)}
+        executor = self.executor if self.executor is not None else executor
+        if executor is None:
+            results = [fetch(query, parameters) for query in queries]
+        else:
+            tasks = [_Task(fetch, query, parameters) for query in queries]
+            for task in tasks[1:]:
+                executor.submit(task.run)
+            results = [task.value() for task in tasks]
+
+        merged = {}
+        for row in rows:
+            if row is not None and row[SPLIT_KEY] not in merged:
+                merged[row[SPLIT_KEY]] = {k: v for k, v in row.items() if k != SPLIT_KEY}
+        for result in results:
+            for record in result:
+                merged[record["id"]].update(record.get(variable) or {})
+        return [
+            {variable: None if row is None else merged[row[SPLIT_KEY]]} for row in rows
+        ]
+
+
+class _Task:
+    """A split query run by the first of a worker and the waiting call."""
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._claimed = False
+
+    def run(self):
+        with self._lock:
+            if self._claimed:
+                return
+            self._claimed = True
+        try:
+            self.result = self.fn(*self.args)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def value(self):
+        self.run()
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _nested(item):
+    return getattr(item, "projection", None) is not None and hasattr(item, "single")
+
+
+def _contains(items, item):
+    return any(candidate is item for candidate in items)
+
+
+def query_splitter(context, splitter=None):
+    """splitter, or else the QuerySplitter in context["neo4j_query_splitter"]."""
+    return splitter if splitter is not None else context_value(context, CONTEXT_KEY)
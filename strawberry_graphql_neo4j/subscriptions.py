@@ -0,0 +1,209 @@
+import asyncio
+from functools import partial
+
+from .cypher_ir import Match, OrderBy, Return, Since, Statement, render
+from .hydration import RAW, default_result_mode, hydrator, result_type
+from .main import cypher_passes
+from .selections import root_projection
+from .single_flight import SingleFlight
+from .utils import (
+    context_value,
+    cypher_arg_string,
+    is_array_type,
+    node_label,
+    schema_type_by_name,
+    type_identifiers,
+)
+
+WATERMARK = "_watermark"
+WATERMARK_ID = "_watermark_id"
+
+_pollers = {}
+
+
+def cypher_subscription(context, resolve_info, watermark, first=-1, **kwargs):
+    """
+    * The incremental query of a subscription field: the nodes matching the
+    * arguments after the cursor ($watermark, $watermarkId), in watermark then
+    * node id order, at most `first` per poll.
+    """
+    types_ident = type_identifiers(resolve_info.return_type)
+    type_name = types_ident.get("type_name")
+    variable_name = types_ident.get("variable_name")
+    schema_type = schema_type_by_name(resolve_info.schema, type_name)
+
+    projection = root_projection(resolve_info, variable_name, schema_type, [])
+
+    statement = Statement(
+        [
+            Match(
+                variable_name,
+                node_label(resolve_info.schema, schema_type),
+                cypher_arg_string(kwargs),
+            ),
+            Since(variable_name, watermark),
+            OrderBy(
+                variable_name,
+                [(watermark, "ASC")],
+                0 if int(first) > -1 else None,
+                first,
+                by_id=True,
+            ),
+            Return(
+                variable_name,
+                projection,
+                key=f"{variable_name}.{watermark} AS {WATERMARK}, "
+                f"ID({variable_name}) AS {WATERMARK_ID}",
+            ),
+        ]
+    )
+    return render(statement, cypher_passes(context))
+
+
+class Poller:
+    """
+    * Runs the incremental query of one subscription shape every `interval`
+    * seconds and fans the changed nodes out to all of its subscribers, so
+    * the database load grows with the number of distinct shapes rather than
+    * with the number of clients.
+    *
+    * The watermark is the cursor (watermark value, node id) of the last node
+    * returned so far; the value must increase whenever a node changes (e.g.
+    * `SET n.updatedAt = timestamp()`). Nodes sharing a value are paged by id,
+    * so a node committed later with the same value and a lower id is missed.
+    *
+    * Subscribers joining at the same time share the query of their first
+    * value, the snapshot of all matching nodes.
+    """
+
+    def __init__(self, key, driver, query, resolve_info, result_mode, interval):
+        self.key = key
+        self.driver = driver
+        self.query = query
+        self.resolve_info = resolve_info
+        self.result_mode = result_mode
+        self.interval = interval
+        self.watermark = None
+        self.queues = set()
+        self.flight = SingleFlight()
+        self._task = None
+
+    @classmethod
+    def shared(cls, driver, query, resolve_info, result_mode, interval):
+        key = (asyncio.get_running_loop(), id(driver), query, result_mode, interval)
+        if key not in _pollers:
+            _pollers[key] = cls(key, driver, query, resolve_info, result_mode, interval)
+        return _pollers[key]
+
+    def subscribe(self):
+        queue = asyncio.Queue()
+        self.queues.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.queues.discard(queue)
+        if not self.queues:
+            _pollers.pop(self.key, None)
+            if self._task is not None:
+                self._task.cancel()
+
+    def start(self, cursor):
+        """Poll for the changes after the first subscriber's snapshot."""
+        if self._task is None and self.queues:
+            self.watermark = cursor
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def snapshot(self):
+        """All matching nodes, read once for the subscribers joining meanwhile."""
+        return await self.flight.do_async("snapshot", partial(self._fetch, None))
+
+    async def fetch(self, cursor):
+        return await asyncio.get_running_loop().run_in_executor(
+            None, self._fetch, cursor
+        )
+
+    async def _run(self):
+        while self.queues:
+            await asyncio.sleep(self.interval)
+            try:
+                nodes, cursor = await self.fetch(self.watermark)
+            except Exception as e:
+                self._publish(e)
+                continue
+            if cursor is not None:
+                self.watermark = cursor
+            if nodes:
+                self._publish(nodes)
+
+    def _publish(self, item):
+        for queue in self.queues:
+            queue.put_nowait(item)
+
+    def _fetch(self, cursor):
+        variable_name = type_identifiers(self.resolve_info.return_type).get(
+            "variable_name"
+        )
+        watermark, watermark_id = cursor or (None, None)
+        with self.driver.session() as session:
+            records = list(
+                session.run(
+                    self.query, watermark=watermark, watermarkId=watermark_id
+                )
+            )
+
+        values = [record.get(variable_name) for record in records]
+        if self.result_mode != RAW:
+            values = hydrator(self.resolve_info.schema, self.result_mode).hydrate(
+                result_type(self.resolve_info), values
+            )
+        if not records:
+            return values, cursor
+        return values, (records[-1].get(WATERMARK), records[-1].get(WATERMARK_ID))
+
+
+async def neo4j_subscription(
+    obj,
+    context,
+    resolve_info,
+    watermark="updatedAt",
+    interval=5.0,
+    result_mode=None,
+    **kwargs,
+):
+    """
+    * Async generator resolving a subscription field by polling.
+    *
+    * The first value holds all matching nodes, the following ones only the
+    * nodes changed since, found through their `watermark` property. List
+    * fields receive the changed nodes of a poll at once, other fields one
+    * node at a time. Subscribers of the same selection and arguments share
+    * one Poller, and the first value of those joining at the same time. A
+    * subscriber joining a running poller may receive a change already
+    * included in its first value.
+    """
+    query = cypher_subscription(context, resolve_info, watermark, **kwargs)
+    poller = Poller.shared(
+        context.get("driver"),
+        query,
+        resolve_info,
+        result_mode
+        or context_value(context, "result_mode", default_result_mode(resolve_info.schema)),
+        interval,
+    )
+    many = is_array_type(resolve_info.return_type)
+
+    queue = poller.subscribe()
+    try:
+        nodes, snapshot_cursor = await poller.snapshot()
+        poller.start(snapshot_cursor)
+        while True:
+            if isinstance(nodes, Exception):
+                raise nodes
+            if many:
+                yield nodes
+            else:
+                for node in nodes:
+                    yield node
+            nodes = await queue.get()
+    finally:
+        poller.unsubscribe(queue)
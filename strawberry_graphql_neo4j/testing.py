@@ -0,0 +1,221 @@
+import threading
+import time
+
+from neo4j.exceptions import Neo4jError
+
+from .utils import cypher_fingerprint
+
+
+class FakeRecord(dict):
+    """A dict with the parts of the neo4j.Record interface used by the library."""
+
+    def data(self, *keys):
+        return {key: self[key] for key in keys} if keys else dict(self)
+
+    def value(self, key=0, default=None):
+        if isinstance(key, int):
+            values = list(self.values())
+            return values[key] if key < len(values) else default
+        return self.get(key, default)
+
+
+class FakeSummary:
+    def __init__(self, query, parameters, plan=None, profile=None):
+        self.query = query
+        self.parameters = parameters
+        self.plan = plan
+        self.profile = profile
+        self.counters = None
+        self.notifications = None
+        self.result_available_after = 0
+        self.result_consumed_after = 0
+
+
+class FakeResult:
+    def __init__(self, records, summary):
+        self._records = [FakeRecord(record) for record in records]
+        self._summary = summary
+        self._consumed = False
+
+    def __iter__(self):
+        records, self._records = self._records, []
+        for record in records:
+            yield record
+
+    def keys(self):
+        return list(self._records[0].keys()) if self._records else []
+
+    def data(self, *keys):
+        return [record.data(*keys) for record in self]
+
+    def value(self, key=0, default=None):
+        return [record.value(key, default) for record in self]
+
+    def values(self, *keys):
+        return [list(record.data(*keys).values()) for record in self]
+
+    def single(self):
+        records = list(self)
+        return records[0] if len(records) == 1 else None
+
+    def consume(self):
+        self._records = []
+        self._consumed = True
+        return self._summary
+
+
+class FakeTransaction:
+    def __init__(self, session, metadata=None, timeout=None):
+        self._session = session
+        self.metadata = metadata
+        self.timeout = timeout
+        self.committed = False
+        self.rolled_back = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self.rolled_back:
+            self.commit()
+        elif not self.committed:
+            self.rollback()
+
+    def run(self, query, parameters=None, **kwparameters):
+        return self._session.run(query, parameters, **kwparameters)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        if not self.committed:
+            self.rollback()
+
+    def closed(self):
+        return self.committed or self.rolled_back
+
+
+class FakeSession:
+    def __init__(self, driver, **config):
+        self._driver = driver
+        self.config = config
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._closed = True
+
+    def closed(self):
+        return self._closed
+
+    def run(self, query, parameters=None, **kwparameters):
+        parameters = dict(parameters or {}, **kwparameters)
+        if isinstance(query, str):
+            return self._driver._execute(query, parameters, self.config)
+        # neo4j.Query carries the transaction metadata and timeout
+        return self._driver._execute(
+            query.text,
+            parameters,
+            self.config,
+            {"metadata": query.metadata, "timeout": query.timeout},
+        )
+
+    def begin_transaction(self, metadata=None, timeout=None):
+        transaction = FakeTransaction(self, metadata, timeout)
+        with self._driver._lock:
+            self._driver.transactions.append(transaction)
+        return transaction
+
+    def read_transaction(self, unit_of_work, *args, **kwargs):
+        with self.begin_transaction() as tx:
+            return unit_of_work(tx, *args, **kwargs)
+
+    def write_transaction(self, unit_of_work, *args, **kwargs):
+        with self.begin_transaction() as tx:
+            return unit_of_work(tx, *args, **kwargs)
+
+
+class FakeDriver:
+    """
+    * In-memory stand-in for neo4j.Driver for offline tests and benchmarks.
+    *
+    * Responses are registered per Cypher fingerprint (see cypher_fingerprint),
+    * so a response added for one generated statement also answers the same
+    * selection shape with different inlined arguments. A response is either a
+    * list of record dicts or a callable (query, parameters) -> records used to
+    * generate them. Statements without a registered response return `default`.
+    *
+    * latency is added to every run, in seconds, or a callable returning it,
+    * e.g. to inject jitter: `latency=lambda: random.uniform(0.001, 0.005)`.
+    * A statement whose latency exceeds its timeout fails after the timeout
+    * like the server does, with a TransactionTimedOut error.
+    *
+    * Executed statements are recorded in `queries`, the metadata and timeout
+    * they ran with in `transaction_configs`, explicit transactions in
+    * `transactions`.
+    """
+
+    def __init__(self, responses=None, default=None, latency=0):
+        self._responses = {}
+        self._lock = threading.Lock()
+        self.default = default
+        self.latency = latency
+        self.queries = []
+        self.transaction_configs = []
+        self.transactions = []
+        self.closed = False
+
+        for query, records in (responses or {}).items():
+            self.add_response(query, records)
+
+    def add_response(self, query, records):
+        self._responses[cypher_fingerprint(query)] = records
+
+    def session(self, **config):
+        return FakeSession(self, **config)
+
+    def verify_connectivity(self, **config):
+        return {}
+
+    def close(self):
+        self.closed = True
+
+    def _execute(self, query, parameters, config, transaction_config=None):
+        transaction_config = transaction_config or {"metadata": None, "timeout": None}
+        with self._lock:
+            self.queries.append((query, parameters))
+            self.transaction_configs.append(transaction_config)
+
+        latency = self.latency() if callable(self.latency) else self.latency
+        timeout = transaction_config["timeout"]
+        if timeout and latency > timeout:
+            time.sleep(timeout)
+            raise Neo4jError.hydrate(
+                message="The transaction has been terminated.",
+                code="Neo.ClientError.Transaction.TransactionTimedOut",
+            )
+        if latency:
+            time.sleep(latency)
+
+        # PROFILE and EXPLAIN prefixes answer like the plain statement
+        statement = query
+        for prefix in ("PROFILE ", "EXPLAIN "):
+            if statement.startswith(prefix):
+                statement = statement[len(prefix) :]
+
+        records = self._responses.get(cypher_fingerprint(statement), self.default)
+        if callable(records):
+            records = records(query, parameters)
+        if query.startswith("EXPLAIN "):
+            records = []
+
+        summary = FakeSummary(query, parameters, plan={}, profile={})
+        return FakeResult(records or [], summary)
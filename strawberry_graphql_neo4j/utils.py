@@ -2,19 +2,31 @@ import json
 import logging
 import re
 from collections.abc import Iterable
+from copy import copy
 from datetime import datetime
 from typing import Any
 
 from graphql import (
+    DirectiveNode,
     GraphQLEnumType,
+    GraphQLField,
+    GraphQLList,
+    GraphQLNamedType,
+    GraphQLNonNull,
     GraphQLResolveInfo,
     GraphQLScalarType,
+    GraphQLSchema,
+    SelectionSetNode,
     build_ast_schema,
+    is_abstract_type,
     parse,
+    value_from_ast_untyped,
 )
 from pydash import find, reduce_
 from strawberry.utils.typing import is_list, is_optional
 
+from .cypher_ir import render_slice
+
 logger = logging.getLogger("neo4j_graphql_py")
 
 
@@ -108,6 +120,50 @@ def extract_cypher_variables(custom_cypher):
     return {var: None for var in variables}
 
 
+def cypher_arg_string(args):
+    """Render args as a Cypher map literal, e.g. {title: "A", year: 1999}."""
+
+    def custom_json(obj):
+        if isinstance(obj, datetime):
+            return f"datetime({obj.isoformat()})"
+
+        return getattr(obj, "__dict__", obj)
+
+    arg_string = json.dumps(args, default=custom_json)
+    arg_string = re.sub(r"(?<!\\)\"([^(\")]+)\":", "\\1:", arg_string)
+    arg_string = re.sub(r"\"datetime\(([^)]+)\)\"", 'datetime("\\1")', arg_string)
+    return arg_string
+
+
+def convert_kwargs(value):
+    """Arguments as driver parameters: enums by value, input objects as maps."""
+    if hasattr(value, "__dict__"):
+        if hasattr(value, "__class__") and hasattr(value.__class__, "__members__"):
+            # This is an enum, return its value
+            return value.value
+        # Process all attributes of the object
+        result = {}
+        for attr_name, attr_value in value.__dict__.items():
+            if attr_value is not None:
+                result[attr_name] = convert_kwargs(attr_value)
+        return result
+    elif isinstance(value, dict):
+        return {k: convert_kwargs(v) for k, v in value.items() if v is not None}
+    elif isinstance(value, (list, tuple)):
+        return [convert_kwargs(item) for item in value if item is not None]
+    return value
+
+
+def raw_info(resolve_info):
+    """The graphql-core GraphQLResolveInfo of a resolver, which Strawberry's Info wraps."""
+    return getattr(resolve_info, "_raw_info", resolve_info)
+
+
+def context_value(context, key, default=None):
+    """Settings are read from the GraphQL context when it is a dict."""
+    return context.get(key, default) if isinstance(context, dict) else default
+
+
 def cypher_directive_args(
     variable, head_selection, schema_type, resolve_info, custom_cypher=None
 ):
@@ -124,16 +180,8 @@ def cypher_directive_args(
     # Then update with query arguments (which may override the None values)
     default_args.update(query_args)
 
-    def custom_json(obj):
-        if isinstance(obj, datetime):
-            return f"datetime({obj.isoformat()})"
-
-        return getattr(obj, "__dict__", obj)
-
     # FIXME: support IN for multiple values -> WHERE
-    arg_string = json.dumps(default_args, default=custom_json)
-    arg_string = re.sub(r"(?<!\\)\"([^(\")]+)\":", "\\1:", arg_string)
-    arg_string = re.sub(r"\"datetime\(([^)]+)\)\"", 'datetime("\\1")', arg_string)
+    arg_string = cypher_arg_string(default_args)
     return (
         f"{{this: {variable}{arg_string[1:]}"
         if arg_string == "{}"
@@ -157,7 +205,7 @@ def is_add_relationship_mutation(resolve_info):
         )
         and len(
             mutation_meta_directive(
-                resolve_info.schema.get_type_by_name("Mutation"),
+                schema_type_by_name(resolve_info.schema, "Mutation"),
                 resolve_info.field_name,
             )
         )
@@ -166,8 +214,69 @@ def is_add_relationship_mutation(resolve_info):
 
 
 def type_identifiers(return_type):
-    type_name = inner_type(return_type).__name__
-    return {"variable_name": low_first_letter(type_name), "type_name": type_name}
+    name = type_name(inner_type(return_type))
+    return {"variable_name": low_first_letter(name), "type_name": name}
+
+
+# Schema access for both Strawberry schemas and plain graphql-core schemas
+# (make_executable_schema, Ariadne)
+
+
+def schema_type_by_name(schema, name):
+    if isinstance(schema, GraphQLSchema):
+        return schema.get_type(name)
+    return schema.get_type_by_name(name)
+
+
+def schema_field(schema_type, field_name):
+    if isinstance(schema_type, GraphQLNamedType):
+        return getattr(schema_type, "fields", {}).get(field_name)
+    return schema_type.get_field(field_name)
+
+
+def type_name(field_type):
+    if isinstance(field_type, GraphQLNamedType):
+        return field_type.name
+    # Strawberry unions are not classes
+    return getattr(field_type, "__name__", None) or getattr(
+        field_type, "graphql_name", None
+    )
+
+
+def schema_type_name(schema_type):
+    return getattr(schema_type, "name", None) or getattr(
+        schema_type, "graphql_name", None
+    )
+
+
+def type_label(schema_type):
+    if isinstance(schema_type, GraphQLNamedType):
+        return schema_type.name
+    return schema_type.origin.__name__
+
+
+def possible_type_names(schema, name):
+    """Object types of an interface or union, None for other types."""
+    if not isinstance(schema, GraphQLSchema):
+        schema = schema._schema
+    graphql_type = schema.get_type(name)
+    if graphql_type is None or not is_abstract_type(graphql_type):
+        return None
+    return [t.name for t in schema.get_possible_types(graphql_type)]
+
+
+def node_label(schema, schema_type):
+    """
+    * Label of the nodes of a type; for interfaces and unions the labels of
+    * all their object types joined by `|`, matched by a disjunction of label
+    * predicates when rendered.
+    """
+    type_names = possible_type_names(schema, schema_type_name(schema_type))
+    if type_names is None:
+        return type_label(schema_type)
+    return "|".join(
+        type_label(schema_type_by_name(schema, name)) for name in type_names
+    )
 
 
 def is_graphql_scalar_type(field_type):
@@ -182,6 +291,11 @@ def unpack_optional(field_type):
 
 
 def is_array_type(field_type):
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    if isinstance(field_type, GraphQLList):
+        return True
+
     unpacked_field_type = unpack_optional(field_type)
 
     return (
@@ -207,13 +321,22 @@ def inner_type(field_type):
 def directive_with_args(directive_name, *args):
     def fun(schema_type, field_name):
         def field_directive(schema_type, field_name, directive_name):
+            field = schema_field(schema_type, field_name)
+            if isinstance(field, GraphQLField):
+                return find(
+                    getattr(field.ast_node, "directives", None) or [],
+                    lambda d: d.name.value == directive_name,
+                )
             return find(
-                getattr(schema_type.get_field(field_name), "directives", []),
+                getattr(field, "directives", []),
                 lambda d: d.__class__.__name__.lower() == directive_name,
             )
 
         def directive_argument(directive, name):
-            return getattr(directive, name)
+            if isinstance(directive, DirectiveNode):
+                argument = find(directive.arguments, lambda a: a.name.value == name)
+                return None if argument is None else value_from_ast_untyped(argument.value)
+            return getattr(directive, name, None)
 
         directive = field_directive(schema_type, field_name, directive_name)
         ret = {}
@@ -226,18 +349,47 @@ def directive_with_args(directive_name, *args):
 
 cypher_directive = directive_with_args("cypher", "statement")
 relation_directive = directive_with_args("relation", "name", "direction")
+vector_directive = directive_with_args("vector", "index", "property", "k")
+budget_directive = directive_with_args(
+    "budget", "fetchSize", "maxRows", "maxBytes", "timeout", "fanout"
+)
 mutation_meta_directive = directive_with_args(
     "MutationMeta", "relationship", "from", "to"
 )
 
 
+def vector_neighbours(k, first, offset, default_k=10):
+    """Number of nearest neighbours to read for a page of a @vector field."""
+    count = int(first) if first is not None and int(first) > -1 else int(k or default_k)
+    return int(offset or 0) + count
+
+
+def relation_aggregate(schema_type, field_name):
+    """
+    * <relation>Count and <relation>Aggregate fields of a @relation list field
+    * return the kind of aggregate and the relation field, e.g.
+    * actorsCount -> ("Count", "actors")
+    """
+    for suffix in ["Count", "Aggregate"]:
+        relation_field = field_name[: -len(suffix)]
+        if (
+            field_name.endswith(suffix)
+            and relation_field
+            and schema_field(schema_type, relation_field)
+            and is_array_type(schema_field(schema_type, relation_field).type)
+            and relation_directive(schema_type, relation_field).get("name")
+        ):
+            return suffix, relation_field
+    return None, None
+
+
 def inner_filter_params(selections):
     query_params = {}
     if len(selections.arguments) > 0:
         query_params = {
             arg.name.value: arg.value.value
             for arg in selections.arguments
-            if arg.name.value not in ["first", "offset"]
+            if arg.name.value not in ["first", "offset", "orderBy"]
         }
     # FIXME: support IN for multiple values -> WHERE
     query_params = re.sub(r"\"([^(\")]+)\":", "\\1:", json.dumps(query_params))
@@ -260,6 +412,37 @@ def argument_value(selection, name, variable_values):
     )
 
 
+def order_by_argument(selection, variable_values):
+    arg = find(selection.arguments, lambda argument: argument.name.value == "orderBy")
+    if arg is None:
+        return None
+    if arg.value.kind == "variable":
+        return variable_values.get(arg.value.name.value)
+    if arg.value.kind == "list_value":
+        return [value.value for value in arg.value.values]
+    return arg.value.value
+
+
+def parse_order_by(order_by):
+    """
+    * Split orderBy enum values (`title_asc`, `year_desc`) into
+    * (property, direction) pairs: [("title", "ASC"), ("year", "DESC")]
+    """
+    if order_by is None:
+        return None
+    if not isinstance(order_by, (list, tuple)):
+        order_by = [order_by]
+
+    orderings = []
+    for value in order_by:
+        value = str(getattr(value, "value", value))
+        name, _, direction = value.rpartition("_")
+        if not name or direction.lower() not in ["asc", "desc"]:
+            raise ValueError(f"Invalid orderBy value: {value}")
+        orderings.append((name, direction.upper()))
+    return orderings or None
+
+
 def extract_query_result(records, return_type):
     type_ident = type_identifiers(return_type)
     variable_name = type_ident.get("variable_name")
@@ -272,13 +455,7 @@ def extract_query_result(records, return_type):
 def compute_skip_limit(selection, variable_values):
     first = argument_value(selection, "first", variable_values)
     offset = argument_value(selection, "offset", variable_values)
-    if first is None and offset is None:
-        return ""
-    if offset is None:
-        return f"[..{first}]"
-    if first is None:
-        return f"[{offset}..]"
-    return f"[{offset}..{int(offset) + int(first)}]"
+    return render_slice(first, offset)
 
 
 def extract_selections(selections, fragments):
@@ -294,6 +471,57 @@ def extract_selections(selections, fragments):
     )
 
 
+def type_selections(selections, name, schema):
+    """
+    * The selections applying to objects of type `name`: the selections of
+    * inline fragments on the type, or on an interface or union containing
+    * it, are merged in and the others dropped.
+    """
+    merged = []
+    for selection in selections:
+        if selection.kind != "inline_fragment":
+            merged.append(selection)
+            continue
+        condition = selection.type_condition and selection.type_condition.name.value
+        if (
+            not condition
+            or condition == name
+            or name in (possible_type_names(schema, condition) or [])
+        ):
+            merged.extend(
+                type_selections(selection.selection_set.selections, name, schema)
+            )
+    return merged
+
+
+def merge_fields(selections):
+    """
+    * Object fields selected more than once under the same response key, e.g.
+    * `actors { name } actors { born }`, merged into one field selecting the
+    * selections of all of them. Repeated leaf fields are kept as they are.
+    """
+    merged = []
+    positions = {}
+    for selection in selections:
+        if selection.kind != "field" or selection.selection_set is None:
+            merged.append(selection)
+            continue
+        response_key = (selection.alias or selection.name).value
+        if response_key not in positions:
+            positions[response_key] = len(merged)
+            merged.append(selection)
+            continue
+        first = copy(merged[positions[response_key]])
+        first.selection_set = SelectionSetNode(
+            selections=(
+                *first.selection_set.selections,
+                *selection.selection_set.selections,
+            )
+        )
+        merged[positions[response_key]] = first
+    return merged
+
+
 def fix_params_for_add_relationship_mutation(resolve_info, **kwargs):
     # FIXME: find a better way to map param name in schema to datamodel
     #   let mutationMeta, fromTypeArg, toTypeArg;
@@ -313,27 +541,39 @@ def fix_params_for_add_relationship_mutation(resolve_info, **kwargs):
     from_var = low_first_letter(from_type)
     to_var = low_first_letter(to_type)
     from_param = (
-        resolve_info.schema.get_type_by_name("Mutation")
+        schema_type_by_name(resolve_info.schema, "Mutation")
         .fields[resolve_info.field_name]
         .ast_node.arguments[0]
         .name.value[len(from_var) :]
     )
     to_param = (
-        resolve_info.schema.get_type_by_name("Mutation")
+        schema_type_by_name(resolve_info.schema, "Mutation")
         .fields[resolve_info.field_name]
         .ast_node.arguments[1]
         .name.value[len(to_var) :]
     )
     kwargs[from_param] = kwargs[
-        resolve_info.schema.get_type_by_name("Mutation")
+        schema_type_by_name(resolve_info.schema, "Mutation")
         .fields[resolve_info.field_name]
         .ast_node.arguments[0]
         .name.value
     ]
     kwargs[to_param] = kwargs[
-        resolve_info.schema.get_type_by_name("Mutation")
+        schema_type_by_name(resolve_info.schema, "Mutation")
         .fields[resolve_info.field_name]
         .ast_node.arguments[1]
         .name.value
     ]
     return kwargs
+
+
+def cypher_fingerprint(query):
+    """
+    * Normalize a Cypher statement by replacing inlined literals with `?` and
+    * collapsing whitespace, so that statements generated for the same
+    * selection shape with different argument values share a fingerprint.
+    """
+    fingerprint = re.sub(r'"(?:[^"\\]|\\.)*"', "?", query)
+    fingerprint = re.sub(r"'(?:[^'\\]|\\.)*'", "?", fingerprint)
+    fingerprint = re.sub(r"(?<![\w$])\d+(?:\.\d+)?(?!\w)", "?", fingerprint)
+    return re.sub(r"\s+", " ", fingerprint).strip()
@@ -0,0 +1,131 @@
+import enum
+import typing
+
+import strawberry
+from strawberry.schema_directive import Location
+from strawberry.types import Info
+
+from strawberry_graphql_neo4j import neo4j_graphql, neo4j_subscription
+
+
+@strawberry.schema_directive(locations=[Location.FIELD_DEFINITION])
+class Cypher:
+    statement: str
+
+
+@strawberry.schema_directive(locations=[Location.FIELD_DEFINITION])
+class Relation:
+    name: str
+    direction: str
+
+
+@strawberry.type
+class Actor:
+    name: typing.Optional[str] = None
+    born: typing.Optional[int] = None
+
+
+@strawberry.type
+class ActorAggregateValues:
+    name: typing.Optional[str] = None
+    born: typing.Optional[int] = None
+
+
+@strawberry.type
+class ActorAverages:
+    born: typing.Optional[float] = None
+
+
+@strawberry.type
+class ActorAggregate:
+    count: typing.Optional[int] = None
+    min: typing.Optional[ActorAggregateValues] = None
+    max: typing.Optional[ActorAggregateValues] = None
+    avg: typing.Optional[ActorAverages] = None
+
+
+@strawberry.type
+class Genre:
+    name: typing.Optional[str] = None
+
+
+@strawberry.type
+class Movie:
+    movieId: typing.Optional[strawberry.ID] = None
+    title: typing.Optional[str] = None
+    year: typing.Optional[int] = None
+    actors: typing.List[Actor] = strawberry.field(
+        default=None, directives=[Relation(name="ACTED_IN", direction="IN")]
+    )
+    actorsCount: typing.Optional[int] = None
+    actorsAggregate: typing.Optional[ActorAggregate] = None
+    genres: typing.List[Genre] = strawberry.field(
+        default=None, directives=[Relation(name="IN_GENRE", direction="OUT")]
+    )
+    degree: typing.Optional[int] = strawberry.field(
+        default=None,
+        directives=[Cypher(statement="WITH {this} AS this RETURN SIZE((this)--())")],
+    )
+
+
+@strawberry.enum
+class _MovieOrdering(enum.Enum):
+    title_asc = "title_asc"
+    title_desc = "title_desc"
+    year_asc = "year_asc"
+    year_desc = "year_desc"
+
+
+MovieType = Movie
+GenreType = Genre
+
+
+def resolve_neo4j(info, **kwargs):
+    kwargs = {k: v for k, v in kwargs.items() if v is not None}
+    return neo4j_graphql(None, info.context, info, **kwargs)
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def Movie(
+        self,
+        info: Info,
+        title: typing.Optional[str] = None,
+        year: typing.Optional[int] = None,
+        first: typing.Optional[int] = None,
+        offset: typing.Optional[int] = None,
+        orderBy: typing.Optional[typing.List[_MovieOrdering]] = None,
+    ) -> typing.List[MovieType]:
+        return resolve_neo4j(
+            info, title=title, year=year, first=first, offset=offset, orderBy=orderBy
+        )
+
+    @strawberry.field
+    def MovieById(self, info: Info, movieId: strawberry.ID) -> typing.Optional[MovieType]:
+        return resolve_neo4j(info, movieId=movieId)
+
+    @strawberry.field(
+        directives=[
+            Cypher(
+                statement="MATCH (g:Genre) WHERE toLower(g.name) CONTAINS toLower($substring) RETURN g"
+            )
+        ]
+    )
+    def GenresBySubstring(
+        self, info: Info, substring: typing.Optional[str] = None
+    ) -> typing.List[GenreType]:
+        return resolve_neo4j(info, substring=substring)
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    def Movie(
+        self, info: Info, year: typing.Optional[int] = None, first: typing.Optional[int] = None
+    ) -> typing.AsyncGenerator[typing.List[MovieType], None]:
+        kwargs = {k: v for k, v in dict(year=year, first=first).items() if v is not None}
+        return neo4j_subscription(None, info.context, info, interval=0.01, **kwargs)
+
+
+schema = strawberry.Schema(query=Query, subscription=Subscription)
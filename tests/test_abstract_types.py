@@ -0,0 +1,262 @@
+import asyncio
+import typing
+import unittest
+
+import strawberry
+from graphql import graphql_sync
+from strawberry.types import Info
+
+from strawberry_graphql_neo4j import (
+    make_executable_schema,
+    neo4j_graphql,
+    neo4j_subscription,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import Relation
+
+
+@strawberry.interface
+class Person:
+    name: typing.Optional[str] = None
+
+
+@strawberry.type
+class Actor(Person):
+    born: typing.Optional[int] = None
+
+
+@strawberry.type
+class Film:
+    title: typing.Optional[str] = None
+
+
+@strawberry.type
+class Director(Person):
+    films: typing.List[Film] = strawberry.field(
+        default=None, directives=[Relation(name="DIRECTED", direction="OUT")]
+    )
+
+
+SearchResult = typing.Annotated[
+    typing.Union[Actor, Film], strawberry.union("SearchResult")
+]
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def Person(self, info: Info) -> typing.List[Person]:
+        return neo4j_graphql(None, info.context, info)
+
+    @strawberry.field
+    def Search(self, info: Info) -> typing.List[SearchResult]:
+        return neo4j_graphql(None, info.context, info)
+
+
+@strawberry.type
+class Subscription:
+    @strawberry.subscription
+    def Person(self, info: Info) -> typing.AsyncGenerator[typing.List[Person], None]:
+        return neo4j_subscription(None, info.context, info, interval=0.01)
+
+
+schema = strawberry.Schema(
+    query=Query, subscription=Subscription, types=[Actor, Director]
+)
+
+
+class TestAbstractTypes(unittest.TestCase):
+    def test_interface_root(self):
+        driver = FakeDriver(
+            default=[
+                {"person": {"__typename": "Actor", "name": "Keanu Reeves", "born": 1964}},
+                {"person": {"__typename": "Director", "name": "Lana", "films": [{"title": "The Matrix"}]}},
+            ]
+        )
+
+        result = schema.execute_sync(
+            "{ Person { __typename name ... on Actor { born } "
+            "... on Director { films { title } } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            {
+                "Person": [
+                    {"__typename": "Actor", "name": "Keanu Reeves", "born": 1964},
+                    {"__typename": "Director", "name": "Lana", "films": [{"title": "The Matrix"}]},
+                ]
+            },
+            result.data,
+        )
+        self.assertEqual(
+            "MATCH (person {}) WHERE person:Actor OR person:Director WITH person "
+            "RETURN CASE "
+            'WHEN person:Actor THEN person { __typename: "Actor" , .name , .born } '
+            'WHEN person:Director THEN person { __typename: "Director" , .name ,'
+            "films: [(person)-[:DIRECTED]->(person_films:Film {}) | person_films { .title }] } "
+            "END AS person SKIP 0",
+            driver.queries[0][0],
+        )
+
+    def test_union_root(self):
+        driver = FakeDriver(
+            default=[{"searchResult": {"__typename": "Film", "title": "Heat"}}]
+        )
+
+        result = schema.execute_sync(
+            "{ Search { ... on Film { title } ... on Actor { name } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual({"Search": [{"title": "Heat"}]}, result.data)
+        self.assertEqual(
+            "MATCH (searchResult {}) WHERE searchResult:Actor OR searchResult:Film "
+            "WITH searchResult RETURN CASE "
+            'WHEN searchResult:Actor THEN searchResult { __typename: "Actor" , .name } '
+            'WHEN searchResult:Film THEN searchResult { __typename: "Film" , .title } '
+            "END AS searchResult SKIP 0",
+            driver.queries[0][0],
+        )
+
+    def test_interface_relation_in_executable_schema(self):
+        schema = make_executable_schema(
+            """
+            directive @relation(name:String!, direction:String!) on FIELD_DEFINITION
+            interface Person {
+              name: String
+            }
+            type Actor implements Person {
+              name: String
+            }
+            type User implements Person {
+              name: String
+            }
+            type Movie {
+              title: String
+              people: [Person] @relation(name: "CREDITED", direction:"IN")
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(
+            default=[
+                {"movie": {"title": "Heat", "people": [{"__typename": "User", "name": "x"}]}}
+            ]
+        )
+
+        result = graphql_sync(
+            schema,
+            "{ Movie { people { __typename name } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            {"Movie": [{"people": [{"__typename": "User", "name": "x"}]}]}, result.data
+        )
+        self.assertEqual(
+            "MATCH (movie:Movie {}) RETURN movie {people: "
+            "[(movie)<-[:CREDITED]-(movie_people {}) "
+            "WHERE movie_people:Actor OR movie_people:User | CASE "
+            'WHEN movie_people:Actor THEN movie_people { __typename: "Actor" , .name } '
+            'WHEN movie_people:User THEN movie_people { __typename: "User" , .name } '
+            "END] } AS movie SKIP 0",
+            driver.queries[0][0],
+        )
+
+    def test_nested_interface_field_without_relation(self):
+        schema = make_executable_schema(
+            """
+            interface Person {
+              name: String
+            }
+            type Actor implements Person {
+              name: String
+              born: Int
+            }
+            type User implements Person {
+              name: String
+            }
+            type Movie {
+              title: String
+              cast: [Person]
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(
+            default=[
+                {"movie": {"cast": [{"__typename": "Actor", "name": "x", "born": 1964}]}}
+            ]
+        )
+
+        result = graphql_sync(
+            schema,
+            "{ Movie { cast { name ... on Actor { born } } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual(
+            {"Movie": [{"cast": [{"name": "x", "born": 1964}]}]}, result.data
+        )
+        self.assertEqual(
+            "MATCH (movie:Movie {}) RETURN movie { cast: [cast in movie.cast | "
+            "cast { .__typename , .name , .born }] } AS movie SKIP 0",
+            driver.queries[0][0],
+        )
+
+    def test_interface_subscription(self):
+        driver = FakeDriver(
+            default=[
+                {
+                    "_watermark": 1,
+                    "_watermark_id": 1,
+                    "person": {"__typename": "Actor", "name": "Keanu Reeves"},
+                }
+            ]
+        )
+
+        async def first_value():
+            subscription = await schema.subscribe(
+                "subscription { Person { name } }", context_value={"driver": driver}
+            )
+            result = await subscription.__anext__()
+            await subscription.aclose()
+            return result
+
+        result = asyncio.run(first_value())
+
+        self.assertEqual({"Person": [{"name": "Keanu Reeves"}]}, result.data)
+        self.assertEqual(
+            "MATCH (person {}) WHERE person:Actor OR person:Director WITH person "
+            "WHERE $watermark IS NULL OR person.updatedAt > $watermark "
+            "OR (person.updatedAt = $watermark AND ID(person) > $watermarkId) "
+            "WITH person ORDER BY person.updatedAt ASC, ID(person) ASC "
+            "RETURN person.updatedAt AS _watermark, ID(person) AS _watermark_id, CASE "
+            'WHEN person:Actor THEN person { __typename: "Actor" , .name } '
+            'WHEN person:Director THEN person { __typename: "Director" , .name } '
+            "END AS person",
+            driver.queries[0][0],
+        )
@@ -0,0 +1,223 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from strawberry_graphql_neo4j import (
+    AdmissionController,
+    Deadline,
+    DeadlineExceeded,
+    QuerySplitter,
+    SingleFlight,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_limits_concurrent_calls(self):
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def respond(query, parameters):
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.pop()
+            return [{"movie": {"title": "The Matrix"}}]
+
+        controller = AdmissionController(max_concurrency=2)
+        context = {"driver": FakeDriver(default=respond), "neo4j_admission": controller}
+        threads = [
+            threading.Thread(
+                target=schema.execute_sync,
+                args=("{ Movie { title } }",),
+                kwargs={"context_value": context},
+            )
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(2, max(peak))
+        metrics = controller.metrics()
+        self.assertEqual(
+            (6, 0, 0), (metrics["admitted"], metrics["active"], metrics["waiting"])
+        )
+        self.assertGreaterEqual(metrics["max_waiting"], 1)
+
+    def test_sheds_calls_when_the_queue_is_full_or_the_wait_times_out(self):
+        controller = AdmissionController(max_concurrency=1, max_queue=1, timeout=0.01)
+        context = {"driver": FakeDriver(default=[]), "neo4j_admission": controller}
+        controller.acquire()
+
+        timed_out = schema.execute_sync("{ Movie { title } }", context_value=context)
+
+        def wait():
+            with controller.slot(timeout=1):
+                pass
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        wait_until(lambda: controller.metrics()["waiting"] == 1)
+        rejected = schema.execute_sync("{ Movie { title } }", context_value=context)
+        controller.release()
+        waiter.join()
+
+        self.assertIn("Timed out", timed_out.errors[0].message)
+        self.assertIn("Too many database calls waiting", rejected.errors[0].message)
+        metrics = controller.metrics()
+        self.assertEqual(
+            (1, 1, 2), (metrics["rejected"], metrics["timed_out"], metrics["admitted"])
+        )
+
+    def test_admits_waiting_calls_by_priority(self):
+        controller = AdmissionController(
+            max_concurrency=1, priorities={"Mutation": 0, "Query.MovieById": 5}
+        )
+
+        def info(typename, field_name):
+            return SimpleNamespace(
+                field_name=field_name, path=SimpleNamespace(typename=typename)
+            )
+
+        priorities = [
+            controller.priority(info("Query", "Movie")),
+            controller.priority(info("Query", "MovieById")),
+            controller.priority(info("Mutation", "CreateMovie")),
+        ]
+        self.assertEqual([10, 5, 0], priorities)
+
+        admitted = []
+        controller.acquire()
+
+        def call(priority):
+            with controller.slot(priority):
+                admitted.append(priority)
+
+        threads = []
+        for priority in priorities:
+            threads.append(threading.Thread(target=call, args=(priority,)))
+            threads[-1].start()
+            wait_until(lambda: controller.metrics()["waiting"] == len(threads))
+        controller.release()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([0, 5, 10], admitted)
+
+    def test_flight_followers_do_not_hold_slots(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def respond(query, parameters):
+            started.set()
+            release.wait(5)
+            return [{"movie": {"title": "The Matrix"}}]
+
+        flight = SingleFlight()
+        # a second slot holder would be rejected
+        controller = AdmissionController(max_concurrency=1, max_queue=0)
+        context = {
+            "driver": FakeDriver(default=respond),
+            "neo4j_admission": controller,
+            "neo4j_single_flight": flight,
+        }
+        results = []
+
+        def execute():
+            results.append(schema.execute_sync("{ Movie { title } }", context_value=context))
+
+        threads = [threading.Thread(target=execute) for _ in range(3)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        # followers join the flight before they would wait for a slot
+        wait_until(lambda: flight.shared == 2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([None] * 3, [result.errors for result in results])
+        self.assertEqual(2, flight.shared)
+        metrics = controller.metrics()
+        self.assertEqual((1, 0), (metrics["admitted"], metrics["rejected"]))
+
+    def test_split_reads_take_a_slot_each(self):
+        def respond(query, parameters):
+            if query.startswith("UNWIND $ids"):
+                return [{"id": id, "movie": {"genres": []}} for id in parameters["ids"]]
+            return [{"movie": {"title": "The Matrix", "actors": [], "genres": [], "__id": 1}}]
+
+        controller = AdmissionController(max_concurrency=1)
+        context = {
+            "driver": FakeDriver(default=respond),
+            "neo4j_admission": controller,
+            "neo4j_query_splitter": QuerySplitter(threshold=10),
+        }
+
+        results = schema.execute_sync(
+            "{ Movie { title actors { name } genres { name } } }", context_value=context
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(2, controller.metrics()["admitted"])
+
+    def test_waits_end_with_the_deadline(self):
+        controller = AdmissionController(max_concurrency=1, timeout=5)
+        context = {
+            "driver": FakeDriver(default=[]),
+            "neo4j_admission": controller,
+            "neo4j_deadline": Deadline(0.05),
+        }
+        controller.acquire()
+
+        start = time.monotonic()
+        results = schema.execute_sync("{ Movie { title } }", context_value=context)
+        waited = time.monotonic() - start
+        controller.release()
+
+        self.assertIsInstance(results.errors[0].original_error, DeadlineExceeded)
+        self.assertLess(waited, 1)
+        self.assertEqual(0, controller.metrics()["waiting"])
+        with self.assertRaises(DeadlineExceeded):
+            controller.acquire(deadline=Deadline(0))
+        self.assertEqual(0, controller.metrics()["active"])
+
+    def test_cancelled_deadline_wakes_the_waiter(self):
+        controller = AdmissionController(max_concurrency=1, timeout=5)
+        deadline = Deadline()
+        errors = []
+        controller.acquire()
+
+        def wait():
+            try:
+                with controller.slot(deadline=deadline):
+                    pass
+            except DeadlineExceeded as e:
+                errors.append(e)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        wait_until(lambda: controller.metrics()["waiting"] == 1)
+        start = time.monotonic()
+        deadline.cancel()
+        waiter.join()
+        woken = time.monotonic() - start
+        controller.release()
+
+        self.assertEqual(["Request cancelled"], [str(e) for e in errors])
+        self.assertLess(woken, 1)
+        self.assertEqual(0, controller.metrics()["active"])
@@ -0,0 +1,113 @@
+import unittest
+
+from graphql import graphql_sync
+
+from strawberry_graphql_neo4j import make_executable_schema, neo4j_graphql
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+def respond(query, parameters):
+    if query.startswith("UNWIND $aliases"):
+        return [
+            {"key": alias["key"], "movie": {"title": f"Movie of {alias['args']['year']}"}}
+            for alias in parameters["aliases"]
+        ]
+    return [{"movie": {"title": "The Matrix"}}]
+
+
+class TestAliases(unittest.TestCase):
+    def test_repeated_field_nodes_are_merged(self):
+        driver = FakeDriver(default=[])
+
+        schema.execute_sync(
+            "{ Movie { title actors { name } } Movie { year actors { born } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertEqual(
+            [
+                "MATCH (movie:Movie {}) RETURN movie { .title ,actors: "
+                "[(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | movie_actors { .name , .born }] ,"
+                " .year } AS movie SKIP 0"
+            ],
+            [query for query, _ in driver.queries],
+        )
+
+    def test_aliases_differing_in_filters_are_batched(self):
+        driver = FakeDriver(default=respond)
+
+        results = schema.execute_sync(
+            """
+            query($year: Int) {
+              a: Movie(year: 1999) { title }
+              b: Movie(year: $year) { title }
+              c: Movie(year: 2001, first: 1) { title }
+              d: Movie(title: "The Matrix") { title }
+            }
+            """,
+            variable_values={"year": 2000},
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            {
+                "a": [{"title": "Movie of 1999"}],
+                "b": [{"title": "Movie of 2000"}],
+                "c": [{"title": "The Matrix"}],
+                "d": [{"title": "The Matrix"}],
+            },
+            results.data,
+        )
+        self.assertEqual(
+            (
+                "UNWIND $aliases AS alias CALL { WITH alias "
+                "MATCH (movie:Movie {year: alias.args.year}) "
+                "RETURN movie { .title } AS movie SKIP 0 } "
+                "RETURN alias.key AS key, movie",
+                {
+                    "aliases": [
+                        {"key": "a", "args": {"year": 1999}},
+                        {"key": "b", "args": {"year": 2000}},
+                    ]
+                },
+            ),
+            driver.queries[0],
+        )
+        self.assertEqual(3, len(driver.queries))
+
+    def test_resolvers_changing_arguments_run_alone(self):
+        schema = make_executable_schema(
+            """
+            type Movie {
+              title: String
+            }
+            type Query {
+              Movie(year: Int): [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, year: neo4j_graphql(
+                        obj, info.context, info, year=year + 1
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=respond)
+
+        results = graphql_sync(
+            schema,
+            "{ a: Movie(year: 1999) { title } b: Movie(year: 2000) { title } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            [
+                'MATCH (movie:Movie {year: 2000}) RETURN movie { .title } AS movie SKIP 0',
+                'MATCH (movie:Movie {year: 2001}) RETURN movie { .title } AS movie SKIP 0',
+            ],
+            [query for query, _ in driver.queries],
+        )
@@ -1,7 +1,9 @@
 import unittest
 
 from tests.helpers.cypher_test_helpers import augmented_schema
-from graphql import print_schema
+from graphql import graphql_sync, print_schema
+
+from strawberry_graphql_neo4j.testing import FakeDriver
 
 
 class TestAugmentedSchema(unittest.TestCase):
@@ -17,7 +19,9 @@ directive @MutationMeta(relationship: String, from: String, to: String) on FIELD
 type Actor implements Person {
   id: ID!
   name: String
-  movies: [Movie]
+  movies(orderBy: [_MovieOrdering]): [Movie]
+  moviesCount: Int
+  moviesAggregate: _MovieAggregate
 }
 
 type Book {
@@ -33,8 +37,10 @@ enum BookGenre {
 type Genre {
   _id: ID!
   name: String
-  movies(first: Int = 3, offset: Int = 0): [Movie]
+  movies(first: Int = 3, offset: Int = 0, orderBy: [_MovieOrdering]): [Movie]
   highestRatedMovie: Movie
+  moviesCount: Int
+  moviesAggregate: _MovieAggregate
 }
 
 type Movie {
@@ -45,16 +51,20 @@ type Movie {
   plot: String
   poster: String
   imdbRating: Float
-  genres: [Genre]
+  genres(orderBy: [_GenreOrdering]): [Genre]
   similar(first: Int = 3, offset: Int = 0): [Movie]
   mostSimilar: Movie
   degree: Int
-  actors(first: Int = 3, offset: Int = 0, name: String): [Actor]
+  actors(first: Int = 3, offset: Int = 0, name: String, orderBy: [_ActorOrdering]): [Actor]
   avgStars: Float
   filmedIn: State
   scaleRating(scale: Int = 3): Float
   scaleRatingFloat(scale: Float = 1.5): Float
   actorMovies: [Movie]
+  genresCount: Int
+  genresAggregate: _GenreAggregate
+  actorsCount: Int
+  actorsAggregate: _ActorAggregate
 }
 
 type Mutation {
@@ -75,12 +85,12 @@ interface Person {
 }
 
 type Query {
-  Movie(_id: Int, id: ID, title: String, year: Int, plot: String, poster: String, imdbRating: Float, first: Int, offset: Int): [Movie]
-  MoviesByYear(year: Int): [Movie]
+  Movie(_id: Int, id: ID, title: String, year: Int, plot: String, poster: String, imdbRating: Float, first: Int, offset: Int, orderBy: [_MovieOrdering]): [Movie]
+  MoviesByYear(year: Int, orderBy: [_MovieOrdering]): [Movie]
   MovieById(movieId: ID!): Movie
   MovieBy_Id(_id: Int!): Movie
-  GenresBySubstring(substring: String): [Genre]
-  Books: [Book]
+  GenresBySubstring(substring: String, orderBy: [_GenreOrdering]): [Genre]
+  Books(orderBy: [_BookOrdering]): [Book]
 }
 
 type State {
@@ -91,5 +101,157 @@ type User implements Person {
   id: ID!
   name: String
 }
+
+type _ActorAggregate {
+  count: Int
+  min: _ActorAggregateValues
+  max: _ActorAggregateValues
+}
+
+type _ActorAggregateValues {
+  id: ID
+  name: String
+}
+
+enum _ActorOrdering {
+  id_asc
+  id_desc
+  name_asc
+  name_desc
+}
+
+enum _BookOrdering {
+  genre_asc
+  genre_desc
+}
+
+type _GenreAggregate {
+  count: Int
+  min: _GenreAggregateValues
+  max: _GenreAggregateValues
+}
+
+type _GenreAggregateValues {
+  name: String
+}
+
+enum _GenreOrdering {
+  name_asc
+  name_desc
+}
+
+type _MovieAggregate {
+  count: Int
+  min: _MovieAggregateValues
+  max: _MovieAggregateValues
+  avg: _MovieAverages
+}
+
+type _MovieAggregateValues {
+  movieId: ID
+  title: String
+  year: Int
+  plot: String
+  poster: String
+  imdbRating: Float
+  avgStars: Float
+}
+
+type _MovieAverages {
+  year: Float
+  imdbRating: Float
+  avgStars: Float
+}
+
+enum _MovieOrdering {
+  movieId_asc
+  movieId_desc
+  title_asc
+  title_desc
+  year_asc
+  year_desc
+  plot_asc
+  plot_desc
+  poster_asc
+  poster_desc
+  imdbRating_asc
+  imdbRating_desc
+  avgStars_asc
+  avgStars_desc
+}
+
+enum _StateOrdering {
+  name_asc
+  name_desc
+}
+
+enum _UserOrdering {
+  id_asc
+  id_desc
+  name_asc
+  name_desc
+}
 '''
         self.assertEqual(expected_schema, print_schema(schema))
+
+    def test_nested_order_by_on_augmented_schema(self):
+        driver = FakeDriver(default=[])
+
+        results = graphql_sync(
+            augmented_schema(),
+            "{ Movie(orderBy: [title_asc]) { title "
+            "actors(orderBy: [name_desc, id_asc], first: 2) { name } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            "MATCH (movie:Movie {}) WITH movie ORDER BY movie.title ASC SKIP 0 "
+            "RETURN movie { .title ,actors: [movie_actors IN [movie_actors_sorted IN "
+            "apoc.coll.sortMulti([(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | "
+            "{_node: movie_actors, name: movie_actors.name, id: movie_actors.id}], "
+            '["name", "^id"]) | movie_actors_sorted._node][..2] | '
+            "movie_actors { .name }] } AS movie",
+            driver.queries[0][0],
+        )
+
+    def test_count_and_aggregate_on_augmented_schema(self):
+        driver = FakeDriver(
+            default=[
+                {
+                    "movie": {
+                        "actorsCount": 2,
+                        "genresAggregate": {"count": 1, "max": {"name": "Drama"}},
+                    }
+                }
+            ]
+        )
+
+        results = graphql_sync(
+            augmented_schema(),
+            "{ Movie { actorsCount genresAggregate { count max { name } } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            {
+                "Movie": [
+                    {
+                        "actorsCount": 2,
+                        "genresAggregate": {"count": 1, "max": {"name": "Drama"}},
+                    }
+                ]
+            },
+            results.data,
+        )
+        self.assertEqual(
+            "MATCH (movie:Movie {}) RETURN movie {actorsCount: "
+            "size([(movie)<-[:ACTED_IN]-(:Actor) | 1]) ,genresAggregate: "
+            "head([movie_genresAggregate_nodes IN "
+            "[[(movie)-[:IN_GENRE]->(movie_genresAggregate:Genre) | movie_genresAggregate]] | "
+            "{count: size(movie_genresAggregate_nodes), max: {name: reduce(m = null, "
+            "v IN [n IN movie_genresAggregate_nodes WHERE n.name IS NOT NULL | n.name] | "
+            "CASE WHEN m IS NULL OR v > m THEN v ELSE m END)}}]) } AS movie SKIP 0",
+            driver.queries[0][0],
+        )
@@ -0,0 +1,72 @@
+import unittest
+
+from graphql import graphql_sync
+
+from strawberry_graphql_neo4j import (
+    ResultBudgetExceeded,
+    make_executable_schema,
+    neo4j_graphql,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+
+
+class SessionConfigDriver(FakeDriver):
+    def session(self, **config):
+        self.session_config = config
+        return super().session(**config)
+
+
+class TestResultBudget(unittest.TestCase):
+
+    schema_definition = """
+    directive @budget(fetchSize: Int, maxRows: Int, maxBytes: Int) on FIELD_DEFINITION
+    type Movie {
+      title: String
+    }
+    type Query {
+      Movie: [Movie] @budget(fetchSize: 2, maxRows: 3)
+      AllMovies: [Movie]
+    }
+    """
+
+    def run_query(self, query, rows, **budget):
+        def resolve(obj, info, **kwargs):
+            return neo4j_graphql(obj, info.context, info, **budget, **kwargs)
+
+        schema = make_executable_schema(
+            self.schema_definition, {"Query": {"Movie": resolve, "AllMovies": resolve}}
+        )
+        driver = SessionConfigDriver(default=lambda query, parameters: rows)
+        result = graphql_sync(schema, query, context_value={"driver": driver})
+        return driver, result
+
+    def movies(self, count):
+        return [{"movie": {"title": f"Movie {i}"}, "allMovies": {"title": f"Movie {i}"}} for i in range(count)]
+
+    def test_field_budget(self):
+        driver, result = self.run_query("{ Movie { title } }", self.movies(3))
+
+        self.assertIsNone(result.errors)
+        self.assertEqual({"fetch_size": 2}, driver.session_config)
+
+        driver, result = self.run_query("{ Movie { title } }", self.movies(4))
+
+        self.assertEqual({"Movie": None}, result.data)
+        self.assertIsInstance(result.errors[0].original_error, ResultBudgetExceeded)
+        self.assertEqual("Result has more than 3 rows", result.errors[0].message)
+
+    def test_call_budget_overrides_field_budget(self):
+        driver, result = self.run_query(
+            "{ Movie { title } }", self.movies(4), fetch_size=100, max_rows=10
+        )
+
+        self.assertIsNone(result.errors)
+        self.assertEqual({"fetch_size": 100}, driver.session_config)
+
+    def test_max_bytes(self):
+        driver, result = self.run_query(
+            "{ AllMovies { title } }", self.movies(10), max_bytes=100
+        )
+
+        self.assertEqual({}, driver.session_config)
+        self.assertEqual("Result is larger than 100 bytes", result.errors[0].message)
@@ -0,0 +1,149 @@
+import unittest
+
+from strawberry_graphql_neo4j.cypher_ir import (
+    MetaField,
+    Match,
+    OrderBy,
+    Projection,
+    PropertyField,
+    RelationCountField,
+    RelationField,
+    RelationSubqueryField,
+    Return,
+    Statement,
+    WhereId,
+    dedupe_projections,
+    push_down_limits,
+    render,
+)
+
+
+class TestCypherIR(unittest.TestCase):
+
+    def statement(self, items):
+        return Statement(
+            [
+                Match("movie", "Movie", '{title: "River Runs Through It, A"}'),
+                Return("movie", Projection(items), 0, -1),
+            ]
+        )
+
+    def test_render_statement(self):
+        actors = RelationField(
+            name="actors",
+            variable="movie",
+            rel_type="ACTED_IN",
+            direction="IN",
+            nested_variable="movie_actors",
+            label="Actor",
+            properties="{}",
+            projection=Projection([PropertyField("name")]),
+            first=3,
+        )
+
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "River Runs Through It, A"}) RETURN movie { .title ,'
+            "actors: [(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | movie_actors { .name }][..3] } "
+            "AS movie SKIP 0",
+            render(self.statement([PropertyField("title"), actors])),
+        )
+
+    def test_meta_field_at_end_of_projection(self):
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "River Runs Through It, A"}) '
+            "RETURN movie {.title , .year } AS movie SKIP 0",
+            render(
+                self.statement(
+                    [PropertyField("title"), PropertyField("year"), MetaField("__typename")]
+                )
+            ),
+        )
+
+    def test_dedupe_projections_pass(self):
+        statement = self.statement(
+            [PropertyField("title"), PropertyField("year"), PropertyField("title")]
+        )
+
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "River Runs Through It, A"}) '
+            "RETURN movie { .title , .year } AS movie SKIP 0",
+            render(statement, passes=[dedupe_projections]),
+        )
+
+    def test_push_down_limits_pass(self):
+        def actors(first=None, offset=None):
+            return RelationField(
+                name="actors",
+                variable="movie",
+                rel_type="ACTED_IN",
+                direction="IN",
+                nested_variable="movie_actors",
+                label="Actor",
+                properties="{}",
+                projection=Projection([PropertyField("name")]),
+                first=first,
+                offset=offset,
+            )
+
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "River Runs Through It, A"}) RETURN movie {actors: COLLECT '
+            "{ MATCH (movie)<-[:ACTED_IN]-(movie_actors:Actor {}) RETURN movie_actors { .name } "
+            "SKIP 1 LIMIT 2 } ,actors: [(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | "
+            "movie_actors { .name }][1..] } AS movie SKIP 0",
+            render(
+                self.statement([actors(first=2, offset=1), actors(offset=1)]),
+                passes=[push_down_limits],
+            ),
+        )
+
+    def test_order_by_before_pagination(self):
+        actors = RelationSubqueryField(
+            name="actors",
+            variable="movie",
+            rel_type="ACTED_IN",
+            direction="IN",
+            nested_variable="movie_actors",
+            label="Actor",
+            properties="{}",
+            projection=Projection([PropertyField("name")]),
+            first=3,
+            offset=0,
+            order_by=[("name", "ASC")],
+        )
+        statement = Statement(
+            [
+                Match("movie", "Movie", "{}"),
+                OrderBy("movie", [("year", "DESC"), ("title", "ASC")], 0, 10),
+                Return("movie", Projection([PropertyField("title"), actors])),
+            ]
+        )
+
+        self.assertEqual(
+            "MATCH (movie:Movie {}) WITH movie ORDER BY movie.year DESC, movie.title ASC "
+            "SKIP 0 LIMIT 10 RETURN movie { .title ,actors: COLLECT { MATCH "
+            "(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) WITH movie_actors ORDER BY "
+            "movie_actors.name ASC RETURN movie_actors { .name } SKIP 0 LIMIT 3 } } AS movie",
+            render(statement),
+        )
+
+    def test_label_disjunctions_are_predicates(self):
+        statement = Statement(
+            [
+                Match("person", "Actor|Director", "{}"),
+                WhereId("person", 1),
+                Return(
+                    "person",
+                    Projection(
+                        [RelationCountField("friendsCount", "person", "KNOWS", "OUT", "Actor|User")]
+                    ),
+                ),
+            ]
+        )
+
+        self.assertEqual(
+            "MATCH (person {}) WHERE person:Actor OR person:Director WITH person "
+            "WHERE ID(person)=1 RETURN person {friendsCount: "
+            "size([(person)-[:KNOWS]->(person_friendsCount) "
+            "WHERE person_friendsCount:Actor OR person_friendsCount:User | 1]) } AS person",
+            render(statement),
+        )
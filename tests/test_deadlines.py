@@ -0,0 +1,224 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from graphql import graphql, graphql_sync
+
+from strawberry_graphql_neo4j import (
+    Deadline,
+    DeadlineExceeded,
+    SingleFlight,
+    make_executable_schema,
+    neo4j_graphql,
+    neo4j_graphql_async,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+MOVIES = [{"movie": {"title": "The Matrix"}}]
+
+
+class TestDeadlines(unittest.TestCase):
+    def test_deadline_becomes_transaction_timeout(self):
+        driver = FakeDriver(default=MOVIES)
+
+        results = schema.execute_sync(
+            "{ Movie { title } }",
+            context_value={"driver": driver, "neo4j_deadline": Deadline(5)},
+        )
+
+        self.assertIsNone(results.errors)
+        [config] = driver.transaction_configs
+        self.assertTrue(4 < config["timeout"] <= 5)
+
+    def test_field_timeout_is_capped_by_deadline(self):
+        schema = make_executable_schema(
+            """
+            directive @budget(timeout: Float) on FIELD_DEFINITION
+            type Movie {
+              title: String
+            }
+            type Query {
+              Movie: [Movie] @budget(timeout: 0.5)
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=MOVIES)
+
+        for deadline in (None, Deadline(10), Deadline(0.2)):
+            graphql_sync(
+                schema,
+                "{ Movie { title } }",
+                context_value={"driver": driver, "neo4j_deadline": deadline},
+            )
+
+        timeouts = [config["timeout"] for config in driver.transaction_configs]
+        self.assertEqual([0.5, 0.5], timeouts[:2])
+        self.assertTrue(0.1 < timeouts[2] <= 0.2)
+
+    def test_expired_deadline_fails_before_running(self):
+        driver = FakeDriver(default=MOVIES)
+
+        results = schema.execute_sync(
+            "{ Movie { title } }",
+            context_value={"driver": driver, "neo4j_deadline": Deadline(0)},
+        )
+
+        self.assertIsInstance(results.errors[0].original_error, DeadlineExceeded)
+        self.assertEqual([], driver.queries)
+
+    def test_server_timeout_raises_deadline_exceeded(self):
+        driver = FakeDriver(default=MOVIES, latency=0.5)
+
+        results = schema.execute_sync(
+            "{ Movie { title } }",
+            context_value={"driver": driver, "neo4j_deadline": Deadline(0.05)},
+        )
+
+        self.assertIsInstance(results.errors[0].original_error, DeadlineExceeded)
+
+    def test_flight_followers_wait_up_to_their_own_deadline(self):
+        # (leader's timeout, follower's timeout), number of queries
+        for timeouts, queries in (((None, 0.05), 1), ((0.05, None), 2)):
+            driver = FakeDriver(default=MOVIES, latency=0.3)
+            flight = SingleFlight()
+            results = {}
+
+            def execute(timeout):
+                deadline = Deadline(timeout) if timeout is not None else None
+                results[timeout] = schema.execute_sync(
+                    "{ Movie { title } }",
+                    context_value={
+                        "driver": driver,
+                        "neo4j_deadline": deadline,
+                        "neo4j_single_flight": flight,
+                    },
+                )
+
+            threads = [
+                threading.Thread(target=execute, args=(timeout,))
+                for timeout in timeouts
+            ]
+            threads[0].start()
+            time.sleep(0.01)
+            threads[1].start()
+            for thread in threads:
+                thread.join()
+
+            # the call without a deadline gets the records, running the read
+            # again when the leader's deadline passes first
+            self.assertIsNone(results[None].errors)
+            self.assertIsInstance(results[0.05].errors[0].original_error, DeadlineExceeded)
+            self.assertEqual(1, flight.shared)
+            self.assertEqual(queries, len(driver.queries))
+
+    def test_async_calls_with_deadlines_share_a_flight(self):
+        schema = make_executable_schema(
+            """
+            type Movie {
+              title: String
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql_async(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=MOVIES, latency=0.2)
+        flight = SingleFlight()
+
+        async def execute():
+            return await graphql(
+                schema,
+                "{ Movie { title } }",
+                context_value={
+                    "driver": driver,
+                    "neo4j_deadline": Deadline(5),
+                    "neo4j_single_flight": flight,
+                },
+            )
+
+        async def execute_both():
+            return await asyncio.gather(execute(), execute())
+
+        results = asyncio.run(execute_both())
+
+        for result in results:
+            self.assertIsNone(result.errors)
+            self.assertEqual({"Movie": [{"title": "The Matrix"}]}, result.data)
+        self.assertEqual(1, flight.shared)
+        self.assertEqual(1, len(driver.queries))
+
+    def test_cancelled_request_terminates_its_transactions(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def respond(query, parameters):
+            if query.startswith("SHOW TRANSACTIONS"):
+                return [{"transactionId": "neo4j-transaction-7"}]
+            if query.startswith("TERMINATE TRANSACTIONS"):
+                release.set()
+                return []
+            started.set()
+            release.wait(5)
+            return MOVIES
+
+        schema = make_executable_schema(
+            """
+            type Movie {
+              title: String
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql_async(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=respond)
+
+        async def cancel_request():
+            loop = asyncio.get_running_loop()
+            task = asyncio.ensure_future(
+                graphql(schema, "{ Movie { title } }", context_value={"driver": driver})
+            )
+            await loop.run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            await loop.run_in_executor(None, release.wait, 5)
+
+        asyncio.run(cancel_request())
+
+        call = driver.transaction_configs[0]["metadata"]["neo4j_graphql_call"]
+        self.assertEqual(
+            [
+                ("MATCH (movie:Movie {}) RETURN movie { .title } AS movie SKIP 0", {}),
+                (
+                    "SHOW TRANSACTIONS YIELD transactionId, metaData "
+                    "WHERE metaData.neo4j_graphql_call = $call RETURN transactionId",
+                    {"call": call},
+                ),
+                ("TERMINATE TRANSACTIONS $ids", {"ids": ["neo4j-transaction-7"]}),
+            ],
+            driver.queries,
+        )
@@ -0,0 +1,92 @@
+import unittest
+from unittest import mock
+
+from neo4j.conf import PoolConfig, WorkspaceConfig
+from neo4j.io import IOPool
+
+from strawberry_graphql_neo4j import ManagedDriver, managed_driver, recommended_pool_size
+from strawberry_graphql_neo4j.testing import FakeDriver
+
+
+class FakeConnection:
+    in_use = False
+
+    def closed(self):
+        return False
+
+    def defunct(self):
+        return False
+
+    def timedout(self):
+        return False
+
+
+class PooledSession:
+    def __init__(self, pool):
+        self._pool = pool
+        self._connection = None
+
+    def begin_transaction(self):
+        self._connection = self._pool.acquire()
+
+    def close(self):
+        if self._connection is not None:
+            self._pool.release(self._connection)
+
+
+class PooledDriver(FakeDriver):
+    """FakeDriver whose sessions hold connections of a neo4j connection pool."""
+
+    def __init__(self, max_connection_pool_size=100):
+        super().__init__()
+        self.opened = []
+        self._pool = IOPool(
+            self._open,
+            PoolConfig(max_connection_pool_size=max_connection_pool_size),
+            WorkspaceConfig(),
+        )
+        self._pool.acquire = lambda: self._pool._acquire("localhost", None)
+
+    def _open(self, address, timeout):
+        self.opened.append(address)
+        return FakeConnection()
+
+    def session(self, **config):
+        return PooledSession(self._pool)
+
+
+class TestManagedDriver(unittest.TestCase):
+    def test_recommended_pool_size(self):
+        self.assertEqual(10, recommended_pool_size(8))
+        self.assertEqual(40, recommended_pool_size(8, root_field_workers=4))
+        self.assertEqual(1, recommended_pool_size(0))
+
+    def test_warm_up_opens_idle_connections(self):
+        driver = ManagedDriver(PooledDriver())
+
+        driver.warm_up(3)
+        session = driver.session()
+        session.begin_transaction()
+
+        self.assertEqual(3, len(driver.opened))
+        metrics = driver.pool_metrics()
+        self.assertEqual(100, metrics["max_size"])
+        self.assertEqual(1, metrics["in_use"])
+        self.assertEqual(2, metrics["idle"])
+        self.assertEqual(4, metrics["acquisitions"])
+        self.assertGreaterEqual(metrics["max_wait_time"], 0)
+
+    def test_managed_driver_sizes_verifies_and_warms_up(self):
+        pooled = PooledDriver(max_connection_pool_size=5)
+        pooled.verify_connectivity = mock.Mock()
+        with mock.patch(
+            "strawberry_graphql_neo4j.driver.GraphDatabase.driver", return_value=pooled
+        ) as create:
+            driver = managed_driver("bolt://localhost:7687", concurrency=4)
+
+        create.assert_called_once_with(
+            "bolt://localhost:7687", auth=None, max_connection_pool_size=5
+        )
+        pooled.verify_connectivity.assert_called_once_with()
+        self.assertEqual(4, len(pooled.opened))
+        self.assertEqual(4, driver.pool_metrics()["idle"])
@@ -0,0 +1,147 @@
+import threading
+import unittest
+
+from graphql import graphql_sync
+
+from strawberry_graphql_neo4j import (
+    TransactionExecutionContext,
+    make_executable_schema,
+    neo4j_graphql,
+    thread_pool_execution_context,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+
+
+class TestThreadPoolExecution(unittest.TestCase):
+
+    schema_definition = """
+    type Query {
+        Movie: String
+        Genre: String
+        Actor: String
+    }
+    """
+
+    def run_query(self, resolve, query, execution_context_class):
+        schema = make_executable_schema(
+            self.schema_definition,
+            {"Query": {"Movie": resolve, "Genre": resolve, "Actor": resolve}},
+        )
+        return graphql_sync(
+            schema, query, execution_context_class=execution_context_class
+        )
+
+    def test_root_fields_resolved_concurrently(self):
+        barrier = threading.Barrier(3, timeout=5)
+
+        def resolve(_, info):
+            # only returns once all three root fields are being resolved at once
+            barrier.wait()
+            return info.field_name
+
+        results = self.run_query(
+            resolve,
+            "{ Movie Genre Actor }",
+            thread_pool_execution_context(max_workers=3),
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            {"Movie": "Movie", "Genre": "Genre", "Actor": "Actor"}, results.data
+        )
+
+    def test_errors_are_reported_per_field(self):
+        def resolve(_, info):
+            if info.field_name == "Genre":
+                raise Exception("Genre failed")
+            return info.field_name
+
+        results = self.run_query(
+            resolve, "{ Movie Genre }", thread_pool_execution_context(max_workers=2)
+        )
+
+        self.assertEqual({"Movie": "Movie", "Genre": None}, results.data)
+        self.assertEqual("Genre failed", results.errors[0].message)
+
+
+class TestTransactionExecution(unittest.TestCase):
+
+    schema_definition = """
+    directive @cypher(statement: String!) on FIELD_DEFINITION
+    type Movie {
+        title: String
+    }
+    type Genre {
+        name: String
+    }
+    type Query {
+        Movie: [Movie]
+    }
+    type Mutation {
+        CreateMovie(title: String): Movie
+        CreateGenre(name: String): Genre
+    }
+    """
+
+    def run_mutation(self, driver):
+        def resolve(obj, info, **kwargs):
+            return neo4j_graphql(obj, info.context, info, **kwargs)
+
+        schema = make_executable_schema(
+            self.schema_definition,
+            {"Mutation": {"CreateMovie": resolve, "CreateGenre": resolve}},
+        )
+        return graphql_sync(
+            schema,
+            'mutation { CreateMovie(title: "Heat") { title } '
+            'CreateGenre(name: "Crime") { name } }',
+            context_value={"driver": driver},
+            execution_context_class=TransactionExecutionContext,
+        )
+
+    def test_mutation_fields_share_one_transaction(self):
+        def respond(query, parameters):
+            if "Genre" in query:
+                return [{"genre": parameters["params"]}]
+            return [{"movie": parameters["params"]}]
+
+        driver = FakeDriver(default=respond)
+
+        results = self.run_mutation(driver)
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            {"CreateMovie": {"title": "Heat"}, "CreateGenre": {"name": "Crime"}},
+            results.data,
+        )
+        self.assertEqual(
+            [
+                "CREATE (movie:Movie) SET movie = $params RETURN movie { .title } AS movie",
+                "CREATE (genre:Genre) SET genre = $params RETURN genre { .name } AS genre",
+            ],
+            [query for query, _ in driver.queries],
+        )
+        [transaction] = driver.transactions
+        self.assertTrue(transaction.committed)
+
+    def test_failed_field_rolls_back_the_operation(self):
+        def respond(query, parameters):
+            if "Genre" in query:
+                raise Exception("Genre failed")
+            return [{"movie": parameters["params"]}]
+
+        driver = FakeDriver(default=respond)
+
+        results = self.run_mutation(driver)
+
+        self.assertEqual({"CreateMovie": None, "CreateGenre": None}, results.data)
+        self.assertEqual(
+            [
+                ("Mutation rolled back because another field failed", ["CreateMovie"]),
+                ("Genre failed", ["CreateGenre"]),
+            ],
+            [(error.message, error.path) for error in results.errors],
+        )
+        [transaction] = driver.transactions
+        self.assertTrue(transaction.rolled_back)
+        self.assertFalse(transaction.committed)
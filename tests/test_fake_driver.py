@@ -0,0 +1,148 @@
+import time
+import unittest
+
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+class TestFakeDriver(unittest.TestCase):
+
+    def execute(self, driver, graphql_query):
+        results = schema.execute_sync(graphql_query, context_value={"driver": driver})
+        if results.errors:
+            raise results.errors[0]
+        return results.data
+
+    def test_neo4j_graphql_end_to_end(self):
+        driver = FakeDriver(
+            {
+                'MATCH (movie:Movie {year: 1999}) RETURN movie { .title ,'
+                "actors: [(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | movie_actors { .name }] } "
+                "AS movie SKIP 0": [
+                    {"movie": {"title": "The Matrix", "actors": [{"name": "Keanu Reeves"}]}},
+                    {"movie": {"title": "Fight Club", "actors": []}},
+                ]
+            }
+        )
+
+        data = self.execute(driver, "{ Movie(year: 1999) { title actors { name } } }")
+
+        self.assertEqual(
+            {
+                "Movie": [
+                    {"title": "The Matrix", "actors": [{"name": "Keanu Reeves"}]},
+                    {"title": "Fight Club", "actors": []},
+                ]
+            },
+            data,
+        )
+        self.assertEqual([{"year": 1999}], [params for _, params in driver.queries])
+
+    def test_responses_are_keyed_by_fingerprint(self):
+        driver = FakeDriver(
+            {
+                'MATCH (movie:Movie {title: "A"}) RETURN movie { .title } AS movie SKIP 0': [
+                    {"movie": {"title": "B"}}
+                ]
+            }
+        )
+
+        data = self.execute(driver, '{ Movie(title: "B") { title } }')
+
+        self.assertEqual({"Movie": [{"title": "B"}]}, data)
+
+    def test_generated_records_and_default(self):
+        def generate(query, parameters):
+            return [{"movie": {"title": parameters["movieId"]}}]
+
+        driver = FakeDriver(default=generate)
+
+        data = self.execute(driver, '{ MovieById(movieId: "42") { title } }')
+
+        self.assertEqual({"MovieById": {"title": "42"}}, data)
+
+    def test_order_by_is_translated_before_pagination(self):
+        driver = FakeDriver(default=[])
+
+        self.execute(
+            driver, "{ Movie(first: 2, orderBy: [year_desc, title_asc]) { title } }"
+        )
+
+        self.assertEqual(
+            "MATCH (movie:Movie {}) WITH movie ORDER BY movie.year DESC, movie.title ASC "
+            "SKIP 0 LIMIT 2 RETURN movie { .title } AS movie",
+            driver.queries[0][0],
+        )
+
+    def test_relationship_count_and_aggregates(self):
+        driver = FakeDriver(
+            default=[
+                {
+                    "movie": {
+                        "actorsCount": 2,
+                        "actorsAggregate": {"min": {"name": "Carrie"}, "avg": {"born": 1964.5}},
+                    }
+                }
+            ]
+        )
+
+        data = self.execute(
+            driver,
+            "{ Movie { actorsCount actorsAggregate { min { name } avg { born } } } }",
+        )
+
+        self.assertEqual(
+            "MATCH (movie:Movie {}) RETURN movie {actorsCount: "
+            "size([(movie)<-[:ACTED_IN]-(:Actor) | 1]) ,actorsAggregate: "
+            "head([movie_actorsAggregate_nodes IN "
+            "[[(movie)<-[:ACTED_IN]-(movie_actorsAggregate:Actor) | movie_actorsAggregate]] | "
+            "{min: {name: reduce(m = null, v IN [n IN movie_actorsAggregate_nodes "
+            "WHERE n.name IS NOT NULL | n.name] | CASE WHEN m IS NULL OR v < m THEN v ELSE m END)}, "
+            "avg: {born: head([l IN [[n IN movie_actorsAggregate_nodes "
+            "WHERE n.born IS NOT NULL | n.born]] | CASE size(l) WHEN 0 THEN null "
+            "ELSE reduce(s = 0.0, v IN l | s + v) / size(l) END])}}]) } AS movie SKIP 0",
+            driver.queries[0][0],
+        )
+        self.assertEqual(
+            {
+                "Movie": [
+                    {
+                        "actorsCount": 2,
+                        "actorsAggregate": {"min": {"name": "Carrie"}, "avg": {"born": 1964.5}},
+                    }
+                ]
+            },
+            data,
+        )
+
+    def test_aggregate_selections_with_fragments(self):
+        driver = FakeDriver(default=[])
+
+        self.execute(
+            driver,
+            "{ Movie { actorsAggregate { count ... on ActorAggregate { min { name } } "
+            "...Max min { ... on ActorAggregateValues { born } } } } } "
+            "fragment Max on ActorAggregate { max { name } }",
+        )
+
+        self.assertEqual(
+            "MATCH (movie:Movie {}) RETURN movie {actorsAggregate: "
+            "head([movie_actorsAggregate_nodes IN "
+            "[[(movie)<-[:ACTED_IN]-(movie_actorsAggregate:Actor) | movie_actorsAggregate]] | "
+            "{count: size(movie_actorsAggregate_nodes), min: {name: reduce(m = null, "
+            "v IN [n IN movie_actorsAggregate_nodes WHERE n.name IS NOT NULL | n.name] | "
+            "CASE WHEN m IS NULL OR v < m THEN v ELSE m END), born: reduce(m = null, "
+            "v IN [n IN movie_actorsAggregate_nodes WHERE n.born IS NOT NULL | n.born] | "
+            "CASE WHEN m IS NULL OR v < m THEN v ELSE m END)}, max: {name: reduce(m = null, "
+            "v IN [n IN movie_actorsAggregate_nodes WHERE n.name IS NOT NULL | n.name] | "
+            "CASE WHEN m IS NULL OR v > m THEN v ELSE m END)}}]) } AS movie SKIP 0",
+            driver.queries[0][0],
+        )
+
+    def test_latency_injection(self):
+        driver = FakeDriver(default=[], latency=0.05)
+
+        start = time.perf_counter()
+        self.execute(driver, "{ Movie { title } }")
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.05)
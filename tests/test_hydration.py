@@ -0,0 +1,139 @@
+import unittest
+from types import SimpleNamespace
+
+from graphql import graphql_sync
+from neo4j import Record
+
+from strawberry_graphql_neo4j import make_executable_schema, neo4j_graphql
+from strawberry_graphql_neo4j.hydration import LAZY, RAW, hydrate, hydrate_records
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import Actor, Movie, schema
+
+
+def resolve_info(field_name):
+    return SimpleNamespace(
+        schema=schema,
+        return_type=schema.get_type_by_name("Query").get_field(field_name).type,
+    )
+
+
+class TestHydration(unittest.TestCase):
+
+    movie = {
+        "title": "The Matrix",
+        "actors": [{"name": "Keanu Reeves"}, {"name": "Carrie-Anne Moss"}],
+        "plot": "not a field of Movie",
+    }
+
+    def test_hydrate_records_reads_records_directly(self):
+        records = [Record(zip(["movie"], [self.movie]))]
+
+        movies = hydrate_records(resolve_info("Movie"), records)
+
+        self.assertEqual(
+            [
+                Movie(
+                    title="The Matrix",
+                    actors=[Actor(name="Keanu Reeves"), Actor(name="Carrie-Anne Moss")],
+                )
+            ],
+            movies,
+        )
+
+    def test_single_result(self):
+        info = resolve_info("MovieById")
+
+        self.assertIsNone(hydrate_records(info, []))
+        self.assertEqual(
+            hydrate(info, self.movie),
+            hydrate_records(info, [{"movie": self.movie}, {"movie": {}}]),
+        )
+
+    def test_lazy_mode_hydrates_fields_on_access(self):
+        [movie] = hydrate_records(resolve_info("Movie"), [{"movie": self.movie}], LAZY)
+
+        self.assertIsInstance(movie, Movie)
+        self.assertNotIn("actors", vars(movie))
+        self.assertEqual(
+            [Actor(name="Keanu Reeves"), Actor(name="Carrie-Anne Moss")],
+            [Actor(name=actor.name) for actor in movie.actors],
+        )
+        self.assertIsInstance(movie.actors[0], Actor)
+        self.assertIsNone(movie.year)
+
+    def test_lazy_mode_end_to_end(self):
+        driver = FakeDriver(default=[{"movie": self.movie}])
+
+        results = schema.execute_sync(
+            "{ Movie { title actors { name } } }",
+            context_value={"driver": driver, "result_mode": LAZY},
+        )
+
+        self.assertEqual(
+            {
+                "Movie": [
+                    {
+                        "title": "The Matrix",
+                        "actors": [{"name": "Keanu Reeves"}, {"name": "Carrie-Anne Moss"}],
+                    }
+                ]
+            },
+            results.data,
+        )
+
+    def test_raw_mode_returns_projected_maps(self):
+        records = [Record(zip(["movie"], [self.movie]))]
+
+        self.assertEqual(
+            [self.movie], hydrate_records(resolve_info("Movie"), records, RAW)
+        )
+
+    def test_executable_schema_end_to_end(self):
+        schema = make_executable_schema(
+            """
+            directive @relation(name:String!, direction:String!) on FIELD_DEFINITION
+            type Movie {
+              title: String
+              actors: [Actor] @relation(name: "ACTED_IN", direction:"IN")
+            }
+            type Actor {
+              name: String
+            }
+            type Query {
+              Movie(title: String): [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=[{"movie": self.movie}])
+
+        results = graphql_sync(
+            schema,
+            '{ Movie(title: "The Matrix") { title actors { name } } }',
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            {
+                "Movie": [
+                    {
+                        "title": "The Matrix",
+                        "actors": [{"name": "Keanu Reeves"}, {"name": "Carrie-Anne Moss"}],
+                    }
+                ]
+            },
+            results.data,
+        )
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "The Matrix"}) RETURN movie { .title ,'
+            "actors: [(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | movie_actors { .name }] } "
+            "AS movie SKIP 0",
+            driver.queries[0][0],
+        )
@@ -0,0 +1,192 @@
+import asyncio
+import typing
+import unittest
+
+import strawberry
+from graphql import graphql_sync
+from strawberry.types import Info
+
+from strawberry_graphql_neo4j import (
+    defer_keys,
+    make_executable_schema,
+    neo4j_graphql,
+    node_loader,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+
+
+@strawberry.type
+class Person:
+    name: typing.Optional[str] = None
+
+
+@strawberry.type
+class Movie:
+    title: typing.Optional[str] = None
+    directorId: typing.Optional[str] = None
+
+    @strawberry.field
+    def director(self, info: Info) -> typing.Optional[Person]:
+        return node_loader(info).load(self.directorId)
+
+    @strawberry.field
+    async def writer(self, info: Info) -> typing.Optional[Person]:
+        return await node_loader(info).load_async(self.directorId)
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def Movie(self, info: Info) -> typing.List[Movie]:
+        movies = neo4j_graphql(None, info.context, info)
+        defer_keys(info, "director", [movie.directorId for movie in movies])
+        return movies
+
+
+schema = strawberry.Schema(query=Query)
+
+PEOPLE = {"1": {"name": "Lana Wachowski"}, "2": {"name": "David Fincher"}}
+
+
+def respond(query, parameters):
+    if query.startswith("UNWIND"):
+        keys = [key for key in parameters["keys"] if key in PEOPLE]
+        return [{"key": key, "person": PEOPLE[key]} for key in keys]
+    return [
+        {"movie": {"title": "The Matrix", "directorId": "1"}},
+        {"movie": {"title": "Fight Club", "directorId": "2"}},
+        {"movie": {"title": "The Matrix Reloaded", "directorId": "1"}},
+        {"movie": {"title": "Unknown", "directorId": "3"}},
+    ]
+
+
+class TestNodeLoader(unittest.TestCase):
+
+    def loader_queries(self, driver):
+        return [query for query in driver.queries if query[0].startswith("UNWIND")]
+
+    def test_load_async_batches_keys(self):
+        driver = FakeDriver(default=respond)
+
+        results = asyncio.run(
+            schema.execute(
+                "{ Movie { title directorId writer { name } } }",
+                context_value={"driver": driver},
+            )
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            [
+                {"name": "Lana Wachowski"},
+                {"name": "David Fincher"},
+                {"name": "Lana Wachowski"},
+                None,
+            ],
+            [movie["writer"] for movie in results.data["Movie"]],
+        )
+        self.assertEqual(
+            [
+                (
+                    "UNWIND $keys AS key MATCH (person:Person {id: key}) "
+                    "RETURN key, person { .name } AS person",
+                    {"keys": ["1", "2", "3"]},
+                )
+            ],
+            self.loader_queries(driver),
+        )
+
+    def test_load_batches_deferred_keys(self):
+        driver = FakeDriver(default=respond)
+
+        results = schema.execute_sync(
+            "{ Movie { directorId director { name } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            ["Lana Wachowski", "David Fincher", "Lana Wachowski", None],
+            [(movie["director"] or {}).get("name") for movie in results.data["Movie"]],
+        )
+        self.assertEqual(
+            [
+                (
+                    "UNWIND $keys AS key MATCH (person:Person {id: key}) "
+                    "RETURN key, person { .name } AS person",
+                    {"keys": ["1", "2", "3"]},
+                )
+            ],
+            self.loader_queries(driver),
+        )
+
+    def test_raw_results_and_interface_labels_in_executable_schema(self):
+        def movies(obj, info, **kwargs):
+            result = neo4j_graphql(obj, info.context, info, **kwargs)
+            defer_keys(info, "director", [movie["directorId"] for movie in result])
+            return result
+
+        schema = make_executable_schema(
+            """
+            interface Person {
+              name: String
+            }
+            type Director implements Person {
+              name: String
+            }
+            type Actor implements Person {
+              name: String
+            }
+            type Movie {
+              title: String
+              directorId: String
+              director: Person
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {"Movie": movies},
+                "Movie": {
+                    "director": lambda obj, info: node_loader(info).load(
+                        obj["directorId"]
+                    )
+                },
+            },
+        )
+
+        def respond(query, parameters):
+            if query.startswith("UNWIND"):
+                return [{"key": "1", "person": {"__typename": "Director", "name": "Lana"}}]
+            return [
+                {"movie": {"directorId": "1"}},
+                {"movie": {"directorId": "2"}},
+            ]
+
+        driver = FakeDriver(default=respond)
+
+        results = graphql_sync(
+            schema,
+            "{ Movie { directorId director { __typename name } } }",
+            context_value={"driver": driver},
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(
+            [{"__typename": "Director", "name": "Lana"}, None],
+            [movie["director"] for movie in results.data["Movie"]],
+        )
+        self.assertEqual(
+            [
+                (
+                    "UNWIND $keys AS key MATCH (person {id: key}) "
+                    "WHERE person:Director OR person:Actor WITH person RETURN key, CASE "
+                    'WHEN person:Director THEN person { __typename: "Director" , .name } '
+                    'WHEN person:Actor THEN person { __typename: "Actor" , .name } '
+                    "END AS person",
+                    {"keys": ["1", "2"]},
+                )
+            ],
+            self.loader_queries(driver),
+        )
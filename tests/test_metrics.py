@@ -0,0 +1,109 @@
+import gc
+import threading
+import unittest
+
+from strawberry_graphql_neo4j import MetricsRegistry, QuerySample
+from strawberry_graphql_neo4j.metrics import statement_fingerprint
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+class TestMetrics(unittest.TestCase):
+
+    query = 'MATCH (movie:Movie {title: "The Matrix"}) RETURN movie { .title } AS movie SKIP 0'
+
+    def test_neo4j_graphql_records_samples(self):
+        metrics = MetricsRegistry()
+        driver = FakeDriver(
+            {self.query: [{"movie": {"title": "The Matrix"}}, {"movie": {"title": "x"}}]}
+        )
+        context = {"driver": driver, "neo4j_metrics": metrics}
+
+        for title in ("The Matrix", "Speed"):
+            schema.execute_sync(
+                '{ Movie(title: "%s") { title } }' % title, context_value=context
+            )
+        schema.execute_sync("{ Movie { title unknown } }", context_value=context)
+
+        statement, fingerprint = statement_fingerprint(self.query)
+        [series] = metrics.collect().values()
+        self.assertEqual([("Query.Movie", statement)], list(metrics.collect()))
+        self.assertEqual((2, 0, 4), (series.requests, series.errors, series.rows))
+        for phase in ("translation", "db", "hydration"):
+            self.assertEqual(2, sum(series.phases[phase].counts))
+        self.assertEqual(fingerprint, metrics.statements[statement])
+
+        text = metrics.prometheus_text()
+        self.assertIn(
+            f'neo4j_graphql_requests_total{{field="Query.Movie",statement="{statement}"}} 2',
+            text,
+        )
+        self.assertIn(
+            f'neo4j_graphql_phase_seconds_bucket{{field="Query.Movie",statement="{statement}",'
+            'phase="db",le="+Inf"} 2',
+            text,
+        )
+        self.assertIn(
+            f'neo4j_graphql_statement_info{{statement="{statement}",'
+            'fingerprint="MATCH (movie:Movie {title: ?}) RETURN movie { .title } AS movie SKIP ?"} 1',
+            text,
+        )
+
+    def test_errors_and_custom_sinks(self):
+        class Sink:
+            def __init__(self):
+                self.samples = []
+
+            def record(self, sample):
+                self.samples.append(sample)
+
+        class FailingDriver(FakeDriver):
+            def _execute(self, query, parameters, config):
+                raise RuntimeError("connection lost")
+
+        metrics, sink = MetricsRegistry(), Sink()
+        result = schema.execute_sync(
+            "{ Movie { title } }",
+            context_value={"driver": FailingDriver(), "neo4j_metrics": [metrics, sink]},
+        )
+
+        self.assertIsNotNone(result.errors)
+        [sample] = sink.samples
+        self.assertIsInstance(sample.error, RuntimeError)
+        self.assertIsNotNone(sample.translation)
+        self.assertIsNone(sample.db)
+        [series] = metrics.collect().values()
+        self.assertEqual((1, 1), (series.requests, series.errors))
+
+    def test_threads_record_into_their_own_shards(self):
+        metrics = MetricsRegistry()
+        sample = QuerySample("Query.Movie", self.query, 0.001, 0.002, 0.003, rows=1)
+
+        def record():
+            for _ in range(1000):
+                metrics.record(sample)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        [series] = metrics.collect().values()
+        self.assertEqual(4000, series.requests)
+        self.assertEqual(4000, series.rows)
+        self.assertAlmostEqual(12.0, series.phases["hydration"].sum)
+
+    def test_shards_of_exited_threads_are_retired(self):
+        metrics = MetricsRegistry()
+        sample = QuerySample("Query.Movie", self.query, 0.001, 0.002, 0.003, rows=1)
+
+        for _ in range(20):
+            thread = threading.Thread(target=metrics.record, args=(sample,))
+            thread.start()
+            thread.join()
+        gc.collect()
+
+        self.assertEqual({}, metrics._shards)
+        [series] = metrics.collect().values()
+        self.assertEqual(20, series.requests)
@@ -0,0 +1,70 @@
+import unittest
+
+from strawberry_graphql_neo4j.profiling import Profiler, attribute_plan
+
+
+class TestProfiling(unittest.TestCase):
+
+    def test_attribute_plan_to_fields(self):
+        plan = {
+            "operatorType": "ProduceResults",
+            "identifiers": ["movie"],
+            "rows": 2,
+            "dbHits": 0,
+            "children": [
+                {
+                    "operatorType": "Projection",
+                    "identifiers": ["movie"],
+                    "args": {
+                        "Details": "movie {.title, actors: movie_actors, similar: movie_similar}"
+                    },
+                    "rows": 2,
+                    "dbHits": 4,
+                    "children": [
+                        {
+                            "operatorType": "Expand(All)",
+                            "identifiers": ["movie", "movie_actors"],
+                            "rows": 6,
+                            "dbHits": 12,
+                            "children": [
+                                {
+                                    "operatorType": "NodeByLabelScan",
+                                    "identifiers": ["movie"],
+                                    "rows": 2,
+                                    "dbHits": 3,
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
+        markers = {"movie_actors": "Movie.actors", "movie_similar": "Movie.similar"}
+
+        report = attribute_plan(plan, markers, "Movie")
+
+        self.assertEqual(19, report["dbHits"])
+        self.assertEqual(2, report["rows"])
+        self.assertEqual(7, report["fields"]["Movie"]["dbHits"])
+        self.assertEqual(12, report["fields"]["Movie.actors"]["dbHits"])
+        self.assertEqual(6, report["fields"]["Movie.actors"]["rows"])
+
+    def test_attribute_explain_plan_uses_estimated_rows(self):
+        plan = {
+            "operatorType": "ProduceResults",
+            "identifiers": ["movie"],
+            "args": {"EstimatedRows": 10.0},
+            "children": [],
+        }
+
+        report = attribute_plan(plan, {}, "Movie")
+
+        self.assertEqual(0, report["dbHits"])
+        self.assertEqual(10, report["rows"])
+
+    def test_profiler_mode_and_sampling(self):
+        self.assertEqual("EXPLAIN MATCH (n) RETURN n", Profiler("EXPLAIN").prefix("MATCH (n) RETURN n"))
+        self.assertFalse(Profiler(sample_rate=0).sampled())
+        self.assertTrue(Profiler(sample_rate=1).sampled())
+        with self.assertRaises(ValueError):
+            Profiler("ANALYZE")
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import unittest
+
+from strawberry_graphql_neo4j import Deadline, DeadlineExceeded, SingleFlight
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+from tests.test_loader import respond, schema as loader_schema
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    movies = [{"movie": {"title": "The Matrix"}}]
+
+    def execute_at_once(self, queries, context):
+        barrier = threading.Barrier(len(queries))
+        results = [None] * len(queries)
+
+        def execute(index, query):
+            barrier.wait()
+            results[index] = schema.execute_sync(query, context_value=dict(context))
+
+        threads = [
+            threading.Thread(target=execute, args=item) for item in enumerate(queries)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_concurrent_identical_reads_share_one_call(self):
+        driver = FakeDriver(default=self.movies, latency=0.2)
+        flight = SingleFlight()
+
+        results = self.execute_at_once(
+            ['{ Movie(title: "The Matrix") { title } }'] * 4,
+            {"driver": driver, "neo4j_single_flight": flight},
+        )
+
+        self.assertEqual(1, len(driver.queries))
+        self.assertEqual(3, flight.shared)
+        self.assertEqual(0, flight.in_flight())
+        for result in results:
+            self.assertIsNone(result.errors)
+            self.assertEqual({"Movie": [{"title": "The Matrix"}]}, result.data)
+
+    def test_reads_are_not_kept_after_the_call(self):
+        driver = FakeDriver(default=self.movies)
+        context = {"driver": driver, "neo4j_single_flight": SingleFlight()}
+
+        for title in ("The Matrix", "The Matrix", "Speed"):
+            schema.execute_sync(
+                '{ Movie(title: "%s") { title } }' % title, context_value=context
+            )
+
+        self.assertEqual(3, len(driver.queries))
+
+    def test_threads_and_coroutines_share_calls_and_errors(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def fail():
+            calls.append(1)
+            started.set()
+            release.wait()
+            raise ValueError("unavailable")
+
+        errors = []
+
+        def lead():
+            try:
+                flight.do("key", fail)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait()
+
+        async def follow():
+            follower = asyncio.ensure_future(flight.do_async("key", fail))
+            await asyncio.sleep(0.01)
+            release.set()
+            with self.assertRaises(ValueError) as raised:
+                await follower
+            return raised.exception
+
+        error = asyncio.run(follow())
+        leader.join()
+
+        self.assertEqual(1, len(calls))
+        self.assertIs(errors[0], error)
+
+    def test_cancelled_leader_leaves_followers_to_run_the_call(self):
+        flight = SingleFlight()
+        started = threading.Event()
+        terminated = threading.Event()
+        leader_deadline = Deadline()
+        leader_deadline.on_cancel(terminated.set)
+        calls = []
+
+        def read():
+            calls.append(1)
+            if len(calls) == 1:
+                started.set()
+                terminated.wait(5)
+                raise ValueError("terminated")
+            return "records"
+
+        errors = []
+
+        def lead():
+            try:
+                flight.do("key", read, leader_deadline)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=lead)
+        leader.start()
+        started.wait()
+
+        async def follow():
+            follower = asyncio.ensure_future(flight.do_async("key", read, Deadline()))
+            await asyncio.sleep(0.01)
+            # a follower whose own deadline is cancelled stops waiting at once
+            cancelled_deadline = Deadline()
+            cancelled = asyncio.ensure_future(
+                flight.do_async("key", read, cancelled_deadline)
+            )
+            await asyncio.sleep(0.01)
+            cancelled_deadline.cancel()
+            with self.assertRaises(DeadlineExceeded):
+                await cancelled
+            leader_deadline.cancel()
+            return await follower
+
+        result = asyncio.run(follow())
+        leader.join()
+
+        self.assertEqual("records", result)
+        self.assertEqual(2, len(calls))
+        self.assertEqual("terminated", str(errors[0]))
+
+    def test_node_loaders_of_concurrent_requests_share_batches(self):
+        driver = FakeDriver(default=respond, latency=0.1)
+        flight = SingleFlight()
+
+        async def execute():
+            return await loader_schema.execute(
+                "{ Movie { title writer { name } } }",
+                context_value={"driver": driver, "neo4j_single_flight": flight},
+            )
+
+        async def execute_both():
+            return await asyncio.gather(execute(), execute())
+
+        first, second = asyncio.run(execute_both())
+
+        self.assertIsNone(first.errors)
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            1, len([query for query in driver.queries if query[0].startswith("UNWIND")])
+        )
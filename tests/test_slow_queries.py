@@ -0,0 +1,112 @@
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from graphql import graphql_sync
+
+from strawberry_graphql_neo4j import (
+    SlowQueryLog,
+    make_executable_schema,
+    neo4j_graphql,
+    redact_parameters,
+)
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+class TestSlowQueryLog(unittest.TestCase):
+    def test_logs_calls_above_threshold(self):
+        mutation_schema = make_executable_schema(
+            """
+            type Movie {
+                title: String
+                password: String
+            }
+            type Query {
+                Movie: [Movie]
+            }
+            type Mutation {
+                CreateMovie(title: String, password: String): Movie
+            }
+            """,
+            {
+                "Mutation": {
+                    "CreateMovie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        slow_log = SlowQueryLog(threshold=0.01, redact=redact_parameters("password"))
+        driver = FakeDriver(default=[{"movie": {"title": "Heat"}}], latency=0.02)
+
+        with self.assertLogs("neo4j_graphql_py.slow_queries") as logs:
+            graphql_sync(
+                mutation_schema,
+                'mutation { CreateMovie(title: "Heat", password: "secret") { title } }',
+                context_value={"driver": driver, "neo4j_metrics": slow_log},
+            )
+
+        [record] = logs.records
+        entry = record.neo4j_query
+        self.assertEqual("CreateMovie", entry["path"])
+        self.assertEqual("Mutation.CreateMovie", entry["field"])
+        self.assertEqual(
+            "CREATE (movie:Movie) SET movie = $params RETURN movie { .title } AS movie",
+            entry["fingerprint"],
+        )
+        self.assertEqual(
+            {"params": {"title": "Heat", "password": "***"}}, entry["parameters"]
+        )
+        self.assertGreaterEqual(entry["db"], 0.02)
+        self.assertEqual(1, entry["rows"])
+        self.assertNotIn("secret", record.getMessage())
+
+    def test_fast_calls_are_not_logged(self):
+        slow_log = SlowQueryLog(threshold=10, logger=mock.Mock())
+
+        schema.execute_sync(
+            "{ Movie { title } }",
+            context_value={"driver": FakeDriver(), "neo4j_metrics": slow_log},
+        )
+
+        slow_log.logger.log.assert_not_called()
+
+    def test_debug_output_is_printed_unless_debug_logging_is_on(self):
+        debug_schema = make_executable_schema(
+            """
+            type Movie {
+                title: String
+            }
+            type Query {
+                Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, debug=True, **kwargs
+                    )
+                }
+            },
+        )
+        query = "MATCH (movie:Movie {}) RETURN movie { .title } AS movie SKIP 0"
+
+        def execute():
+            graphql_sync(
+                debug_schema, "{ Movie { title } }", context_value={"driver": FakeDriver()}
+            )
+
+        with contextlib.redirect_stdout(io.StringIO()) as printed:
+            execute()
+        with self.assertLogs("neo4j_graphql_py", "DEBUG") as logs:
+            with contextlib.redirect_stdout(io.StringIO()) as silent:
+                execute()
+
+        self.assertEqual(f"query: {query}\nkwargs: {{}}\n", printed.getvalue())
+        self.assertEqual(
+            [f"query: {query}", "kwargs: {}"],
+            [record.getMessage() for record in logs.records],
+        )
+        self.assertEqual("", silent.getvalue())
@@ -0,0 +1,216 @@
+import asyncio
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from graphql import graphql, graphql_sync
+
+from strawberry_graphql_neo4j import (
+    QuerySplitter,
+    make_executable_schema,
+    neo4j_graphql,
+    neo4j_graphql_async,
+)
+from strawberry_graphql_neo4j.cypher_ir import Projection, PropertyField, RelationField
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+QUERY = "{ Movie { title actors { name } actorsCount genres { name } } }"
+
+
+def respond(query, parameters):
+    if query.startswith("UNWIND $ids"):
+        return [
+            {"id": id, "movie": {"genres": [{"name": f"Genre {id}"}]}}
+            for id in parameters["ids"]
+        ]
+    return [
+        {
+            "movie": {
+                "title": "The Matrix",
+                "actors": [{"name": "Keanu Reeves"}],
+                "genres": [],
+                "__id": 1,
+            }
+        },
+        {"movie": {"title": "Speed", "actors": [], "genres": [], "__id": 2}},
+    ]
+
+
+class TestQuerySplitter(unittest.TestCase):
+    def execute(self, splitter):
+        driver = FakeDriver(default=respond)
+        results = schema.execute_sync(
+            QUERY,
+            context_value={"driver": driver, "neo4j_query_splitter": splitter},
+        )
+        self.assertIsNone(results.errors)
+        return results, [query for query, _ in driver.queries]
+
+    def test_cost_estimates_from_limits_and_fanouts(self):
+        def relation(name, first=None, projection=None, owner="Movie"):
+            return RelationField(
+                name=name,
+                variable="movie",
+                rel_type="REL",
+                direction="OUT",
+                nested_variable=f"movie_{name}",
+                label="Node",
+                properties="{}",
+                projection=projection or Projection([PropertyField("name")]),
+                first=first,
+                owner=f"{owner}.{name}",
+            )
+
+        projection = Projection(
+            [
+                PropertyField("title"),
+                relation(
+                    "actors",
+                    projection=Projection([relation("movies", first=2, owner="Actor")]),
+                ),
+                relation("genres"),
+            ]
+        )
+
+        # 1 + 50 actors * (1 + 2 movies) + 10 genres
+        self.assertEqual(
+            161, QuerySplitter(fanouts={"Movie.actors": 50}).cost(projection)
+        )
+        # estimates are per type and field
+        self.assertEqual(
+            41, QuerySplitter(fanouts={"Genre.actors": 50}).cost(projection)
+        )
+
+    def test_selection_below_threshold_is_not_split(self):
+        _, queries = self.execute(QuerySplitter(threshold=100))
+
+        self.assertEqual(1, len(queries))
+        self.assertNotIn("__id", queries[0])
+
+    def test_selection_above_threshold_is_split_and_stitched(self):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results, queries = self.execute(QuerySplitter(threshold=10, executor=executor))
+
+        self.assertEqual(
+            [
+                "MATCH (movie:Movie {}) RETURN movie { .title ,actors: "
+                "[(movie)<-[:ACTED_IN]-(movie_actors:Actor {}) | movie_actors { .name }] ,"
+                "actorsCount: size([(movie)<-[:ACTED_IN]-(:Actor) | 1]) ,"
+                "__id: ID(movie)} AS movie SKIP 0",
+                "UNWIND $ids AS id MATCH (movie) WHERE ID(movie) = id "
+                "RETURN id, movie {genres: [(movie)-[:IN_GENRE]->(movie_genres:Genre {}) | "
+                "movie_genres { .name }] } AS movie",
+            ],
+            queries,
+        )
+        self.assertEqual(
+            [
+                {
+                    "title": "The Matrix",
+                    "actors": [{"name": "Keanu Reeves"}],
+                    "actorsCount": None,
+                    "genres": [{"name": "Genre 1"}],
+                },
+                {
+                    "title": "Speed",
+                    "actors": [],
+                    "actorsCount": None,
+                    "genres": [{"name": "Genre 2"}],
+                },
+            ],
+            results.data["Movie"],
+        )
+
+    def test_fanout_estimates_from_budget_directive(self):
+        schema = make_executable_schema(
+            """
+            directive @relation(name:String!, direction:String!) on FIELD_DEFINITION
+            directive @budget(fanout: Int) on FIELD_DEFINITION
+            type Actor {
+              name: String
+            }
+            type Genre {
+              name: String
+            }
+            type Movie {
+              title: String
+              actors: [Actor] @relation(name: "ACTED_IN", direction: "IN") @budget(fanout: 2000)
+              genres: [Genre] @relation(name: "IN_GENRE", direction: "OUT")
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        driver = FakeDriver(default=respond)
+
+        results = graphql_sync(
+            schema,
+            "{ Movie { title actors { name } genres { name } } }",
+            context_value={"driver": driver, "neo4j_query_splitter": QuerySplitter()},
+        )
+
+        self.assertIsNone(results.errors)
+        # 1 + 2000 actors + 10 genres is above the threshold of 1000, which
+        # 1 + 10 actors + 10 genres is not without the directive
+        self.assertEqual(2, len(driver.queries))
+
+    def test_split_queries_run_concurrently_in_async_resolvers(self):
+        schema = make_executable_schema(
+            """
+            directive @relation(name:String!, direction:String!) on FIELD_DEFINITION
+            type Person {
+              name: String
+            }
+            type Movie {
+              title: String
+              actors: [Person] @relation(name: "ACTED_IN", direction: "IN")
+              directors: [Person] @relation(name: "DIRECTED", direction: "IN")
+              writers: [Person] @relation(name: "WROTE", direction: "IN")
+            }
+            type Query {
+              Movie: [Movie]
+            }
+            """,
+            {
+                "Query": {
+                    "Movie": lambda obj, info, **kwargs: neo4j_graphql_async(
+                        obj, info.context, info, **kwargs
+                    )
+                }
+            },
+        )
+        # each split query waits for the other one: run one after the other
+        # they break the barrier
+        barrier = threading.Barrier(2, timeout=5)
+
+        def respond(query, parameters):
+            if query.startswith("UNWIND $ids"):
+                barrier.wait()
+                return [{"id": id, "movie": {}} for id in parameters["ids"]]
+            return [{"movie": {"title": "The Matrix", "actors": [], "__id": 1}}]
+
+        driver = FakeDriver(default=respond)
+
+        results = asyncio.run(
+            graphql(
+                schema,
+                "{ Movie { title actors { name } directors { name } writers { name } } }",
+                context_value={
+                    "driver": driver,
+                    "neo4j_query_splitter": QuerySplitter(threshold=10),
+                },
+            )
+        )
+
+        self.assertIsNone(results.errors)
+        self.assertEqual(3, len(driver.queries))
+        self.assertFalse(barrier.broken)
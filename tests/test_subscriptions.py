@@ -0,0 +1,116 @@
+import asyncio
+import re
+import unittest
+
+from strawberry_graphql_neo4j.subscriptions import _pollers
+from strawberry_graphql_neo4j.testing import FakeDriver
+from tests.helpers.strawberry_schema import schema
+
+
+class TestSubscriptions(unittest.TestCase):
+    def setUp(self):
+        self.rows = [
+            {"_watermark": 1, "_watermark_id": 1, "movie": {"title": "The Matrix"}}
+        ]
+        self.driver = FakeDriver(default=self.changed_since)
+
+    def changed_since(self, query, parameters):
+        cursor = (parameters["watermark"], parameters["watermarkId"])
+        rows = sorted(
+            (
+                row
+                for row in self.rows
+                if cursor[0] is None or (row["_watermark"], row["_watermark_id"]) > cursor
+            ),
+            key=lambda row: (row["_watermark"], row["_watermark_id"]),
+        )
+        limit = re.search(r"LIMIT (\d+)", query)
+        return rows[: int(limit.group(1))] if limit else rows
+
+    def test_incremental_query(self):
+        async def first_value():
+            subscription = await schema.subscribe(
+                "subscription { Movie(year: 1999, first: 10) { title } }",
+                context_value={"driver": self.driver},
+            )
+            result = await subscription.__anext__()
+            await subscription.aclose()
+            return result
+
+        result = asyncio.run(first_value())
+
+        self.assertEqual({"Movie": [{"title": "The Matrix"}]}, result.data)
+        self.assertEqual(
+            [
+                (
+                    "MATCH (movie:Movie {year: 1999}) "
+                    "WHERE $watermark IS NULL OR movie.updatedAt > $watermark "
+                    "OR (movie.updatedAt = $watermark AND ID(movie) > $watermarkId) "
+                    "WITH movie ORDER BY movie.updatedAt ASC, ID(movie) ASC SKIP 0 LIMIT 10 "
+                    "RETURN movie.updatedAt AS _watermark, ID(movie) AS _watermark_id, "
+                    "movie { .title } AS movie",
+                    {"watermark": None, "watermarkId": None},
+                )
+            ],
+            self.driver.queries,
+        )
+
+    def test_subscribers_share_one_poller(self):
+        # the first values are read while both subscribers wait for them
+        self.driver = FakeDriver(default=self.changed_since, latency=0.1)
+
+        async def subscribe():
+            return await schema.subscribe(
+                "subscription { Movie { title } }",
+                context_value={"driver": self.driver},
+            )
+
+        async def run():
+            first, second = await subscribe(), await subscribe()
+            snapshots = await asyncio.gather(first.__anext__(), second.__anext__())
+            self.assertEqual(1, len(_pollers))
+            self.rows.append(
+                {"_watermark": 2, "_watermark_id": 2, "movie": {"title": "Heat"}}
+            )
+            deltas = [await first.__anext__(), await second.__anext__()]
+            await first.aclose()
+            await second.aclose()
+            self.assertEqual({}, _pollers)
+            return snapshots, deltas
+
+        snapshots, deltas = asyncio.run(run())
+
+        self.assertEqual(
+            [{"Movie": [{"title": "The Matrix"}]}] * 2, [r.data for r in snapshots]
+        )
+        self.assertEqual([{"Movie": [{"title": "Heat"}]}] * 2, [r.data for r in deltas])
+        watermarks = [parameters["watermark"] for _, parameters in self.driver.queries]
+        # one snapshot for both subscribers, then the polls of the shared poller
+        self.assertEqual([None, 1], watermarks[:2])
+        self.assertNotIn(None, watermarks[1:])
+
+    def test_tied_watermarks_across_polls(self):
+        self.rows = [
+            {"_watermark": 1, "_watermark_id": id, "movie": {"title": title}}
+            for id, title in ((1, "The Matrix"), (2, "Heat"), (3, "Speed"))
+        ]
+
+        async def run():
+            subscription = await schema.subscribe(
+                "subscription { Movie(first: 2) { title } }",
+                context_value={"driver": self.driver},
+            )
+            results = [await subscription.__anext__(), await subscription.__anext__()]
+            await subscription.aclose()
+            return results
+
+        snapshot, delta = asyncio.run(run())
+
+        self.assertEqual(
+            {"Movie": [{"title": "The Matrix"}, {"title": "Heat"}]}, snapshot.data
+        )
+        # the rest of the tie at the page boundary comes with the next poll
+        self.assertEqual({"Movie": [{"title": "Speed"}]}, delta.data)
+        self.assertEqual(
+            {"watermark": 1, "watermarkId": 2}, self.driver.queries[1][1]
+        )
@@ -0,0 +1,73 @@
+import unittest
+
+from graphql import graphql_sync
+
+from strawberry_graphql_neo4j import make_executable_schema, neo4j_graphql
+from strawberry_graphql_neo4j.testing import FakeDriver
+
+
+class TestVectorDirective(unittest.TestCase):
+
+    schema_definition = """
+    directive @vector(index: String!, property: String, k: Int) on FIELD_DEFINITION
+    type Movie {
+      title: String
+      similar(first: Int, offset: Int): [Movie] @vector(index: "moviePlots", k: 3)
+    }
+    type Query {
+      Movie(title: String): [Movie]
+      MoviesLike(vector: [Float]!, year: Int, first: Int): [Movie] @vector(index: "moviePlots", k: 5)
+    }
+    """
+
+    def run_query(self, query):
+        def resolve(obj, info, **kwargs):
+            return neo4j_graphql(obj, info.context, info, **kwargs)
+
+        schema = make_executable_schema(
+            self.schema_definition,
+            {"Query": {"Movie": resolve, "MoviesLike": resolve}},
+        )
+        driver = FakeDriver()
+        result = graphql_sync(schema, query, context_value={"driver": driver})
+        self.assertIsNone(result.errors)
+        return driver.queries[0]
+
+    def test_nested_field(self):
+        query, _ = self.run_query(
+            '{ Movie(title: "Heat") { title similar { title } } }'
+        )
+
+        self.assertEqual(
+            'MATCH (movie:Movie {title: "Heat"}) RETURN movie { .title ,'
+            "similar: COLLECT { "
+            'CALL db.index.vector.queryNodes("moviePlots", 4, movie.embedding) '
+            "YIELD node AS movie_similar WHERE movie_similar <> movie "
+            "RETURN movie_similar { .title } LIMIT 3 } } AS movie SKIP 0",
+            query,
+        )
+
+    def test_first_is_mapped_to_k(self):
+        query, _ = self.run_query(
+            "{ Movie { similar(first: 2, offset: 4) { title } } }"
+        )
+
+        self.assertIn(
+            'CALL db.index.vector.queryNodes("moviePlots", 7, movie.embedding) '
+            "YIELD node AS movie_similar WHERE movie_similar <> movie "
+            "RETURN movie_similar { .title } SKIP 4 LIMIT 2",
+            query,
+        )
+
+    def test_root_field(self):
+        query, parameters = self.run_query(
+            "{ MoviesLike(vector: [0.1, 0.2], year: 1995, first: 2) { title } }"
+        )
+
+        self.assertEqual(
+            'CALL db.index.vector.queryNodes("moviePlots", 2, $vector) '
+            "YIELD node AS movie MATCH (movie:Movie {year: 1995}) "
+            "RETURN movie { .title } AS movie SKIP 0 LIMIT 2",
+            query,
+        )
+        self.assertEqual([0.1, 0.2], parameters["vector"])